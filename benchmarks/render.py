@@ -0,0 +1,261 @@
+"""
+Rendering benchmarks for BudgetView, run against a virtual X server.
+
+Run from the repository root (Xvfb must be installed):
+
+    python -m benchmarks.render --size medium --budget navigate=250 --budget edit=150
+
+The script starts Xvfb on a free display, opens Application and drives it through the callbacks
+dictionary: loading a budget group, stepping through its budgets with Next and Previous, editing a
+transaction and redrawing each panel on its own. Every step is timed from the callback until the
+last treeview row has been inserted, and the Tcl commands issued while it ran are counted.
+
+--budget STEP=MS sets the allowed median time of a step ('load', 'navigate', 'edit', 'update_frames'
+or a panel name). Results are written to a JSON file and the script exits with status 1 if any
+budget is exceeded.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from budget_planner.application import Application
+from budget_planner.aggregation import PANELS
+from budget_planner.models import ProjectModel
+from budget_planner.money import Money
+from budget_planner.records import Transaction
+from .run import git_commit
+from .workload import SIZES, generate_budget_group
+
+DEFAULT_BUDGETS = {  # milliseconds
+    'load': 2000,
+    'navigate': 500,
+    'edit': 500,
+    'update_frames': 500,
+}
+SETTLE_TIMEOUT = 60  # seconds to wait for a render to finish
+
+
+@contextmanager
+def virtual_display(width=1920, height=1080):
+    """Start Xvfb on a free display number and point DISPLAY at it for the duration of the block."""
+
+    if shutil.which('Xvfb') is None:
+        raise RuntimeError("Xvfb is not installed")
+
+    read_fd, write_fd = os.pipe()
+    server = subprocess.Popen(
+        ['Xvfb', '-displayfd', str(write_fd), '-screen', '0', f'{width}x{height}x24', '-nolisten', 'tcp'],
+        pass_fds=(write_fd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    os.close(write_fd)
+    previous = os.environ.get('DISPLAY')
+    try:
+        with os.fdopen(read_fd) as display_pipe:
+            number = display_pipe.readline().strip()  # Xvfb writes the display number once it is ready
+        if not number:
+            raise RuntimeError("Xvfb failed to start")
+        os.environ['DISPLAY'] = f":{number}"
+        yield os.environ['DISPLAY']
+    finally:
+        if previous is None:
+            os.environ.pop('DISPLAY', None)
+        else:
+            os.environ['DISPLAY'] = previous
+        server.terminate()
+        server.wait()
+
+
+class TkCallCounter:
+    """Stands in for the Tcl interpreter of an application and counts the calls made to it."""
+
+    def __init__(self, tkapp):
+        self._tkapp = tkapp
+        self.counts = Counter()
+
+    def __getattr__(self, name):
+        attribute = getattr(self._tkapp, name)
+        if not callable(attribute):
+            return attribute
+        counts = self.counts
+
+        def counted(*args, **kwargs):
+            counts[name] += 1
+            return attribute(*args, **kwargs)
+        return counted
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+
+class BenchmarkApplication(Application):
+    """Application whose Tcl interpreter is wrapped in a TkCallCounter before any widget is created."""
+
+    def _loadtk(self):
+        self.tk = self.tk_counter = TkCallCounter(self.tk)
+        super()._loadtk()
+
+
+def settle(app):
+    """Run the event loop until BudgetView has nothing left to draw."""
+
+    view = app.budget_view
+    deadline = time.perf_counter() + SETTLE_TIMEOUT
+    while True:
+        app.update()
+        busy = (
+            view.refresh_scheduler.dirty
+            or view._rendering
+            or view._render_id is not None
+            or view.aggregation_worker.busy
+        )
+        if not busy:
+            return
+        if time.perf_counter() > deadline:
+            raise RuntimeError("BudgetView did not finish rendering")
+        time.sleep(0.001)  # lets the aggregation worker run
+
+
+def timed(app, action):
+    """Run action followed by the render it triggers and return the wall time and Tcl call counts."""
+
+    settle(app)
+    counter = app.tk_counter
+    before = counter.total
+    before_call = counter.counts['call']
+    start = time.perf_counter()
+    action()
+    settle(app)
+    return {
+        'seconds': time.perf_counter() - start,
+        'tk_calls': counter.total - before,
+        'tcl_commands': counter.counts['call'] - before_call,
+    }
+
+
+def summarize(samples):
+    return {
+        'median_ms': statistics.median(s['seconds'] for s in samples) * 1000,
+        'max_ms': max(s['seconds'] for s in samples) * 1000,
+        'median_tk_calls': statistics.median(s['tk_calls'] for s in samples),
+        'median_tcl_commands': statistics.median(s['tcl_commands'] for s in samples),
+        'samples': len(samples),
+    }
+
+
+def run_scenario(app, pickle_path, repeat):
+    """Script load, navigation, edit and per panel redraws through the callbacks dictionary."""
+
+    callbacks = app.callbacks
+    samples = {}
+
+    def record(step, action):
+        samples.setdefault(step, []).append(timed(app, action))
+
+    for _ in range(repeat):
+        record('load', lambda: callbacks['load'](automatic=True, filepath=str(pickle_path)))
+
+    order = app.data_model.template_data['order']
+    callbacks['show_budget'](order[0])
+    settle(app)
+    for _ in range(len(order) - 1):
+        record('navigate', callbacks['get_next_budget'])
+    for _ in range(len(order) - 1):
+        record('navigate', callbacks['get_previous_budget'])
+
+    strings = app.data_model.strings
+    for _ in range(repeat):
+        def edit():  # what the transaction dialog does once its entries validate
+            app.data_model.append_row('transactions', Transaction(
+                '2020-01-01', strings.code('Benchmark'), strings.code('Benchmark'), Money(1234), Money(0)
+            ))
+            app.budget_view.refresh('transactions', 'categories')
+        record('edit', edit)
+
+    for _ in range(repeat):
+        record('update_frames', callbacks['update_frames'])
+        for panel in PANELS:
+            record(panel, lambda: app.budget_view.refresh(panel))
+
+    return {step: summarize(step_samples) for step, step_samples in samples.items()}
+
+
+def parse_budgets(values):
+    budgets = dict(DEFAULT_BUDGETS)
+    for value in values:
+        step, _, limit = value.partition('=')
+        budgets[step] = float(limit)
+    return budgets
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark BudgetView rendering under Xvfb.")
+    parser.add_argument('--size', choices=sorted(SIZES), default='medium')
+    parser.add_argument('--custom', nargs=4, type=int, metavar=('PERIODS', 'TRANSACTIONS', 'CATEGORIES', 'JOBS'),
+                        help="use a custom size instead of --size")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--budget', action='append', default=[], metavar='STEP=MS',
+                        help="allowed median milliseconds of a step, may be repeated")
+    parser.add_argument('--output', default='render_results.json')
+    args = parser.parse_args(argv)
+
+    parameters = tuple(args.custom) if args.custom else SIZES[args.size]
+    budgets = parse_budgets(args.budget)
+    output = Path(args.output).resolve()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory, virtual_display():
+        os.chdir(directory)  # the application reads and writes its files relative to the working directory
+        try:
+            os.mkdir("budget_planner")
+            model = ProjectModel(None, {})
+            model.template_data = generate_budget_group(*parameters, seed=args.seed)
+            pickle_path = Path(directory, "benchmark.bdg")
+            model.save_as_pickle(pickle_path)
+
+            app = BenchmarkApplication()
+            try:
+                steps = run_scenario(app, pickle_path, args.repeat)
+            finally:
+                app.destroy()
+        finally:
+            os.chdir(cwd)
+
+    failures = []
+    for step, summary in steps.items():
+        limit = budgets.get(step)
+        summary['budget_ms'] = limit
+        exceeded = limit is not None and summary['median_ms'] > limit
+        if exceeded:
+            failures.append(step)
+        print(f"{step:<14} median {summary['median_ms']:9.2f} ms   max {summary['max_ms']:9.2f} ms   "
+              f"tk calls {summary['median_tk_calls']:8.0f}{'   OVER BUDGET' if exceeded else ''}")
+
+    results = {
+        'commit': git_commit(),
+        'periods': parameters[0],
+        'transactions': parameters[1],
+        'categories': parameters[2],
+        'jobs': parameters[3],
+        'steps': steps,
+        'failures': failures,
+    }
+    with open(output, mode='w') as json_file:
+        json.dump(results, json_file, indent=2)
+    print(f"Results written to {output}")
+
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
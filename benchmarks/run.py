@@ -0,0 +1,177 @@
+"""
+Times the model's file handling, the category totals and budget navigation on synthetic budget groups.
+
+Run from the repository root:
+
+    python -m benchmarks.run --sizes small medium --output benchmark_results.json
+
+Each benchmark reports the minimum and median of several runs in seconds. Results are written to a
+JSON file together with the commit they were measured on. Passing an earlier results file with
+--compare prints how much slower or faster each benchmark became, so regressions show up between
+commits.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from budget_planner.aggregation import aggregate_budget, category_rows
+from budget_planner.models import ProjectModel
+from .workload import SIZES, generate_budget_group
+
+BENCHMARKS = (
+    'save_as_pickle',
+    'load_pickle',
+    'save_budget_group',
+    'load_budget_group',
+    'category_rows',
+    'navigation',
+)
+
+
+def measure(func, repeat):
+    """Call func repeat times and return the timings in seconds."""
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'repeat': repeat,
+    }
+
+
+def navigate_all(model):
+    """Step through every budget of the group the way Next does, aggregating each one."""
+
+    data = model.template_data
+    order = data['order']
+    name = order[0]
+    while name is not None:
+        data['current_budget'] = name
+        aggregate_budget(data['budgets'][name], data['strings'])
+        name = order.next(name)
+
+
+def run_size(group, benchmarks, repeat):
+    """
+    Run the selected benchmarks on one budget group.
+
+    File benchmarks run in a temporary directory since ProjectModel uses paths relative to the
+    working directory.
+    """
+
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            os.mkdir("budget_planner")
+            model = ProjectModel(None, {"overwrite_budget_group_warning": lambda fn: True})
+            model.template_data = group
+            pickle_path = Path(directory, "benchmark.bdg")
+            link_path = Path(directory, "benchmark.bgrp")
+
+            # the load benchmarks need files to read even when the save benchmarks are skipped
+            model.save_as_pickle(pickle_path)
+            model.save_budget_group(link_path)
+
+            first_budget = group['budgets'][group['order'][0]]
+            cases = {
+                'save_as_pickle': lambda: model.save_as_pickle(pickle_path),
+                'load_pickle': lambda: ProjectModel.load_pickle(pickle_path),
+                'save_budget_group': lambda: model.save_budget_group(link_path),
+                'load_budget_group': lambda: model.load_budget_group(link_path),
+                'category_rows': lambda: category_rows(first_budget, group['strings']),
+                'navigation': lambda: navigate_all(model),
+            }
+            for name in benchmarks:
+                model.template_data = group  # load_budget_group replaces it
+                results[name] = measure(cases[name], repeat)
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def git_commit():
+    """Return the commit being measured or None outside of a git checkout."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous):
+    """Print the change of each median against an earlier results file."""
+
+    print(f"\nCompared with {previous.get('commit') or 'previous run'}:")
+    for size, entry in results['sizes'].items():
+        for name, timing in entry['benchmarks'].items():
+            try:
+                before = previous['sizes'][size]['benchmarks'][name]['median']
+            except KeyError:
+                continue
+            ratio = timing['median'] / before if before else float('inf')
+            flag = '  REGRESSION' if ratio > 1.1 else ''
+            print(f"  {size:>8} {name:<18} {ratio:6.2f}x{flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark BudgetPlanner on synthetic budget groups.")
+    parser.add_argument('--sizes', nargs='+', choices=sorted(SIZES), default=['small', 'medium'])
+    parser.add_argument('--custom', nargs=4, type=int, metavar=('PERIODS', 'TRANSACTIONS', 'CATEGORIES', 'JOBS'),
+                        help="also run a custom size")
+    parser.add_argument('--benchmarks', nargs='+', choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    sizes = {size: SIZES[size] for size in args.sizes}
+    if args.custom:
+        sizes['custom'] = tuple(args.custom)
+
+    results = {
+        'commit': git_commit(),
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'sizes': {},
+    }
+    for size, parameters in sizes.items():
+        group = generate_budget_group(*parameters, seed=args.seed, name=f"Benchmark {size}")
+        timings = run_size(group, args.benchmarks, args.repeat)
+        results['sizes'][size] = {
+            'periods': parameters[0],
+            'transactions': parameters[1],
+            'categories': parameters[2],
+            'jobs': parameters[3],
+            'benchmarks': timings,
+        }
+        for name, timing in timings.items():
+            print(f"{size:>8} {name:<18} min {timing['min'] * 1000:10.2f} ms   median {timing['median'] * 1000:10.2f} ms")
+
+    with open(args.output, mode='w') as json_file:
+        json.dump(results, json_file, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, mode='r') as json_file:
+            compare(results, json.load(json_file))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Synthetic budget groups for benchmarking.
+
+Real budgets are dominated by a few merchants and categories (the grocery store, rent, the main
+job) with a long tail of one-off purchases, so names are drawn with Zipf-like weights rather than
+uniformly. A small share of transactions use a category which is not budgeted, which exercises the
+Uncategorized rows, and paycheques come from the group's jobs.
+"""
+
+import random
+from datetime import date, timedelta
+from budget_planner.ordering import BudgetOrder
+from budget_planner.strings import StringTable
+from budget_planner.money import Money, Rate
+from budget_planner.persistent import PMap
+from budget_planner.records import Budget, Job, ExpenseCategory, Transaction
+
+SIZES = {
+    # name: (periods, transactions per period, expense categories, jobs)
+    'small': (12, 50, 10, 2),
+    'medium': (24, 500, 25, 3),
+    'large': (60, 5000, 60, 5),
+}
+
+INCOME_SHARE = 0.05  # fraction of transactions which are paycheques
+UNBUDGETED_SHARE = 0.03  # fraction of expenses filed under a category with no budget
+MERCHANTS_PER_CATEGORY = 4
+
+
+def zipf_weights(count, exponent=1.1):
+    """Return weights for count items where the item of rank r is drawn in proportion to 1 / r**exponent."""
+    return [1 / rank ** exponent for rank in range(1, count + 1)]
+
+
+def generate_budget_group(periods, transactions, categories, jobs, seed=0, name='Benchmark'):
+    """
+    Build a budget group in the format used by ProjectModel.template_data.
+
+    :argument
+        periods (int): Number of budgets in the group
+        transactions (int): Number of transactions in each budget
+        categories (int): Number of budgeted expense categories
+        jobs (int): Number of jobs
+        seed (int): Seed for the random generator so workloads are repeatable
+        name (str): Name of the budget group
+    :returns
+        dict: A budget group holding records and a StringTable
+    """
+
+    rng = random.Random(seed)
+    strings = StringTable()
+
+    job_names = [f"Job {i + 1}" for i in range(jobs)]
+    category_names = [f"Category {i + 1}" for i in range(categories)]
+    unbudgeted_names = [f"Unbudgeted {i + 1}" for i in range(max(categories // 5, 1))]
+    merchant_names = [f"Merchant {i + 1}" for i in range(categories * MERCHANTS_PER_CATEGORY)]
+
+    category_weights = zipf_weights(categories)
+    merchant_weights = zipf_weights(len(merchant_names))
+    job_weights = zipf_weights(jobs, exponent=2)
+
+    job_records = [
+        Job(
+            job_name,
+            Money(rng.randrange(1200, 4000)),
+            Rate.parse(rng.choice(['10', '20', '40', '80', '120.5'])),
+            Rate.parse(rng.choice(['0.1', '0.15', '0.2', '0.25'])),
+        )
+        for job_name in job_names
+    ]
+    category_records = [
+        ExpenseCategory(category_name, Money(rng.randrange(0, 100000, 500)))
+        for category_name in category_names
+    ]
+
+    order = BudgetOrder()
+    budgets = {}
+    start = date(2020, 1, 1)
+    for period in range(periods):
+        budget_name = f"Period {period + 1}"
+        first_day = start + timedelta(days=30 * period)
+
+        rows = []
+        for _ in range(transactions):
+            day = (first_day + timedelta(days=rng.randrange(30))).isoformat()
+            if jobs and rng.random() < INCOME_SHARE:
+                merchant = rng.choices(job_names, job_weights)[0]
+                outlay = Money(rng.randrange(0, 50000)) if rng.random() < 0.5 else Money(0)  # withheld tax
+                rows.append(Transaction(
+                    day, strings.code(merchant), strings.code('Income'), outlay, Money(rng.randrange(50000, 400000))
+                ))
+                continue
+            if rng.random() < UNBUDGETED_SHARE:
+                category = rng.choice(unbudgeted_names)
+            else:
+                category = rng.choices(category_names, category_weights)[0]
+            merchant = rng.choices(merchant_names, merchant_weights)[0]
+            rows.append(Transaction(
+                day, strings.code(merchant), strings.code(category), Money(rng.randrange(100, 30000)), Money(0)
+            ))
+
+        order = order.append(budget_name)
+        budgets[budget_name] = Budget(
+            [job.replace() for job in job_records],
+            [category.replace() for category in category_records],
+            rows,
+        )
+
+    return {
+        'type': 'budget',
+        'name': name,
+        'current_budget': order[0],
+        'order': order,
+        'strings': strings,
+        'budgets': PMap(budgets),
+    }
+
+
+def generate_size(size, seed=0):
+    """Build the budget group for one of the preset SIZES."""
+    return generate_budget_group(*SIZES[size], seed=seed, name=f"Benchmark {size}")
@@ -1,5 +1,25 @@
-from budget_planner.application import Application
+import time
+STARTED = time.perf_counter()
+
+import argparse
+from budget_planner.startup import StartupProfile
 
 if __name__ == '__main__':
-    app = Application()
+    profile = StartupProfile(STARTED)
+    from budget_planner.application import Application
+    profile.mark('imports')
+
+    parser = argparse.ArgumentParser(description="Budget Planner")
+    parser.add_argument('--instrument', action='store_true', help="time every action, see Help > Performance")
+    parser.add_argument('--stall-threshold', type=int, default=500, metavar='MS',
+                        help="log event loop stalls longer than this to budget_planner/logs, 0 disables")
+    parser.add_argument('--profile-startup', action='store_true', help="print how long each phase of startup took")
+    args = parser.parse_args()
+
+    app = Application(
+        instrument=args.instrument,
+        stall_threshold=args.stall_threshold,
+        startup_profile=profile,
+        profile_startup=args.profile_startup,
+    )
     app.mainloop()
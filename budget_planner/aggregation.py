@@ -0,0 +1,191 @@
+"""
+Functions which turn a budget into the rows displayed by BudgetView.
+
+Nothing in this module touches Tk, so every function here can safely run on a worker thread.
+Each row is the tuple of values handed to a treeview insert.
+
+Transactions refer to merchants and categories by their code in the group's StringTable, so the
+totals are grouped by integer code and names are only looked up once per job or category.
+"""
+
+from .money import Money
+
+PANELS = ('categories', 'jobs', 'transactions', 'title')  # parts of BudgetView which are redrawn separately
+
+
+def _totals_by_code(totals, strings):
+    """Map the codes of the names in totals to their totals. Names no transaction uses have no code."""
+
+    by_code = {}
+    for name, value in totals.items():
+        code = strings.lookup(name)
+        if code is not None:
+            by_code[code] = value
+    return by_code
+
+
+def category_rows(budget, strings, income_tax=None, balances=None):
+    """
+    Compute the rows of the income, expense and net income treeviews.
+
+    Totals are added up as integer cents and only turned into Money for display.
+
+    :argument
+        budget (dict): A budget holding lists of Job, ExpenseCategory and Transaction records
+        strings (StringTable): Table the budget's transactions are encoded with
+        income_tax (int): Budgeted income tax in cents, e.g. from a tax.TaxEngine. By default each
+            job is taxed at its own tax_rate
+        balances (dict): Available balance in cents of each expense category, e.g. from a
+            rollover.RolloverEngine. When given, expense rows have an extra available column
+    :returns
+        tuple: A list of income rows, a list of expense rows and the single net income row
+    """
+
+    income_categories = budget['income_categories']
+    expense_categories = budget['expense_categories']
+    transactions = budget['transactions']
+
+    # initialize variables (all in cents)
+    actual_income = 0
+    uncategorized_income = 0
+
+    # create dictionary to hold values which will be inserted into the income treeview body
+    income_category_totals = {
+        k.name: {'expected': k.hourly_pay.times(k.hours).cents, 'actual': 0}
+        for k in income_categories
+    }
+    income_totals_by_code = _totals_by_code(income_category_totals, strings)
+
+    for tran in transactions:
+        inflow = tran.inflow.cents
+        if inflow > 0:
+            actual_income += inflow
+            totals = income_totals_by_code.get(tran.merchant_code)
+            if totals is not None:
+                totals['actual'] += inflow
+            else:
+                uncategorized_income += inflow
+
+    # determine whether to display uncategorized income row
+    if uncategorized_income > 0:
+        income_category_totals['Uncategorized'] = dict(expected=0, actual=uncategorized_income)
+
+    expected_income = sum([v['expected'] for v in income_category_totals.values()])
+    income_category_totals['SUBTOTAL'] = dict(expected=expected_income, actual=actual_income)
+
+    income_rows = [
+        (k, str(Money(v['expected'])), str(Money(v['actual'])))
+        for k, v in income_category_totals.items()
+    ]
+
+    actual_expense = 0
+    taxed_income = 0
+    uncategorized_expense = 0
+
+    # create dictionary to hold values which will be inserted into the expense treeview body
+    expense_category_totals = {
+        k.name: {'budget': k.budget.cents, 'actual': 0}
+        for k in expense_categories
+    }
+    expense_totals_by_code = _totals_by_code(expense_category_totals, strings)
+    job_codes = set(income_totals_by_code)
+
+    for tran in transactions:
+        outlay = tran.outlay.cents
+        if outlay > 0:
+            actual_expense += outlay
+            totals = expense_totals_by_code.get(tran.category_code)
+            if totals is not None:
+                totals['actual'] += outlay
+            elif tran.merchant_code in job_codes:
+                taxed_income += outlay
+            else:
+                uncategorized_expense += outlay
+
+    if income_tax is not None:
+        budgeted_income_taxes = income_tax
+    else:
+        budgeted_income_taxes = sum([ic.hourly_pay.times(ic.hours, ic.tax_rate).cents for ic in income_categories])
+    expense_category_totals['Income Tax'] = dict(budget=budgeted_income_taxes, actual=taxed_income)
+
+    # determine whether to display uncategorized expense row
+    if uncategorized_expense > 0:
+        expense_category_totals['Uncategorized'] = dict(budget=0, actual=uncategorized_expense)
+
+    budgeted_expense = sum([v['budget'] for v in expense_category_totals.values()])
+    expense_category_totals['SUBTOTAL'] = dict(budget=budgeted_expense, actual=actual_expense)
+
+    expense_rows = [
+        (k, str(Money(v['budget'])), str(Money(v['actual'])))
+        for k, v in expense_category_totals.items()
+    ]
+    if balances is not None:
+        available = {k.name: balances.get(k.name, 0) for k in expense_categories}
+        available['SUBTOTAL'] = sum(available.values())
+        expense_rows = [
+            row + ((str(Money(available[row[0]])),) if row[0] in available else ('',))
+            for row in expense_rows
+        ]
+
+    net_income_row = (
+        'NET INCOME:',
+        str(Money(expected_income - budgeted_expense)),
+        str(Money(actual_income - actual_expense))
+    )
+
+    return income_rows, expense_rows, net_income_row
+
+
+def job_rows(budget):
+    """Compute the rows of the job treeview."""
+
+    return [
+        (
+            job.name,
+            str(job.hourly_pay),
+            job.hours.format(2),
+            job.tax_rate.format(2),
+            str(job.hourly_pay.times(job.hours))
+        )
+        for job in budget['income_categories']
+    ]
+
+
+def transaction_rows(budget, strings):
+    """Compute the rows of the transaction treeview, decoding merchants and categories."""
+
+    return [
+        (
+            tran.date,
+            strings[tran.merchant_code],
+            strings[tran.category_code],
+            str(tran.outlay),
+            str(tran.inflow),
+            str(tran.inflow - tran.outlay)
+        )
+        for tran in budget['transactions']
+    ]
+
+
+def aggregate_budget(budget, strings, panels=PANELS, income_tax=None, balances=None):
+    """
+    Compute the rows BudgetView needs to display some or all panels of a budget.
+
+    :argument
+        budget (dict): A budget holding lists of Job, ExpenseCategory and Transaction records
+        strings (StringTable): Table the budget's transactions are encoded with
+        panels (iterable): Panels to compute rows for, any of 'categories', 'jobs' and 'transactions'
+        income_tax (int): Budgeted income tax in cents, see category_rows
+        balances (dict): Available balance of each expense category, see category_rows
+    :returns
+        dict: Rows keyed by 'income', 'expense', 'net_income', 'jobs' and 'transactions'
+    """
+
+    rows = {}
+    if 'categories' in panels:
+        rows['income'], rows['expense'], rows['net_income'] = category_rows(budget, strings, income_tax, balances)
+    if 'jobs' in panels:
+        rows['jobs'] = job_rows(budget)
+    if 'transactions' in panels:
+        rows['transactions'] = transaction_rows(budget, strings)
+    return rows
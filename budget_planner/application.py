@@ -1,22 +1,36 @@
 import tkinter as tk
 from tkinter import ttk
 import os
+from datetime import date
 from pathlib import Path
-import copy
 from . import views as v
 from . import menus
 from . models import ProjectModel, ProjectSettings
+from . records import Budget
+from . prefetch import BudgetPrefetcher
+from . workers import ForecastWorker
+from . instrumentation import Instrumentation
+from . watchdog import StallWatchdog
+from . startup import StartupProfile
+from . recovery import RecoveryJournal
+from . tax import TaxEngine, load_tax_tables
+from . rollover import RolloverEngine
 
 
 class Application(tk.Tk):
     """BudgetPlanner Main Application"""
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, instrument=False, stall_threshold=500, startup_profile=None, profile_startup=False,
+                 **kwargs):
+        self.startup_profile = startup_profile or StartupProfile()
         super().__init__(*args, **kwargs)
+        self.startup_profile.mark('tk')
 
         self.settings = ProjectSettings(self)
+        self.startup_profile.mark('settings')
 
         self.wm_title("Budget Planner")
+        self.protocol("WM_DELETE_WINDOW", self.destroy)  # by default closing the window skips destroy
         self.geometry(self.settings.settings['window_size'])
 
         # set up callback dictionary
@@ -25,6 +39,7 @@ class Application(tk.Tk):
             "quick_save": self.quick_save,
             "manual_save": self.manual_save,
             "add_transaction": self.add_transaction,
+            "add_transactions": self.add_transactions,
             "add_category": self.add_category,
             "create_budget": self.create_budget,
             "update_frames": self.update_frames,
@@ -40,42 +55,105 @@ class Application(tk.Tk):
             "reset_current_file_filepath": self.reset_current_file_filepath,
             "enable_quick_save": self.enable_quick_save,
             "disable_quick_save": self.disable_quick_save,
+            "prefetch_adjacent_budgets": self.prefetch_adjacent_budgets,
+            "show_budget": self.show_budget,
+            "jump_to_budget": self.jump_to_budget,
+            "insert_budget": self.insert_budget,
+            "rename_budget": self.rename_budget,
+            "delete_budget": self.delete_budget,
+            "edit_recurring_rules": self.edit_recurring_rules,
+            "show_forecast": self.show_forecast,
+            "edit_tax_settings": self.edit_tax_settings,
+            "get_rollover": self.get_rollover,
+            "set_rollover": self.set_rollover,
+            "show_performance": self.show_performance,
+            "undo": self.undo,
+            "redo": self.redo,
+            "get_undo_state": self.get_undo_state,
+            "get_leftover_journal": self.get_leftover_journal,
+            "restore_journal": self.restore_journal,
+            "discard_journal": self.discard_journal,
         }
 
-        # set up project model
+        # optionally time every callback, this must happen before anything keeps a reference to one
+        self.instrumentation = None
+        if instrument:
+            self.instrumentation = Instrumentation()
+            self.instrumentation.instrument(self.callbacks)
+
+        # set up project model, journaling unsaved edits so they survive a crash
+        self.journal = RecoveryJournal()
         self.data_model = ProjectModel(self, self.callbacks)
+        self.data_model.journal = self.journal
+        self.apply_tax_settings()
+        self.data_model.rollover_engine = RolloverEngine() if self.settings.settings['rollover'] else None
+        self.prefetcher = BudgetPrefetcher(self)
+        self.startup_profile.mark('model')
 
         # set up menu
         self.option_add('*tearOff', False)
         self.main_menu = menus.MainMenu(self, self.callbacks)
         self.config(menu=self.main_menu)
+        self.startup_profile.mark('menu')
 
         # set up home page view
         self.home_page = v.HomePage(self, self.callbacks)
         self.home_page.grid(column=0, row=0, sticky='nswe')
+        self.startup_profile.mark('home page')
 
-        # set up budget view
-        self.budget_view = v.BudgetView(self, self.callbacks)
-        # self.budget_view.grid(column=0, row=0, sticky='nsew')
+        # BudgetView is built the first time it is needed, see the budget_view property
+        self._budget_view = None
+        self.forecast_worker = None  # started by the first forecast
 
         self.grid_rowconfigure(0, weight=1)
         self.grid_columnconfigure(0, weight=1)
 
-        self.update_settings_file()
+        # undo / redo shortcuts; dialogs are separate toplevels so typing in them is unaffected
+        for sequence in ("<Control-z>", "<Control-Z>"):
+            self.bind(sequence, lambda event: self.callbacks["undo"]())
+        for sequence in ("<Control-y>", "<Control-Y>"):
+            self.bind(sequence, lambda event: self.callbacks["redo"]())
+
+        # log event loop stalls longer than stall_threshold milliseconds, None disables this
+        self.watchdog = None
+        if stall_threshold:
+            self.watchdog = StallWatchdog(self, stall_threshold)
+
+        # idle callbacks run in order, so this runs once the window has been drawn by mainloop
+        self.after_idle(self._first_paint, profile_startup)
+
+    def _first_paint(self, report):
+        self.startup_profile.mark('first paint')
+        if report:
+            print(self.startup_profile.report())
+
+    @property
+    def budget_view(self):
+        """The BudgetView, built on first use since it is the most expensive part of the window."""
+        if self._budget_view is None:
+            self._budget_view = v.BudgetView(self, self.callbacks)
+            if self.instrumentation is not None:
+                self.instrumentation.watch_throttle('canvas_size', self._budget_view.canvas_size_throttle)
+                self.instrumentation.watch_throttle('resize', self._budget_view.resize_throttle)
+        return self._budget_view
+
+    def destroy(self):
+        """Stop background work and save settings before the window goes away."""
+        if self.watchdog is not None:
+            self.watchdog.stop()
+        self.settings.close()
+        self.journal.close()
+        super().destroy()
 
     def change_view(self, view_name):
         if view_name == "home_page":
-            self.budget_view.grid_forget()
+            if self._budget_view is not None:
+                self._budget_view.grid_forget()
             self.home_page.grid(sticky='nswe')
         elif view_name == "budget_view":
             self.home_page.grid_forget()
             self.budget_view.grid(sticky='nswe')
 
-    def update_settings_file(self):
-        self.settings.update_settings_file()
-        # rerun every 5000 milliseconds
-        self.after(5000, self.update_settings_file)
-
     def quick_save(self):
         path = self.settings.settings['current_file_filepath']
         if path:
@@ -138,10 +216,12 @@ class Application(tk.Tk):
     def update_current_file_filepath(self, fp):
         """Wrapper to call update_current_file_filepath method from settings."""
         self.settings.update_current_file_filepath(fp)
+        self.journal.filepath = fp
 
     def reset_current_file_filepath(self):
         """Wrapper to call reset_current_file_filepath method from settings."""
         self.settings.reset_current_file_filepath()
+        self.journal.filepath = ''
 
     def get_template_data(self):
         """Wrapper to call get_template_data method from data_model."""
@@ -159,6 +239,10 @@ class Application(tk.Tk):
         """Used to call add_transaction from BudgetView"""
         self.budget_view.add_transaction()
 
+    def add_transactions(self):
+        """Used to call add_transactions from BudgetView"""
+        self.budget_view.add_transactions()
+
     def create_budget(self):
         v.CreateBudget(self, self.callbacks)
 
@@ -199,14 +283,11 @@ class Application(tk.Tk):
                 print('Failure to load. Wrong file type.')
             else:
                 file_type = result.get('type', '')
-                if file_type == 'template':
-                    self.data_model.template_data = result
-                    self.budget_view.view_data = result['template']
-                else:  # file_type == 'budget':
-                    self.data_model.template_data = result
-                    current_budget = self.data_model.template_data["current_budget"]
-                    self.budget_view.view_data = result['budgets'][current_budget]
+                self.data_model.template_data = result
+                if file_type == 'budget':  # recurring transactions due in the current budget are added on view
+                    self.data_model.materialize(result['current_budget'])
                 self.update_frames()  # for BudgetView
+                self.prefetch_adjacent_budgets()
                 self.settings.update_recent_files(file_type, filepath)  # update settings with recent file
                 self.change_view('budget_view')  # change current view to BudgetView
                 self.update_current_file_filepath(filepath)
@@ -220,8 +301,6 @@ class Application(tk.Tk):
         if lb.filepath:
             success = self.data_model.load_budget_group(lb.filepath)
         if success:
-            current_budget = self.data_model.template_data["current_budget"]
-            self.budget_view.view_data = self.data_model.template_data['budgets'][current_budget]
             self.update_frames()
 
     def get_previous_budget(self):
@@ -229,62 +308,268 @@ class Application(tk.Tk):
             print("This is a template.")
             return
         current_budget = self.data_model.template_data['current_budget']
-        placement = self.data_model.template_data['order'].index(current_budget)
-        if placement > 0:
-            previous_budget = self.data_model.template_data['order'][placement - 1]
-        else:
+        previous_budget = self.data_model.template_data['order'].previous(current_budget)
+        if previous_budget is None:
             print("There are no earlier budgets!")
             return
-        self.data_model.template_data["current_budget"] = previous_budget
-        self.budget_view.view_data = self.data_model.template_data['budgets'][previous_budget]
-        self.update_frames()
+        self.view_budget(previous_budget)
 
     def get_next_budget(self):
         if self.data_model.template_data['type'] == 'template':
             print("This is a template.")
             return
         current_budget = self.data_model.template_data['current_budget']
-        placement = self.data_model.template_data['order'].index(current_budget)
-        try:
-            next_budget = self.data_model.template_data['order'][placement + 1]
-            self.data_model.template_data["current_budget"] = next_budget
-            self.budget_view.view_data = self.data_model.template_data['budgets'][next_budget]
-            self.update_frames()
-        except IndexError:
+        next_budget = self.data_model.template_data['order'].next(current_budget)
+        if next_budget is not None:
+            self.view_budget(next_budget)
+        else:
             warning_class = v.MessageView()
             create_next_budget = warning_class.create_next_budget_messagebox()  # asks if we want to create a new budget
             if create_next_budget:
                 v.AddNextBudget(self, self.callbacks, current_budget, self.create_new_budget)
 
-    def create_new_budget(self, new_budget, template='blank'):
-        """Uses view info to append a budget to the current budget group and then update the view."""
+    def show_budget(self, name):
+        """Make the named budget of the current budget group the one shown in BudgetView."""
+
+        self.data_model.template_data["current_budget"] = name
+        self.budget_view.update_frames(self.prefetcher.take(
+            name, self.data_model.expected_income_tax(name), self.data_model.category_balances(name)
+        ))
+        self.prefetch_adjacent_budgets()
+
+    def view_budget(self, name):
+        """Show a budget the user navigated to, first adding the recurring transactions due in it."""
+
+        if self.data_model.materialize(name):
+            self.prefetcher.clear()  # rows prefetched for the budget are out of date
+        self.show_budget(name)
+
+    def jump_to_budget(self):
+        """Open a picker listing every budget in the current budget group."""
+
+        if self.data_model.template_data['type'] == 'template':
+            print("This is a template.")
+            return
+        v.JumpToBudget(
+            self,
+            self.data_model.template_data['order'],
+            self.data_model.template_data['current_budget'],
+            self.view_budget
+        )
+
+    def insert_budget(self):
+        """Ask for a new budget which is placed directly after the current budget."""
+
+        if self.data_model.template_data['type'] == 'template':
+            print("This is a template.")
+            return
+        current_budget = self.data_model.template_data['current_budget']
+        v.AddNextBudget(self, self.callbacks, current_budget, self.create_new_budget)
+
+    def rename_budget(self):
+        """Ask for a new name for the current budget."""
+
+        if self.data_model.template_data['type'] == 'template':
+            print("This is a template.")
+            return
+        current_budget = self.data_model.template_data['current_budget']
+        v.RenameBudget(self, self.data_model.template_data['order'], current_budget, self._rename_budget)
+
+    def _rename_budget(self, old, new):
+        self.data_model.rename_budget(old, new)
+        self.prefetcher.clear()
+        self.budget_view.refresh('title')
+        self.prefetch_adjacent_budgets()
+
+    def delete_budget(self):
+        """Remove the current budget from the budget group after asking for confirmation."""
+
+        if self.data_model.template_data['type'] == 'template':
+            print("This is a template.")
+            return
+        current_budget = self.data_model.template_data['current_budget']
+        if len(self.data_model.template_data['order']) < 2:
+            v.MessageView.last_budget_messagebox()
+            return
+        if v.MessageView.delete_budget_messagebox(current_budget):
+            new_current = self.data_model.delete_budget(current_budget)
+            self.prefetcher.clear()
+            self.show_budget(new_current)
+
+    def create_new_budget(self, new_budget, template='blank', period=None):
+        """Uses view info to add a budget after the current budget of the budget group and then update the view."""
 
         penultimate = self.data_model.template_data["current_budget"]
 
-        self.data_model.template_data["current_budget"] = new_budget
-        self.data_model.template_data["order"].append(new_budget)
-        if template == 'saved':  # currently set to blank
-            self.data_model.template_data['budgets'][new_budget] = {
-                'income_categories': [],
-                'expense_categories': [],
-                'transactions': [],
-            }
-        elif template == 'previous':
-            self.data_model.template_data['budgets'][new_budget] = {
-                'income_categories': copy.deepcopy(
-                    self.data_model.template_data['budgets'][penultimate]['income_categories']),
-                'expense_categories': copy.deepcopy(
-                    self.data_model.template_data['budgets'][penultimate]['expense_categories']),
-                'transactions': [],
-            }
-        else:  # default or when template='blank'
-            self.data_model.template_data['budgets'][new_budget] = {
-                'income_categories': [],
-                'expense_categories': [],
-                'transactions': [],
-            }
-        self.budget_view.view_data = self.data_model.template_data['budgets'][new_budget]
+        if template == 'previous':
+            # records are never changed in place so the new budget can share the previous budget's tables
+            previous = self.data_model.template_data['budgets'][penultimate]
+            budget = Budget(previous.income_categories, previous.expense_categories)
+        else:  # default or when template='blank'; 'saved' is currently set to blank
+            budget = Budget()
+        self.data_model.add_budget(new_budget, budget, after=penultimate, period=period)
+        self.update_frames()
+        self.prefetch_adjacent_budgets()
+
+    def edit_recurring_rules(self):
+        """Open the dialog listing the recurring transactions of the budget group."""
+
+        if self.data_model.template_data['type'] == 'template':
+            print("This is a template.")
+            return
+        v.RecurringRules(
+            self,
+            self.data_model.schedule,
+            self.data_model.template_data['current_budget'],
+            self._change_rule,
+            self._set_period
+        )
+
+    def _change_rule(self, rule_id, rule):
+        """Add, change or remove a recurring rule, updating the budgets from today on. Returns the new schedule."""
+
+        self.data_model.change_rule(rule_id, rule, date.today().isoformat())
+        self._show_schedule_change()
+        return self.data_model.schedule
+
+    def _set_period(self, period):
+        """Set the period of the current budget. Returns the new schedule."""
+
+        self.data_model.set_period(self.data_model.template_data['current_budget'], period)
+        self._show_schedule_change()
+        return self.data_model.schedule
+
+    def _show_schedule_change(self):
+        self.prefetcher.clear()
+        self.update_frames()
+        self.prefetch_adjacent_budgets()
+
+    def show_forecast(self):
+        """Open a forecast of the balance after the current budget."""
+
+        if self.forecast_worker is None:
+            self.forecast_worker = ForecastWorker(self)
+        v.ForecastView(
+            self, self.data_model.snapshot(), self.forecast_worker, self.data_model.expected_income_tax()
+        )
+
+    def apply_tax_settings(self):
+        """Give the model a tax engine for the tax table chosen in the settings, if any."""
+
+        name = self.settings.settings['tax_table']
+        self.data_model.tax_engine = None
+        if name:
+            table = load_tax_tables().get(name)
+            if table is None:
+                print(f"Tax table {name!r} not found, using each job's tax rate.")
+                return
+            self.data_model.tax_engine = TaxEngine(table, self.settings.settings['periods_per_year'])
+
+    def edit_tax_settings(self):
+        """Open the dialog choosing how income tax is budgeted."""
+        v.TaxSettings(
+            self,
+            list(load_tax_tables()),
+            self.settings.settings['tax_table'],
+            self.settings.settings['periods_per_year'],
+            self._set_tax_settings
+        )
+
+    def _set_tax_settings(self, table_name, periods_per_year):
+        self.settings.set_tax_settings(table_name, periods_per_year)
+        self.apply_tax_settings()
+        self.prefetcher.clear()  # prefetched rows were computed with the old income tax
+        self.update_frames()
+        self.prefetch_adjacent_budgets()
+
+    def get_rollover(self):
+        return self.settings.settings['rollover']
+
+    def set_rollover(self, enabled):
+        """Turn rolling category balances over from one budget to the next on or off."""
+
+        self.settings.set_rollover(enabled)
+        self.data_model.rollover_engine = RolloverEngine() if enabled else None
+        self.prefetcher.clear()  # prefetched rows were computed with the old balances
         self.update_frames()
+        self.prefetch_adjacent_budgets()
+
+    def prefetch_adjacent_budgets(self):
+        """Ask the prefetcher to aggregate the budgets either side of the current budget."""
+
+        if self.data_model.template_data['type'] == 'template':
+            self.prefetcher.clear()
+            return
+        self.prefetcher.navigate(
+            self.data_model.template_data['order'],
+            self.data_model.template_data['current_budget'],
+            self.data_model.template_data['budgets'],
+            self.data_model.strings,
+            self.data_model.expected_income_tax,
+            self.data_model.category_balances,
+        )
+
+    def undo(self):
+        """Revert the latest edit and show the budget it changed."""
+
+        if self.data_model.undo() is None:
+            print("Nothing to undo.")
+            return
+        self._show_history_change()
+
+    def redo(self):
+        """Apply the latest undone edit again and show the budget it changed."""
+
+        if self.data_model.redo() is None:
+            print("Nothing to redo.")
+            return
+        self._show_history_change()
+
+    def _show_history_change(self):
+        self.prefetcher.clear()  # the change may be in a budget whose rows were prefetched
+        if self.data_model.template_data['type'] == 'budget':
+            self.show_budget(self.data_model.template_data['current_budget'])
+        else:
+            self.update_frames()
+        self.change_view('budget_view')
+
+    def get_leftover_journal(self):
+        """Return the information of a recovery journal left by a session which crashed, or None."""
+        return self.journal.leftover()
+
+    def restore_journal(self):
+        """Load the edits of a leftover recovery journal and show them."""
+
+        restored = self.journal.restore()
+        if restored is None:
+            return
+        info, data = restored
+        self.data_model.template_data = data
+        self.journal.record(None, self.data_model.snapshot())  # the restored edits are still unsaved
+        if info['filepath'] and os.path.isfile(info['filepath']):
+            self.update_current_file_filepath(info['filepath'])
+            self.enable_quick_save()
+        else:
+            self.reset_current_file_filepath()
+            self.disable_quick_save()
+        self.update_frames()
+        self.prefetch_adjacent_budgets()
+        self.change_view('budget_view')
+
+    def discard_journal(self):
+        self.journal.discard_leftover()
+
+    def get_undo_state(self):
+        """Return whether there is anything to undo and anything to redo."""
+        return self.data_model.history.can_undo, self.data_model.history.can_redo
+
+    def show_performance(self):
+        """Open the dialog showing callback timings collected by the instrumentation."""
+
+        if self.instrumentation is None:
+            v.MessageView.instrumentation_off_messagebox()
+            return
+        v.PerformanceView(self, self.instrumentation)
 
     def set_window_size(self, width, height):
         self.settings.set_window_size(width, height)
@@ -0,0 +1,66 @@
+class FenwickTree:
+    """
+    Binary indexed tree holding running totals over a fixed number of slots.
+
+    Point updates and prefix sums both take O(log n), which lets cumulative values be kept current
+    without re-walking every slot whenever one of them changes.
+    """
+
+    def __init__(self, values=(), zero=0):
+        self.zero = zero
+        self._tree = [zero] + list(values)
+        # build in O(n) by pushing each slot into its parent
+        for i in range(1, len(self._tree)):
+            parent = i + (i & -i)
+            if parent < len(self._tree):
+                self._tree[parent] = self._tree[parent] + self._tree[i]
+
+    def __len__(self):
+        return len(self._tree) - 1
+
+    def copy(self):
+        """Return an independent copy in O(n) without rebuilding the tree."""
+        tree = FenwickTree.__new__(FenwickTree)
+        tree.zero = self.zero
+        tree._tree = list(self._tree)
+        return tree
+
+    def append(self, value):
+        """Add a slot holding value after the last one in O(log n)."""
+        i = len(self._tree)
+        # slot i covers the slots after i - (i & -i), which are already in the tree
+        self._tree.append(value + self.prefix_sum(i - 1) - self.prefix_sum(i - (i & -i)))
+
+    def add(self, index, delta):
+        """Add delta to the slot at the given zero based index."""
+        i = index + 1
+        while i < len(self._tree):
+            self._tree[i] = self._tree[i] + delta
+            i += i & -i
+
+    def prefix_sum(self, count):
+        """Return the total of the first count slots."""
+        total = self.zero
+        i = count
+        while i > 0:
+            total = total + self._tree[i]
+            i -= i & -i
+        return total
+
+    def find(self, target):
+        """
+        Return the smallest index whose inclusive prefix sum exceeds target.
+
+        Only valid when every slot is non-negative, e.g. when the slots hold sizes.
+        """
+
+        position = 0
+        remaining = target
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            following = position + step
+            if following < len(self._tree) and self._tree[following] <= remaining:
+                position = following
+                remaining = remaining - self._tree[following]
+            step >>= 1
+        return position
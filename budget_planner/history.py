@@ -0,0 +1,274 @@
+"""
+Undo and redo for edits of the current template or budget group.
+
+Every edit is described by a delta, a small object holding only what changed: the row inserted or
+removed, the old and new row of an edit, or the budget added, removed or renamed. A delta knows
+how to apply itself to a ProjectModel and how to build its inverse, so undoing is applying the
+inverse. Rows and budgets are immutable and are shared with the model rather than copied, so
+the log grows with the number of edits and not with the size of the budgets.
+
+A delta's budget is the name of the budget it changed, or None for the template. Applying a row
+delta makes that budget current so undo and redo always show what they changed. A Batch groups
+deltas which are undone and redone together, e.g. the rows a recurring rule added to several
+budgets along with the change of the budget group's schedule.
+"""
+
+
+class Delta:
+    """Base class of the deltas recorded by CommandLog."""
+
+    __slots__ = ()
+
+    def apply(self, model):
+        raise NotImplementedError
+
+    def inverse(self):
+        raise NotImplementedError
+
+    def __repr__(self):
+        values = ', '.join(f"{field}={getattr(self, field)!r}" for field in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+
+class RowInserted(Delta):
+    """A row was inserted into a table at index."""
+
+    __slots__ = ('budget', 'table', 'index', 'row')
+
+    def __init__(self, budget, table, index, row):
+        self.budget = budget
+        self.table = table
+        self.index = index
+        self.row = row
+
+    def apply(self, model):
+        model.store_budget(self.budget, model.get_budget(self.budget).insert_row(self.table, self.index, self.row))
+
+    def inverse(self):
+        return RowDeleted(self.budget, self.table, self.index, self.row)
+
+
+class RowDeleted(Delta):
+    """The row at index was removed from a table."""
+
+    __slots__ = ('budget', 'table', 'index', 'row')
+
+    def __init__(self, budget, table, index, row):
+        self.budget = budget
+        self.table = table
+        self.index = index
+        self.row = row
+
+    def apply(self, model):
+        model.store_budget(self.budget, model.get_budget(self.budget).delete_row(self.table, self.index))
+
+    def inverse(self):
+        return RowInserted(self.budget, self.table, self.index, self.row)
+
+
+class RowReplaced(Delta):
+    """The row at index was replaced: old is the row before the edit and row the row after it."""
+
+    __slots__ = ('budget', 'table', 'index', 'row', 'old')
+
+    def __init__(self, budget, table, index, row, old):
+        self.budget = budget
+        self.table = table
+        self.index = index
+        self.row = row
+        self.old = old
+
+    def apply(self, model):
+        model.store_budget(self.budget, model.get_budget(self.budget).replace_row(self.table, self.index, self.row))
+
+    def inverse(self):
+        return RowReplaced(self.budget, self.table, self.index, self.old, self.row)
+
+
+class RowsInserted(Delta):
+    """Several rows were inserted into a table at index in one go, e.g. by the transaction grid."""
+
+    __slots__ = ('budget', 'table', 'index', 'rows')
+
+    def __init__(self, budget, table, index, rows):
+        self.budget = budget
+        self.table = table
+        self.index = index
+        self.rows = tuple(rows)
+
+    def apply(self, model):
+        model.store_budget(self.budget, model.get_budget(self.budget).splice_rows(
+            self.table, self.index, self.index, self.rows))
+
+    def inverse(self):
+        return RowsDeleted(self.budget, self.table, self.index, self.rows)
+
+
+class RowsDeleted(Delta):
+    """The rows starting at index were removed from a table in one go."""
+
+    __slots__ = ('budget', 'table', 'index', 'rows')
+
+    def __init__(self, budget, table, index, rows):
+        self.budget = budget
+        self.table = table
+        self.index = index
+        self.rows = tuple(rows)
+
+    def apply(self, model):
+        model.store_budget(self.budget, model.get_budget(self.budget).splice_rows(
+            self.table, self.index, self.index + len(self.rows)))
+
+    def inverse(self):
+        return RowsInserted(self.budget, self.table, self.index, self.rows)
+
+
+class BudgetAdded(Delta):
+    """A budget was added to the budget group at position in its order."""
+
+    __slots__ = ('budget', 'position', 'contents')
+
+    def __init__(self, budget, position, contents):
+        self.budget = budget
+        self.position = position
+        self.contents = contents
+
+    def apply(self, model):
+        model.insert_budget(self.budget, self.position, self.contents)
+
+    def inverse(self):
+        return BudgetRemoved(self.budget, self.position, self.contents)
+
+
+class BudgetRemoved(Delta):
+    """A budget was removed from position in the budget group's order."""
+
+    __slots__ = ('budget', 'position', 'contents')
+
+    def __init__(self, budget, position, contents):
+        self.budget = budget
+        self.position = position
+        self.contents = contents
+
+    def apply(self, model):
+        model.remove_budget(self.budget)
+
+    def inverse(self):
+        return BudgetAdded(self.budget, self.position, self.contents)
+
+
+class BudgetRenamed(Delta):
+    """A budget of the budget group was renamed from old to budget."""
+
+    __slots__ = ('budget', 'old')
+
+    def __init__(self, budget, old):
+        self.budget = budget
+        self.old = old
+
+    def apply(self, model):
+        model.relabel_budget(self.old, self.budget)
+
+    def inverse(self):
+        return BudgetRenamed(self.old, self.budget)
+
+
+class ScheduleChanged(Delta):
+    """The budget group's recurrence.Schedule was replaced: old is the schedule before the edit."""
+
+    __slots__ = ('schedule', 'old')
+
+    def __init__(self, schedule, old):
+        self.schedule = schedule
+        self.old = old
+
+    def apply(self, model):
+        model.template_data['schedule'] = self.schedule
+
+    def inverse(self):
+        return ScheduleChanged(self.old, self.schedule)
+
+
+class OccurrencesAdded(Delta):
+    """
+    Occurrences of recurring rules were added to a budget's transactions at index when it was viewed.
+
+    keys are the (rule id, date) pairs marked as added in the schedule. Undoing removes the rows
+    but leaves the occurrences marked, as if the generated rows had been deleted by hand, so viewing
+    the budget again doesn't add them back and the rows can still be redone.
+    """
+
+    __slots__ = ('budget', 'index', 'rows', 'keys')
+
+    def __init__(self, budget, index, rows, keys):
+        self.budget = budget
+        self.index = index
+        self.rows = tuple(rows)
+        self.keys = tuple(keys)
+
+    def apply(self, model):
+        RowsInserted(self.budget, 'transactions', self.index, self.rows).apply(model)
+        model.template_data['schedule'] = model.schedule.mark(self.budget, self.keys)
+
+    def inverse(self):
+        return RowsDeleted(self.budget, 'transactions', self.index, self.rows)
+
+
+class Batch(Delta):
+    """Several deltas applied in order as a single edit."""
+
+    __slots__ = ('deltas',)
+
+    def __init__(self, deltas):
+        self.deltas = tuple(deltas)
+
+    def apply(self, model):
+        for delta in self.deltas:
+            delta.apply(model)
+
+    def inverse(self):
+        return Batch(delta.inverse() for delta in reversed(self.deltas))
+
+
+class CommandLog:
+    """Unlimited undo and redo stacks of deltas. Recording a new edit forgets everything undone."""
+
+    def __init__(self):
+        self.undo_stack = []
+        self.redo_stack = []
+
+    def record(self, delta):
+        self.undo_stack.append(delta)
+        self.redo_stack.clear()
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+
+    @property
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    @property
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def undo(self, model):
+        """Revert the latest edit. Returns its delta, or None if there is nothing to undo."""
+
+        if not self.undo_stack:
+            return None
+        delta = self.undo_stack.pop()
+        delta.inverse().apply(model)
+        self.redo_stack.append(delta)
+        return delta
+
+    def redo(self, model):
+        """Apply the latest undone edit again. Returns its delta, or None if there is nothing to redo."""
+
+        if not self.redo_stack:
+            return None
+        delta = self.redo_stack.pop()
+        delta.apply(model)
+        self.undo_stack.append(delta)
+        return delta
@@ -0,0 +1,178 @@
+"""
+Opt-in timing of the callbacks dictionary.
+
+Every user action goes through Application.callbacks, so wrapping its entries is enough to see
+where time goes. Instrumentation.instrument replaces each callback with a wrapper recording its
+wall time and, when memory tracing is on, the change in memory traced by tracemalloc. Only the
+most recent samples of each callback are kept, so memory use stays flat however long the
+application runs.
+
+Start the application with --instrument to enable it. The Help menu's Performance dialog shows
+the statistics and can save them as JSON.
+"""
+
+import functools
+import json
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+
+
+class RollingHistogram:
+    """Keeps the last size samples of a measurement and summarizes them."""
+
+    BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)  # upper bounds, last bucket is open
+
+    def __init__(self, size=512):
+        self.samples = deque(maxlen=size)
+
+    def add(self, value):
+        self.samples.append(value)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def percentile(self, fraction):
+        """Return the sample below which the given fraction of samples lie, or 0 without samples."""
+
+        if not self.samples:
+            return 0
+        ordered = sorted(self.samples)
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+    def buckets(self):
+        """Return how many samples fall at or below each bound of BUCKETS, with a final open bucket."""
+
+        counts = [0] * (len(self.BUCKETS) + 1)
+        for value in self.samples:
+            for i, bound in enumerate(self.BUCKETS):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+        return counts
+
+    def summary(self):
+        if not self.samples:
+            return {'samples': 0}
+        return {
+            'samples': len(self.samples),
+            'mean': sum(self.samples) / len(self.samples),
+            'min': min(self.samples),
+            'p50': self.percentile(0.5),
+            'p90': self.percentile(0.9),
+            'p99': self.percentile(0.99),
+            'max': max(self.samples),
+        }
+
+
+class CallbackStats:
+    """Statistics of a single callback."""
+
+    def __init__(self, window):
+        self.calls = 0
+        self.errors = 0
+        self.total_time = 0.0  # milliseconds over every call, not just the window
+        self.time = RollingHistogram(window)  # milliseconds
+        self.memory = RollingHistogram(window)  # change in traced kilobytes
+        self.peak_memory = RollingHistogram(window)  # traced kilobytes above the starting point at the peak
+
+    def to_dict(self):
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'total_ms': self.total_time,
+            'time_ms': self.time.summary(),
+            'time_buckets_ms': dict(zip([*map(str, RollingHistogram.BUCKETS), 'more'], self.time.buckets())),
+            'memory_kb': self.memory.summary(),
+            'peak_memory_kb': self.peak_memory.summary(),
+        }
+
+
+class Instrumentation:
+    """
+    Wraps callbacks to record how long they take and how much memory they allocate.
+
+    Callbacks may call each other through the callbacks dictionary. Each one is timed separately,
+    but tracemalloc's peak is only reset by the outermost call so nested calls don't disturb it.
+    """
+
+    def __init__(self, trace_memory=True, window=512):
+        self.trace_memory = trace_memory
+        self.window = window
+        self.stats = {}  # callback name -> CallbackStats
+        self.throttles = {}  # name -> throttle.Throttle whose event counts are reported alongside
+        self.started = datetime.now()
+        self._depth = 0
+
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def instrument(self, callbacks):
+        """Replace every function in a callbacks dictionary with a timed wrapper, in place."""
+        for name, func in callbacks.items():
+            callbacks[name] = self.wrap(name, func)
+        return callbacks
+
+    def wrap(self, name, func):
+        """Return a wrapper around func recording its statistics under name."""
+
+        self.stats.setdefault(name, CallbackStats(self.window))
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stats = self.stats[name]
+            outermost = self._depth == 0
+            self._depth += 1
+            if self.trace_memory:
+                if outermost:
+                    tracemalloc.reset_peak()
+                memory_before = tracemalloc.get_traced_memory()[0]
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                stats.errors += 1
+                raise
+            finally:
+                elapsed = (time.perf_counter() - start) * 1000
+                self._depth -= 1
+                stats.calls += 1
+                stats.total_time += elapsed
+                stats.time.add(elapsed)
+                if self.trace_memory:
+                    current, peak = tracemalloc.get_traced_memory()
+                    stats.memory.add((current - memory_before) / 1024)
+                    if outermost:
+                        stats.peak_memory.add((peak - memory_before) / 1024)
+
+        return wrapper
+
+    def watch_throttle(self, name, throttle):
+        """Report how many events a Throttle received, passed on and collapsed under name."""
+        self.throttles[name] = throttle
+
+    def reset(self):
+        """Forget every sample while keeping the wrappers in place."""
+        self.stats = {name: CallbackStats(self.window) for name in self.stats}
+        for throttle in self.throttles.values():
+            throttle.reset_stats()
+        self.started = datetime.now()
+
+    def snapshot(self):
+        """Return the statistics of every callback which has been called as a dictionary."""
+        return {
+            'started': self.started.isoformat(timespec='seconds'),
+            'taken': datetime.now().isoformat(timespec='seconds'),
+            'trace_memory': self.trace_memory,
+            'window': self.window,
+            'callbacks': {name: stats.to_dict() for name, stats in sorted(self.stats.items()) if stats.calls},
+            'throttles': {name: throttle.stats() for name, throttle in sorted(self.throttles.items())},
+        }
+
+    def dump(self, filepath):
+        """Write snapshot to a JSON file."""
+        with open(filepath, mode='w') as json_file:
+            json.dump(self.snapshot(), json_file, indent=2)
@@ -11,7 +11,7 @@ class MainMenu(tk.Menu):
 
         # set up menus
         self.menu_file = tk.Menu(self)
-        self.menu_edit = tk.Menu(self)
+        self.menu_edit = tk.Menu(self, postcommand=self.update_edit_menu)
         self.menu_options = tk.Menu(self)
         self.menu_view = tk.Menu(self)
         self.menu_help = tk.Menu(self)
@@ -28,17 +28,39 @@ class MainMenu(tk.Menu):
         self.menu_file.add_separator()
         self.menu_file.add_command(label="Exit", command=self.master.destroy)
 
+        # add items to edit menu
+        self.menu_edit.add_command(label="Undo", command=self.callbacks["undo"], accelerator="Ctrl+Z")
+        self.menu_edit.add_command(label="Redo", command=self.callbacks["redo"], accelerator="Ctrl+Y")
+
         # add items to options menu
         self.menu_options.add_command(label="Add New Expense Category...", command=self.callbacks["add_category"])
         self.menu_options.add_command(label="Add New Job...", command=self.callbacks["add_job"])
         self.menu_options.add_command(label="Add New Transaction...", command=self.callbacks["add_transaction"])
+        self.menu_options.add_command(label="Add Several Transactions...", command=self.callbacks["add_transactions"])
+        self.menu_options.add_separator()
+        self.menu_options.add_command(label="Insert Budget After Current...", command=self.callbacks["insert_budget"])
+        self.menu_options.add_command(label="Rename Budget...", command=self.callbacks["rename_budget"])
+        self.menu_options.add_command(label="Remove Budget", command=self.callbacks["delete_budget"])
+        self.menu_options.add_separator()
+        self.menu_options.add_command(label="Recurring Transactions...", command=self.callbacks["edit_recurring_rules"])
+        self.menu_options.add_command(label="Income Tax...", command=self.callbacks["edit_tax_settings"])
+        self.rollover = tk.BooleanVar(value=self.callbacks["get_rollover"]())
+        self.menu_options.add_checkbutton(
+            label="Roll Over Category Balances",
+            variable=self.rollover,
+            command=lambda: self.callbacks["set_rollover"](self.rollover.get())
+        )
 
         # add items to view menu
         self.menu_view.add_command(label="Home Page", command=lambda: self.callbacks['change_view']('home_page'))
         self.menu_view.add_command(label="Budget View", command=lambda: self.callbacks['change_view']('budget_view'))
+        self.menu_view.add_separator()
+        self.menu_view.add_command(label="Jump to Budget...", command=self.callbacks["jump_to_budget"])
+        self.menu_view.add_command(label="Cash Flow Forecast...", command=self.callbacks["show_forecast"])
 
         # add items to help menu
         self.menu_help.add_command(label="Help", command=lambda: print("Coming soon..."))
+        self.menu_help.add_command(label="Performance...", command=self.callbacks["show_performance"])
         self.menu_help.add_separator()
         self.menu_help.add_command(label="About", command=lambda: print("Coming soon..."))
         
@@ -49,6 +71,12 @@ class MainMenu(tk.Menu):
         self.add_cascade(menu=self.menu_view, label="View")
         self.add_cascade(menu=self.menu_help, label="Help")
 
+    def update_edit_menu(self):
+        """Enable Undo and Redo only when there is something to undo or redo. Runs as the menu opens."""
+        can_undo, can_redo = self.callbacks["get_undo_state"]()
+        self.menu_edit.entryconfig("Undo", state="normal" if can_undo else "disabled")
+        self.menu_edit.entryconfig("Redo", state="normal" if can_redo else "disabled")
+
     def enable_quick_save(self):
         self.menu_file.entryconfig("Save", state="normal")
 
@@ -2,26 +2,369 @@ import os
 import shutil
 import json
 import pickle
-import pandas as pd
-from decimal import Decimal
+import tempfile
 from pathlib import Path
 import threading
+import time
+from .ordering import BudgetOrder
+from .money import Money, Rate
+from .history import CommandLog, RowInserted, RowDeleted, RowReplaced, RowsInserted
+from .history import BudgetAdded, BudgetRemoved, BudgetRenamed, ScheduleChanged, OccurrencesAdded, Batch
+from .persistent import PMap
+from .recurrence import Schedule, EMPTY_SCHEDULE
+from .records import Job, ExpenseCategory, Transaction, Budget, TABLE_RECORDS, budget_from_dicts, budget_to_dicts
+from .strings import StringTable
+from .summaries import summary_path, summary_json
+from .validators import table_errors
+
+
+def atomic_write(filepath, data):
+    """
+    Write bytes or text to a file so that readers only ever see the old or the new contents.
+
+    The data goes to a temporary file in the same directory which then replaces filepath.
+    """
+
+    filepath = Path(filepath)
+    mode = 'wb' if isinstance(data, bytes) else 'w'
+    fd, temporary_path = tempfile.mkstemp(dir=filepath.parent, prefix=f".{filepath.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode) as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary_path, filepath)
+    except BaseException:
+        try:
+            os.unlink(temporary_path)
+        except FileNotFoundError:
+            pass
+        raise
 
 
 class ProjectModel:
-    """A class for interacting with external files."""
+    """
+    A class for interacting with external files.
+
+    template_data is the current template or budget group. Its budgets, their tables and a group's
+    budget mapping are persistent containers and its order is only ever replaced, never edited, so
+    every change goes through the methods below which store a new version. snapshot therefore
+    gives worker threads a consistent copy in O(1). Edits are made by applying deltas from
+    history.py, which are recorded in history for undo and redo.
+    """
+
+    TEMPLATE_CACHE_VERSION = 2  # bump whenever the records or the cache layout change
 
     def __init__(self, master, callbacks):
         self.master = master
         self.callbacks = callbacks
 
         self.templates_path = Path("budget_planner", "templates")
+        self.template_cache_path = Path(self.templates_path, "default_template.cache")
         self.budgets_path = Path("budget_planner", "budgets")
         self.budget_data_path = Path("budget_planner", "budget_data")
 
-        # initiate template dictionary and load data from file or default
-        self.template_data = {}
-        self.get_template_data()
+        self.history = CommandLog()
+        self.journal = None  # RecoveryJournal told about every change, if any
+        self.tax_engine = None  # tax.TaxEngine for bracketed income tax, None for each job's flat tax_rate
+        self.rollover_engine = None  # rollover.RolloverEngine when category balances roll over, else None
+
+        # the active template is only read from file once template_data is first needed,
+        # which keeps pandas and the template's csv files out of startup
+        self._template_data = None
+
+    @property
+    def template_data(self):
+        """The current template or budget group. Loads the active template on first access."""
+        if self._template_data is None:
+            self.get_template_data()
+        return self._template_data
+
+    @template_data.setter
+    def template_data(self, data):
+        self._template_data = data
+        self.history.clear()  # edits of the previous template or budget group can't be undone any more
+        if self.journal is not None:
+            self.journal.reset()
+
+    @property
+    def strings(self):
+        """StringTable holding the merchant and category names of the current template or budget group."""
+        return self.template_data['strings']
+
+    def snapshot(self):
+        """
+        Return a consistent copy of template_data which later edits will not change.
+
+        Only the top level dictionary is copied. Its values are immutable or, for the string
+        table, append only, so codes in the snapshot always decode the same way.
+        """
+        return dict(self.template_data)
+
+    @property
+    def schedule(self):
+        """The recurrence.Schedule of the current budget group. Groups saved before schedules existed have none."""
+        return self.template_data.get('schedule', EMPTY_SCHEDULE)
+
+    @property
+    def budget_key(self):
+        """Name of the budget being shown, or None when the template is shown."""
+        data = self.template_data
+        return None if data['type'] == 'template' else data['current_budget']
+
+    @property
+    def current_budget(self):
+        """The Budget being shown: the template itself or the current budget of a budget group."""
+        return self.get_budget(self.budget_key)
+
+    def get_budget(self, name):
+        """Return a budget of the budget group by name, or the template when name is None."""
+        if name is None:
+            return self.template_data['template']
+        return self.template_data['budgets'][name]
+
+    def expected_income_tax(self, name=None):
+        """
+        Return the budgeted income tax in cents of a budget, by default the current one.
+
+        Returns None when no tax table is selected, meaning each job is taxed at its own tax_rate.
+        """
+        if self.tax_engine is None:
+            return None
+        return self.tax_engine.expected_tax(self.template_data, name)
+
+    def category_balances(self, name=None):
+        """
+        Return the available balance in cents of each expense category of a budget, by default the current one.
+
+        Returns None when balances don't roll over, which is always the case for a template.
+        """
+        if self.rollover_engine is None or self.template_data['type'] != 'budget':
+            return None
+        return self.rollover_engine.balances(self.template_data, name)
+
+    def store_budget(self, name, budget):
+        """Store a new version of a budget, or of the template when name is None. The budget becomes current."""
+
+        if name is None:
+            self.template_data['template'] = budget
+        else:
+            self.template_data['budgets'] = self.template_data['budgets'].set(name, budget)
+            self.template_data['current_budget'] = name
+
+    def insert_budget(self, name, position, budget):
+        """Add a budget to the current budget group at a position in its order and make it current."""
+
+        order = self.template_data['order'].insert(position, name)
+        self.template_data['budgets'] = self.template_data['budgets'].set(name, budget)
+        self.template_data['order'] = order
+        self.template_data['current_budget'] = name
+
+    def remove_budget(self, name):
+        """Remove a budget from the current budget group. A neighbour becomes current if it was current."""
+
+        order = self.template_data['order']
+        if self.template_data['current_budget'] == name:
+            self.template_data['current_budget'] = order.next(name) or order.previous(name)
+        self.template_data['budgets'] = self.template_data['budgets'].delete(name)
+        self.template_data['order'] = order.remove(name)
+
+    def relabel_budget(self, old, new):
+        """Rename a budget in the current budget group, keeping its position in the order."""
+
+        order = self.template_data['order'].rename(old, new)
+        budgets = self.template_data['budgets']
+        self.template_data['budgets'] = budgets.delete(old).set(new, budgets[old])
+        self.template_data['order'] = order
+        if 'schedule' in self.template_data:
+            self.template_data['schedule'] = self.template_data['schedule'].renamed(old, new)
+        if self.template_data['current_budget'] == old:
+            self.template_data['current_budget'] = new
+
+    def edit(self, delta):
+        """Apply a delta from history.py to template_data and record it so it can be undone."""
+        delta.apply(self)
+        self.history.record(delta)
+        self._journal(delta)
+
+    def undo(self):
+        """Revert the latest edit. Returns its delta, or None if there was nothing to undo."""
+        delta = self.history.undo(self)
+        if delta is not None:
+            self._journal(delta.inverse())
+        return delta
+
+    def redo(self):
+        """Apply the latest undone edit again. Returns its delta, or None if there was nothing to redo."""
+        delta = self.history.redo(self)
+        if delta is not None:
+            self._journal(delta)
+        return delta
+
+    def _journal(self, delta):
+        if self.journal is not None:
+            self.journal.record(delta, self.snapshot())
+
+    def append_row(self, table, row):
+        """Add a record to the end of a table of the current budget."""
+        self.edit(RowInserted(self.budget_key, table, len(self.current_budget[table]), row))
+
+    def append_rows(self, table, rows):
+        """Add several records to the end of a table of the current budget as a single edit."""
+        self.edit(RowsInserted(self.budget_key, table, len(self.current_budget[table]), rows))
+
+    def insert_row(self, table, index, row):
+        """Insert a record before index in a table of the current budget."""
+        index = min(index, len(self.current_budget[table]))
+        self.edit(RowInserted(self.budget_key, table, index, row))
+
+    def replace_row(self, table, index, row):
+        """Replace the record at index in a table of the current budget and return the old record."""
+        old = self.current_budget[table][index]
+        self.edit(RowReplaced(self.budget_key, table, index, row, old))
+        return old
+
+    def delete_row(self, table, index):
+        """Remove the record at index from a table of the current budget and return it."""
+        old = self.current_budget[table][index]
+        self.edit(RowDeleted(self.budget_key, table, index, old))
+        return old
+
+    def add_budget(self, name, budget, after, period=None):
+        """
+        Add a budget to the current budget group directly after an existing one and make it current.
+
+        :argument
+            name (str): Name of the new budget
+            budget (Budget): Its tables
+            after (str): Name of the budget it follows
+            period (tuple): First and last date the budget covers, None if it has no period. The
+                recurring transactions falling in the period are added to it in the same edit
+        """
+
+        position = self.template_data['order'].index(after) + 1
+        old = self.schedule
+        if period is None and name not in old.periods and name not in old.added:
+            self.edit(BudgetAdded(name, position, budget))
+            return
+        schedule = old.forget(name).with_period(name, period)
+        pending = list(schedule.pending(name))
+        budget = budget.splice_rows('transactions', len(budget.transactions), len(budget.transactions),
+                                    [rule.transaction(day, self.strings) for rule, day in pending])
+        schedule = schedule.mark(name, [(rule.rule_id, day) for rule, day in pending])
+        self.edit(Batch([BudgetAdded(name, position, budget), ScheduleChanged(schedule, old)]))
+
+    def materialize(self, name):
+        """
+        Add the recurring transactions falling in a budget's period which weren't added to it yet.
+
+        Adding is idempotent: each occurrence is added to a budget at most once, so calling this
+        whenever the budget is viewed only ever adds occurrences of new or changed rules. Undoing
+        the addition keeps the occurrences marked as added, see OccurrencesAdded, so the next view
+        doesn't add them again and clear what could be redone.
+
+        :returns
+            int: Number of transactions added
+        """
+
+        if self.template_data['type'] != 'budget':
+            return 0
+        pending = list(self.schedule.pending(name))
+        if pending:
+            rows = [rule.transaction(day, self.strings) for rule, day in pending]
+            index = len(self.get_budget(name).transactions)
+            self.edit(OccurrencesAdded(name, index, rows, [(rule.rule_id, day) for rule, day in pending]))
+        return len(pending)
+
+    def set_period(self, name, period):
+        """
+        Set or clear the period of a budget, adding the recurring transactions falling in it in the same edit.
+
+        :returns
+            int: Number of transactions added
+        """
+
+        added = self._fill(name, self.schedule.with_period(name, period))
+        self.template_data['current_budget'] = name
+        return added
+
+    def _fill(self, name, schedule):
+        """Change the schedule to schedule and add what is pending in a budget as one edit."""
+
+        old = self.schedule
+        pending = list(schedule.pending(name))
+        deltas = []
+        if pending:
+            rows = [rule.transaction(day, self.strings) for rule, day in pending]
+            deltas.append(RowsInserted(name, 'transactions', len(self.get_budget(name).transactions), rows))
+            schedule = schedule.mark(name, [(rule.rule_id, day) for rule, day in pending])
+        deltas.append(ScheduleChanged(schedule, old))
+        self.edit(Batch(deltas))
+        return len(pending)
+
+    def change_rule(self, rule_id, rule, today):
+        """
+        Add, change or remove a recurring rule and update every budget whose period hasn't ended.
+
+        Only the changed rule is expanded. From today on, its old occurrences which are still as
+        they were generated are removed and its new occurrences are added, all as a single edit.
+        Earlier rows and rows the user edited or deleted are left alone.
+
+        :argument
+            rule_id (str): Id of the rule being changed or removed, None when adding a rule
+            rule (RecurringRule): The new version of the rule, None to remove it
+            today (str): First date, as YYYY-MM-DD, which may be changed
+        :returns
+            int: Number of budgets whose transactions changed
+        """
+
+        old = self.schedule
+        old_rule = old.rules.get(rule_id) if rule_id is not None else None
+        schedule = old.without_rule(rule_id) if old_rule is not None else old
+        if rule is not None:
+            schedule = schedule.with_rule(rule)
+
+        strings = self.strings
+        budgets = self.template_data['budgets']
+        current = self.template_data['current_budget']
+        deltas = []
+        changed = 0
+        for name, (first, last) in old.periods.items():
+            if last < today or name not in budgets:
+                continue
+            transactions = budgets[name].transactions
+            first = max(first, today)
+
+            # rows of the old rule still as generated, looked up by date. Occurrences the user edited or
+            # deleted stay marked as added so the new rule doesn't add them again
+            stale = {}
+            if old_rule is not None:
+                added = old.added_to(name)
+                for day in old_rule.occurrences(first, last):
+                    if (rule_id, day) in added:
+                        stale.setdefault(day, []).append(old_rule.transaction(day, strings))
+            removed = []
+            for index in range(len(transactions) - 1, -1, -1):
+                row = transactions[index]
+                if row in stale.get(row.date, ()):
+                    stale[row.date].remove(row)
+                    removed.append(RowDeleted(name, 'transactions', index, row))
+            if removed:
+                schedule = schedule.mark(name, (), [(rule_id, delta.row.date) for delta in removed])
+            pending = list(schedule.pending(name, [rule], since=first)) if rule is not None else []
+            if not removed and not pending:
+                continue
+            deltas.extend(removed)
+            if pending:
+                rows = [rule.transaction(day, strings) for _, day in pending]
+                deltas.append(RowsInserted(name, 'transactions', len(transactions) - len(removed), rows))
+                schedule = schedule.mark(name, [(rule.rule_id, day) for _, day in pending])
+            changed += 1
+
+        deltas.append(ScheduleChanged(schedule, old))
+        self.edit(Batch(deltas))
+        self.template_data['current_budget'] = current  # row deltas make the budget they change current
+        return changed
 
     def get_template_data(self):
         """
@@ -29,74 +372,36 @@ class ProjectModel:
         template with an error or create new default / empty template if no previous template was loaded.
         """
 
-        template = self.load_active_template()
+        strings, template = self.load_active_template()
 
-        self.template_data['type'] = 'template'
-        self.template_data['name'] = 'Template'
+        data = {'type': 'template', 'name': 'Template', 'strings': strings}
 
         if template:
-            self.template_data['template'] = template
+            data['template'] = template
         else:  # use default template
-            template = {
-                # list of dictionaries with name / hourly_pay / hours
+            home, main = strings.code('Home'), strings.code('Main')
+            template = Budget(**{
+                # list of jobs with name / hourly_pay / hours / tax_rate
                 'income_categories': [
-                    {
-                        'name': 'Main',
-                        'hourly_pay': Decimal('15.00'),
-                        'hours': Decimal('120.00'),
-                        'tax_rate': Decimal('0.2')
-                    },
-                    {
-                        'name': 'Other',
-                        'hourly_pay': Decimal('12.00'),
-                        'hours': Decimal('10.00'),
-                        'tax_rate': Decimal('0.15')
-                    }
+                    Job('Main', Money.parse('15.00'), Rate.parse('120.00'), Rate.parse('0.2')),
+                    Job('Other', Money.parse('12.00'), Rate.parse('10.00'), Rate.parse('0.15')),
                 ],
-                # list of dictionaries with category name and category budget
+                # list of expense categories with category name and category budget
                 'expense_categories': [
-                    {
-                        'name': 'Food',
-                        'budget': Decimal('120.00'),
-                    },
-                    {
-                        'name': 'Miscellaneous',
-                        'budget': Decimal('0.00'),
-                    }
+                    ExpenseCategory('Food', Money.parse('120.00')),
+                    ExpenseCategory('Miscellaneous', Money.parse('0.00')),
                 ],
-                # transaction list contains dictionaries with date / location / category / payment / deposit
+                # list of transactions with date / merchant / category / outlay / inflow
                 'transactions': [
-                    {
-                        'date': '1970-01-01',
-                        'merchant': 'Home',
-                        'category': 'Miscelaneous',
-                        'outlay': Decimal('100.00'),
-                        'inflow': Decimal('0.00')
-                    },
-                    {
-                        'date': '1970-01-01',
-                        'merchant': 'Home',
-                        'category': 'Miscellaneous',
-                        'outlay': Decimal('100.00'),
-                        'inflow': Decimal('0.00')
-                    },
-                    {
-                        'date': '1970-01-01',
-                        'merchant': 'Main',
-                        'category': 'Income',
-                        'outlay': Decimal('100.00'),
-                        'inflow': Decimal('900.00')
-                    },
-                    {
-                        'date': '1970-01-01',
-                        'merchant': 'Home',
-                        'category': 'Food',
-                        'outlay': Decimal('50.00'),
-                        'inflow': Decimal('0.00')
-                    }
+                    Transaction('1970-01-01', home, strings.code('Miscelaneous'), Money.parse('100.00'), Money.parse('0.00')),
+                    Transaction('1970-01-01', home, strings.code('Miscellaneous'), Money.parse('100.00'), Money.parse('0.00')),
+                    Transaction('1970-01-01', main, strings.code('Income'), Money.parse('100.00'), Money.parse('900.00')),
+                    Transaction('1970-01-01', home, strings.code('Food'), Money.parse('50.00'), Money.parse('0.00')),
                 ]
-            }
-            self.template_data['template'] = template
+            })
+            data['template'] = template
+
+        self.template_data = data
 
     @staticmethod
     def initiate_directory(directory):
@@ -108,9 +413,81 @@ class ProjectModel:
             pass
 
     def save_as_pickle(self, fp):
-        """Save current budget or template as named pickle binary file."""
+        """Save current budget or template as named pickle binary file, along with its summary sidecar."""
+        data = self.snapshot()
+        income_tax = self.expected_income_tax()
         with open(fp, 'wb') as f:
-            pickle.dump(self.template_data, f)
+            pickle.dump(self.to_storable(data), f)
+        if self.journal is not None:
+            self.journal.reset()  # everything journaled so far is in the file now
+        try:
+            atomic_write(summary_path(fp), summary_json(fp, data, income_tax))
+        except OSError as error:
+            print(f"Could not write summary: {error}")
+
+    @staticmethod
+    def to_storable(data):
+        """
+        Return a copy of template or budget group data using only plain python containers.
+
+        Records become dictionaries and a budget group's order becomes a list, which is the format
+        pickled files have always used. The string table is saved as its list of strings so that
+        loading the file hands out the same codes again.
+        """
+
+        storable = dict(data)
+        strings = storable['strings']
+        storable['strings'] = strings.to_list()
+        if 'order' in storable:
+            storable['order'] = list(storable['order'])
+        if 'template' in storable:
+            storable['template'] = budget_to_dicts(storable['template'], strings)
+        if 'budgets' in storable:
+            storable['budgets'] = {k: budget_to_dicts(v, strings) for k, v in storable['budgets'].items()}
+        if 'schedule' in storable:
+            storable['schedule'] = storable['schedule'].to_dict()
+        return storable
+
+    @staticmethod
+    def from_storable(data):
+        """
+        Inverse of to_storable. Builds records and wraps a budget group's order in a BudgetOrder.
+
+        Files written before string tables existed have no 'strings' entry and get a fresh table.
+        """
+
+        if not isinstance(data, dict):
+            return data
+        strings = data['strings'] = StringTable(data.get('strings', ()))
+        if 'order' in data:
+            data['order'] = BudgetOrder(data['order'])
+        if 'template' in data:
+            data['template'] = budget_from_dicts(data['template'], strings)
+        if 'budgets' in data:
+            data['budgets'] = PMap({k: budget_from_dicts(v, strings) for k, v in data['budgets'].items()})
+        if 'schedule' in data:
+            data['schedule'] = Schedule.from_dict(data['schedule'])
+        return data
+
+    def rename_budget(self, old, new):
+        """Rename a budget in the current budget group, keeping its position in the order."""
+        self.edit(BudgetRenamed(new, old))
+
+    def delete_budget(self, name):
+        """
+        Remove a budget from the current budget group.
+
+        :argument
+            name (str): Name of the budget to remove
+        :returns
+            str: Name of the budget which is current afterwards
+        """
+
+        order = self.template_data['order']
+        if len(order) < 2:
+            raise ValueError("A budget group must contain at least one budget.")
+        self.edit(BudgetRemoved(name, order.index(name), self.template_data['budgets'][name]))
+        return self.template_data['current_budget']
 
     def save_template_as_csv(self):
         """Save current budget as a template."""
@@ -118,69 +495,168 @@ class ProjectModel:
         self.initiate_directory(self.templates_path)
         self.initiate_directory(Path(self.templates_path, "default_template"))
 
+        strings = self.template_data['strings']
         data_groups = ['income_categories', 'expense_categories', 'transactions']
         file_names = ['income.csv', 'expense.csv', 'transaction.csv']
         for i in range(3):
-            df = pd.DataFrame(self.template_data['template'][data_groups[i]])
+            df = self.table_to_dataframe(data_groups[i], self.template_data['template'][data_groups[i]], strings)
             filepath = Path(self.templates_path, 'default_template', file_names[i])
             df.to_csv(filepath, index=False)
+        self.save_strings(Path(self.templates_path, 'default_template'), strings)
+        self.save_template_cache(strings, self.template_data['template'])
+
+    @staticmethod
+    def table_to_dataframe(table, rows, strings):
+        """Build a DataFrame from a table of records, keeping the columns even when the table is empty."""
+
+        import pandas as pd
+
+        return pd.DataFrame([row.to_dict(strings) for row in rows], columns=TABLE_RECORDS[table].columns())
+
+    @staticmethod
+    def save_strings(directory_path, strings):
+        """Write a string table to strings.csv in the given directory, one string per code in code order."""
+
+        import pandas as pd
+
+        pd.DataFrame({'string': strings.to_list()}, columns=['string']).to_csv(
+            Path(directory_path, "strings.csv"), index_label='code')
+
+    @staticmethod
+    def load_strings(directory_path):
+        """
+        Load a string table written by save_strings.
+
+        A missing or empty strings.csv gives an empty table; codes are then handed out as the
+        transaction files are read.
+        """
+
+        import pandas as pd
+
+        try:
+            df = pd.read_csv(Path(directory_path, "strings.csv"), index_col='code', dtype={'string': str},
+                             keep_default_na=False)
+        except (FileNotFoundError, pd.errors.EmptyDataError):
+            return StringTable()
+        return StringTable(df.sort_index()['string'])
 
     @staticmethod
     def load_pickle(fp):
         """Load budget or template from a given directory."""
         with open(fp, 'rb') as f:
             try:
-                result = pickle.load(f)
+                result = ProjectModel.from_storable(pickle.load(f))
             except pickle.UnpicklingError:
                 result = 'loading_error'
         return result
 
     def load_active_template(self):
-        """Load currently active budget template"""
+        """
+        Load currently active budget template.
+
+        The parsed template is cached next to its csv files, so pandas is only needed when the
+        files changed since they were last read or saved.
+
+        :returns
+            tuple: The template's StringTable and the template itself
+        """
+
         default_path = Path(self.templates_path, "default_template")
-        return self.load_budget_from_directory(default_path)
+        cached = self.load_template_cache()
+        if cached is not None:
+            return cached
+
+        strings = self.load_strings(default_path)
+        template = self.load_budget_from_directory(default_path, strings)
+        self.save_template_cache(strings, template)
+        return strings, template
+
+    def template_signature(self):
+        """Return the name, modification time and size of each csv file of the active template."""
+
+        signature = []
+        for name in ("income.csv", "expense.csv", "transaction.csv", "strings.csv"):
+            try:
+                stat = os.stat(Path(self.templates_path, "default_template", name))
+            except FileNotFoundError:
+                signature.append((name, None, None))
+            else:
+                signature.append((name, stat.st_mtime_ns, stat.st_size))
+        return signature
+
+    def load_template_cache(self):
+        """Return the cached StringTable and template if the cache matches the csv files, otherwise None."""
 
-    def load_budget_from_directory(self, directory_path):
+        try:
+            with open(self.template_cache_path, 'rb') as f:
+                cache = pickle.load(f)
+            if cache['version'] != self.TEMPLATE_CACHE_VERSION or cache['signature'] != self.template_signature():
+                return None
+            return StringTable(cache['strings']), cache['template']
+        except Exception:  # a missing, stale or unreadable cache just means reading the csv files
+            return None
+
+    def save_template_cache(self, strings, template):
+        """Cache a parsed template along with the signature of the csv files it matches."""
+
+        cache = {
+            'version': self.TEMPLATE_CACHE_VERSION,
+            'signature': self.template_signature(),
+            'strings': strings.to_list(),
+            'template': template,
+        }
+        try:
+            self.initiate_directory(self.templates_path)
+            atomic_write(self.template_cache_path, pickle.dumps(cache, protocol=pickle.HIGHEST_PROTOCOL))
+        except OSError as error:
+            print(f"Could not write template cache: {error}")
+
+    def load_budget_from_directory(self, directory_path, strings):
         """
         Load income, expense, and transaction .csv files from given directory and returns a dictionary.
 
         :argument
             directory_path (Path): A path pointing to directory to load files from
+            strings (StringTable): Table merchant and category names are encoded into
         :returns
-            dict: A dictionary containing each .csv file load as a list of dictionaries
+            Budget: The budget with each .csv file loaded as a table of records
         :exception
             FileNotFoundError: When loading a missing .csv we initiate an empty dataframe
             pd.errors.EmptyDataError: When loading an empty .csv file we initiate an empty dataframe
         """
 
+        import pandas as pd
+
         filepaths = [
             Path(directory_path, "income.csv"),
             Path(directory_path, "expense.csv"),
             Path(directory_path, "transaction.csv"),
         ]
-        dtypes = [
-            {"name": str},
-            {"name": str},
-            {"date": str, "merchant": str, "category": str},
-        ]
-        converters = [
-            {"hourly_pay": Decimal, "hours": Decimal, "tax_rate": Decimal},
-            {"budget": Decimal},
-            {"outlay": Decimal, "inflow": Decimal},
-        ]
-
         self.initiate_directory(self.templates_path)
         self.initiate_directory(Path(self.templates_path, "default_template"))
 
-        lods = []  # list of a list of dictionaries
+        tables = ['income_categories', 'expense_categories', 'transactions']
+
+        lors = []  # list of a list of records
         for i in range(3):
             try:
-                df = pd.read_csv(filepaths[i], index_col=False, dtype=dtypes[i], converters=converters[i])
+                # every column is read as text, checked with the rules of validators.py a column at a time
+                # and parsed by the records themselves
+                df = pd.read_csv(filepaths[i], index_col=False, dtype=str, keep_default_na=False)
             except (FileNotFoundError, pd.errors.EmptyDataError):
                 df = pd.DataFrame()
-            lods.append(df.to_dict('records'))
-
-        return {"income_categories": lods[0], "expense_categories": lods[1], "transactions": lods[2]}
+            columns = {column: df[column].tolist() for column in df.columns}
+            errors = table_errors(tables[i], columns)
+            for row, column, error in errors:
+                print(f"{filepaths[i]} row {row + 1} {column} : {error} {columns[column][row]!r}, skipping the row")
+            invalid = {row for row, _, _ in errors}  # parsing these would raise, the rest of the file still loads
+            record_type = TABLE_RECORDS[tables[i]]
+            lors.append([
+                record_type.from_dict(row, strings)
+                for index, row in enumerate(df.to_dict('records')) if index not in invalid
+            ])
+
+        return Budget(income_categories=lors[0], expense_categories=lors[1], transactions=lors[2])
 
     def save_budget_group(self, filepath):
         """Allows user to save a budget grouping to a directory."""
@@ -211,6 +687,7 @@ class ProjectModel:
                 'name': self.template_data['name'],
                 'current_budget': self.template_data['current_budget'],
                 'order': order_lod,
+                'schedule': self.schedule.to_dict(),
             }
 
             self.initiate_directory(budget_group_path)
@@ -218,13 +695,17 @@ class ProjectModel:
             with open(config_fp, mode='w') as json_file:
                 json.dump(config_file, json_file)
 
+            # save the string table shared by every budget of the group
+            self.save_strings(budget_group_path, self.template_data['strings'])
+
             # save data fields
             data_groups = ['income_categories', 'expense_categories', 'transactions']
             file_names = ['income.csv', 'expense.csv', 'transaction.csv']
             for d in order_lod:
                 self.initiate_directory(Path(budget_group_path, d['dirname']))
                 for i in range(3):
-                    df = pd.DataFrame(self.template_data['budgets'][d['name']][data_groups[i]])
+                    rows = self.template_data['budgets'][d['name']][data_groups[i]]
+                    df = self.table_to_dataframe(data_groups[i], rows, self.template_data['strings'])
                     fp = Path(budget_group_path, d['dirname'], file_names[i])
                     df.to_csv(fp, index=False)
 
@@ -232,10 +713,14 @@ class ProjectModel:
             # it then removed any subdirectories which are no longer represented in the budget group
             # this could happen as a result of renaming a budget or replacing an entire budget group
             dirlist = [item for item in os.listdir(budget_group_path) if os.path.isdir(Path(budget_group_path, item))]
+            dirnames = {d['dirname'] for d in order_lod}
             for dir_ in dirlist:
-                if dir_ not in [d['dirname'] for d in order_lod]:
+                if dir_ not in dirnames:
                     shutil.rmtree(Path(budget_group_path, dir_))
 
+            if self.journal is not None:
+                self.journal.reset()
+
     def load_budget_group(self, filepath):
         """
         Loads a budget group directory into a python dictionary.
@@ -254,6 +739,8 @@ class ProjectModel:
             bool: Returns a boolean indicating if load as successful
         """
 
+        import pandas as pd
+
         csv_file = pd.read_csv(filepath, index_col=False, header=None)
 
         file_directory = Path(csv_file.iloc[0, 0])
@@ -271,12 +758,15 @@ class ProjectModel:
 
         # step 2: load each directory in config.json based on order
         # if a directory is missing issue a warning
-        data['budgets'] = {}
+        data['strings'] = self.load_strings(file_directory)
+        budgets = {}
         for d in data['order']:
             fp = Path(file_directory, d['dirname'])
-            data['budgets'][d['name']] = self.load_budget_from_directory(fp)
+            budgets[d['name']] = self.load_budget_from_directory(fp, data['strings'])
+        data['budgets'] = PMap(budgets)
 
-        data['order'] = [d['name'] for d in data['order']]
+        data['order'] = BudgetOrder(d['name'] for d in data['order'])
+        data['schedule'] = Schedule.from_dict(data.get('schedule', {}))
         self.template_data = data
 
         return True  # represents load was successful
@@ -290,29 +780,43 @@ class ProjectSettings:
     def __init__(self, master):
         self.master = master
 
-        self.settings_changed = False
         self.settings_path = Path("budget_planner", "settings.json")
+        self.writer = SettingsWriter(self.settings_path)
 
         try:  # initiate settings from file or with empty dictionary as needed
             with open(self.settings_path, mode='r') as json_file:
                 self.settings = json.load(json_file)
-        except FileNotFoundError:
+        except (FileNotFoundError, json.JSONDecodeError):
             self.settings = {}
 
         self.settings.setdefault('window_size', '1280x720')
         self.settings.setdefault('recent_files', [])
         self.settings.setdefault('current_file_filepath', '')
+        self.settings.setdefault('tax_table', '')  # name of the tax table in use, '' for flat tax rates
+        self.settings.setdefault('periods_per_year', 12)
+        self.settings.setdefault('rollover', False)  # whether category balances roll over between budgets
         self.settings['current_file_filepath'] = ''  # for now this ensures default view has no associated filepath
 
+        if not os.path.exists(self.settings_path):
+            self.settings_changed()
+
+    def settings_changed(self):
+        """Hand the current settings to the writer thread, which saves them once changes stop arriving."""
+        self.writer.submit(self.settings)
+
+    def close(self):
+        """Write any pending change and stop the writer thread. Called when the application exits."""
+        self.writer.close()
+
     def update_current_file_filepath(self, fp):
         """Stores a filepath in settings dictionary with key current_file_filepath."""
         self.settings['current_file_filepath'] = fp
-        self.settings_changed = True
+        self.settings_changed()
 
     def reset_current_file_filepath(self):
         """Reset settings dictionary by associating current_file_filepath's key to an empty string."""
         self.settings['current_file_filepath'] = ''
-        self.settings_changed = True
+        self.settings_changed()
 
     def update_recent_files(self, budget_type, fp):
         """Method to add most recent file to beginning of recent_files list."""
@@ -330,38 +834,101 @@ class ProjectSettings:
 
         # add list_input to the front of the list
         self.settings['recent_files'].insert(0, list_input)
-        self.settings_changed = True
+        self.settings_changed()
 
     def remove_from_recent_files(self, indices):
         indices.sort(reverse=True)
         for index in indices:
             self.settings['recent_files'].pop(index)
-        self.settings_changed = True
+        self.settings_changed()
 
     def clear_recent_files(self):
         self.settings['recent_files'] = []
-        self.settings_changed = True
+        self.settings_changed()
 
     def get_recent_files(self):
         return self.settings['recent_files']
 
     def set_window_size(self, width, height):
-        self.settings_changed = self.settings['window_size'] != f"{width}x{height}"
-        if self.settings_changed:
+        if self.settings['window_size'] != f"{width}x{height}":
             self.settings['window_size'] = f"{width}x{height}"
-            self.settings_changed = True
-
-    def update_settings_file(self):
-        if not os.path.exists(self.settings_path):
-            thread = threading.Thread(target=self._save_settings)
-            thread.start()
-            self.settings_changed = False
-        else:
-            if self.settings_changed:
-                thread = threading.Thread(target=self._save_settings)
-                thread.start()
-                self.settings_changed = False
-
-    def _save_settings(self):
-        with open(self.settings_path, mode='w') as json_file:
-            json.dump(self.settings, json_file)
+            self.settings_changed()
+
+    def set_tax_settings(self, table_name, periods_per_year):
+        self.settings['tax_table'] = table_name
+        self.settings['periods_per_year'] = periods_per_year
+        self.settings_changed()
+
+    def set_rollover(self, enabled):
+        self.settings['rollover'] = enabled
+        self.settings_changed()
+
+
+class SettingsWriter:
+    """
+    Saves settings.json from a single long-lived thread.
+
+    submit serializes the settings on the calling thread, so the writer never reads a dictionary
+    which is being changed, and wakes the thread. The thread waits until no new submission has
+    arrived for DELAY seconds, so a burst of changes such as dragging the window edge results in a
+    single write, but never waits longer than MAX_DELAY. Each write goes through atomic_write.
+    """
+
+    DELAY = 0.5  # seconds without changes before writing
+    MAX_DELAY = 2.0  # seconds a change may wait while others keep arriving
+
+    def __init__(self, path):
+        self.path = path
+        self.writes = 0
+
+        self._pending = None  # latest serialized settings not written yet
+        self._lock = threading.Lock()  # guards _pending
+        self._write_lock = threading.Lock()  # one write at a time
+        self._wake = threading.Event()
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, settings):
+        with self._lock:
+            self._pending = json.dumps(settings)
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            if self._closed:
+                return
+            first_change = time.monotonic()
+            self._wake.clear()
+            # keep waiting while changes keep arriving, up to MAX_DELAY
+            while self._wake.wait(self.DELAY) and not self._closed:
+                if time.monotonic() - first_change >= self.MAX_DELAY:
+                    break
+                self._wake.clear()
+            if self._closed:
+                return
+            self.flush()
+
+    def flush(self):
+        """Write the pending settings now, if there are any."""
+
+        with self._write_lock:
+            with self._lock:
+                data, self._pending = self._pending, None
+            if data is None:
+                return
+            try:
+                atomic_write(self.path, data)
+                self.writes += 1
+            except OSError as error:
+                print(f"Could not save settings: {error}")
+
+    def close(self):
+        """Stop the thread and write whatever is still pending."""
+
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
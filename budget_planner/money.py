@@ -0,0 +1,201 @@
+"""
+Fixed point amounts used throughout the model and views.
+
+Money holds a whole number of cents and Rate holds an exact decimal multiplier such as hours
+worked or a tax rate. Adding and comparing Money is plain integer arithmetic.
+
+Multiplying Money by rates follows one rule: the exact product of the cents and every rate is
+computed with integers and rounded once, to the nearest cent with ties going to the even cent
+(the same rounding Python's round uses). So hourly_pay.times(hours, tax_rate) rounds
+hourly_pay * hours * tax_rate a single time rather than rounding the wages first.
+
+Decimal is only used at the edges: when loading CSV files or old pickles and when saving them.
+"""
+
+from decimal import Decimal
+
+
+def _round_half_even(numerator, denominator):
+    """Divide two integers rounding to the nearest integer with ties going to the even integer."""
+
+    quotient, remainder = divmod(numerator, denominator)
+    twice = 2 * remainder
+    if twice > denominator or (twice == denominator and quotient % 2 == 1):
+        quotient += 1
+    return quotient
+
+
+def _parse_decimal(value):
+    """Return a string, int or Decimal as an exact (integer, exponent) pair meaning integer * 10**exponent."""
+
+    if isinstance(value, int):
+        return value, 0
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value).strip())
+    if not value.is_finite():
+        raise ValueError(f"{value} is not a finite number")
+    sign, digits, exponent = value.as_tuple()
+    integer = int(''.join(map(str, digits)) or '0')
+    return (-integer if sign else integer), exponent
+
+
+class Money:
+    """An amount of money stored as an integer number of cents."""
+
+    __slots__ = ('cents',)
+
+    def __init__(self, cents=0):
+        self.cents = cents
+
+    @classmethod
+    def parse(cls, value):
+        """
+        Build Money from a string, int, Decimal or Money.
+
+        Strings and Decimals with more than two decimal places are rounded to the nearest cent.
+        """
+
+        if isinstance(value, Money):
+            return value
+        integer, exponent = _parse_decimal(value)
+        if exponent >= -2:
+            return cls(integer * 10 ** (exponent + 2))
+        return cls(_round_half_even(integer, 10 ** (-exponent - 2)))
+
+    def to_decimal(self):
+        """Return the amount as a Decimal with two decimal places, for saving."""
+        return Decimal(self.cents).scaleb(-2)
+
+    def times(self, *rates):
+        """Return this amount multiplied by every rate, rounded once to the nearest cent."""
+
+        numerator = self.cents
+        denominator = 1
+        for rate in rates:
+            numerator *= rate.value
+            denominator *= 10 ** rate.places
+        return Money(_round_half_even(numerator, denominator))
+
+    def __add__(self, other):
+        if isinstance(other, Money):
+            return Money(self.cents + other.cents)
+        if other == 0:  # lets sum() start from 0
+            return self
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, Money):
+            return Money(self.cents - other.cents)
+        return NotImplemented
+
+    def __neg__(self):
+        return Money(-self.cents)
+
+    def __abs__(self):
+        return Money(abs(self.cents))
+
+    def __bool__(self):
+        return self.cents != 0
+
+    def __eq__(self, other):
+        if isinstance(other, Money):
+            return self.cents == other.cents
+        if other == 0:
+            return self.cents == 0
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.cents)
+
+    @staticmethod
+    def _cents_of(other):
+        """Return the cents to order against, None unless other is Money or 0 as in __add__."""
+        if isinstance(other, Money):
+            return other.cents
+        if other == 0:
+            return 0
+        return None
+
+    def __lt__(self, other):
+        cents = self._cents_of(other)
+        return NotImplemented if cents is None else self.cents < cents
+
+    def __le__(self, other):
+        cents = self._cents_of(other)
+        return NotImplemented if cents is None else self.cents <= cents
+
+    def __gt__(self, other):
+        cents = self._cents_of(other)
+        return NotImplemented if cents is None else self.cents > cents
+
+    def __ge__(self, other):
+        cents = self._cents_of(other)
+        return NotImplemented if cents is None else self.cents >= cents
+
+    def __str__(self):
+        sign = '-' if self.cents < 0 else ''
+        dollars, cents = divmod(abs(self.cents), 100)
+        return f"{sign}{dollars}.{cents:02d}"
+
+    def __repr__(self):
+        return f"Money('{self}')"
+
+    def __reduce__(self):
+        return Money, (self.cents,)
+
+
+class Rate:
+    """An exact decimal multiplier, e.g. hours worked or a tax rate, stored as value * 10**-places."""
+
+    __slots__ = ('value', 'places')
+
+    def __init__(self, value=0, places=0):
+        self.value = value
+        self.places = places
+
+    @classmethod
+    def parse(cls, value):
+        """Build a Rate from a string, int, Decimal or Rate without any rounding."""
+
+        if isinstance(value, Rate):
+            return value
+        integer, exponent = _parse_decimal(value)
+        if exponent >= 0:
+            return cls(integer * 10 ** exponent, 0)
+        return cls(integer, -exponent)
+
+    def to_decimal(self):
+        """Return the rate as an exact Decimal, for saving."""
+        return Decimal(self.value).scaleb(-self.places)
+
+    def format(self, places=2):
+        """Return the rate as a string rounded to the given number of decimal places."""
+
+        if self.places <= places:
+            scaled = self.value * 10 ** (places - self.places)
+        else:
+            scaled = _round_half_even(self.value, 10 ** (self.places - places))
+        sign = '-' if scaled < 0 else ''
+        whole, fraction = divmod(abs(scaled), 10 ** places)
+        if not places:
+            return f"{sign}{whole}"
+        return f"{sign}{whole}.{fraction:0{places}d}"
+
+    def __eq__(self, other):
+        if isinstance(other, Rate):
+            return self.value * 10 ** other.places == other.value * 10 ** self.places
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.to_decimal())
+
+    def __str__(self):
+        return self.format(self.places)
+
+    def __repr__(self):
+        return f"Rate('{self}')"
+
+    def __reduce__(self):
+        return Rate, (self.value, self.places)
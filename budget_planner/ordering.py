@@ -0,0 +1,170 @@
+from .cumulative import FenwickTree
+from .persistent import PMap
+
+
+class BudgetOrder:
+    """
+    Ordered registry of the budget names in a budget group.
+
+    Names are kept in blocks of at most MAX_BLOCK_SIZE entries. A PMap maps each name to the id of
+    its block and a Fenwick tree over the block sizes gives each block's offset, so membership is
+    O(log32 n) while position lookups, neighbour lookups and inserts anywhere in the order take
+    O(log n) plus the copying described below.
+
+    Like the containers in persistent.py a BudgetOrder is never changed in place: insert, remove
+    and rename return a new order. The new order copies the block it touches, the tuple of block
+    references and the block sizes, and shares everything else including the name index, so a
+    change costs O(n / MAX_BLOCK_SIZE + MAX_BLOCK_SIZE) and the old order stays a valid snapshot.
+
+    It behaves like the list of names it replaces (len, iteration, indexing, in, index) and is
+    converted back to a plain list with to_list whenever the group is written to disk.
+    """
+
+    MAX_BLOCK_SIZE = 128
+
+    __slots__ = ('_blocks', '_ids', '_position', '_block_of', '_sizes', '_length', '_next_id')
+
+    def __init__(self, names=()):
+        names = list(names)
+        if len(set(names)) != len(names):
+            raise ValueError("Budget names must be unique.")
+
+        step = max(self.MAX_BLOCK_SIZE // 2, 1)
+        blocks = tuple(tuple(names[start:start + step]) for start in range(0, len(names), step))
+        block_of = PMap((name, block_id) for block_id, block in enumerate(blocks) for name in block)
+        self._set(blocks, tuple(range(len(blocks))), block_of, len(blocks))
+
+    def _set(self, blocks, ids, block_of, next_id, sizes=None, position=None, length=None):
+        self._blocks = blocks  # tuple of tuples of names
+        self._ids = ids  # id of each block, which stays the same while the block is edited
+        self._position = {block_id: i for i, block_id in enumerate(ids)} if position is None else position
+        self._block_of = block_of  # PMap of name -> id of its block
+        self._sizes = FenwickTree(len(block) for block in blocks) if sizes is None else sizes
+        self._length = sum(len(block) for block in blocks) if length is None else length
+        self._next_id = next_id
+
+    def _replace_block(self, i, block, block_of, length):
+        """Return a new order with block i replaced, or dropped when block is empty."""
+
+        order = BudgetOrder.__new__(BudgetOrder)
+        if not block:
+            blocks = self._blocks[:i] + self._blocks[i + 1:]
+            ids = self._ids[:i] + self._ids[i + 1:]
+            order._set(blocks, ids, block_of, self._next_id)
+        elif len(block) > self.MAX_BLOCK_SIZE:
+            half = len(block) // 2
+            tail_id = self._next_id
+            for moved in block[half:]:
+                block_of = block_of.set(moved, tail_id)
+            blocks = self._blocks[:i] + (block[:half], block[half:]) + self._blocks[i + 1:]
+            ids = self._ids[:i + 1] + (tail_id,) + self._ids[i + 1:]
+            order._set(blocks, ids, block_of, tail_id + 1)
+        else:
+            sizes = self._sizes.copy()
+            sizes.add(i, len(block) - len(self._blocks[i]))
+            blocks = self._blocks[:i] + (block,) + self._blocks[i + 1:]
+            order._set(blocks, self._ids, block_of, self._next_id, sizes, self._position, length)
+        return order
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        for block in self._blocks:
+            yield from block
+
+    def __contains__(self, name):
+        return name in self._block_of
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return self.to_list()[position]
+        if position < 0:
+            position += self._length
+        if not 0 <= position < self._length:
+            raise IndexError("budget position out of range")
+        block_index = self._sizes.find(position)
+        return self._blocks[block_index][position - self._sizes.prefix_sum(block_index)]
+
+    def __eq__(self, other):
+        if isinstance(other, BudgetOrder):
+            return self.to_list() == other.to_list()
+        return self.to_list() == other
+
+    def __repr__(self):
+        return f"BudgetOrder({self.to_list()!r})"
+
+    def __reduce__(self):
+        return BudgetOrder, (self.to_list(),)
+
+    def to_list(self):
+        """Return the names as a plain list, e.g. for pickling or writing config.json."""
+        return [name for block in self._blocks for name in block]
+
+    def _locate(self, name):
+        """Return the position of the block holding name. Raises ValueError if the name is unknown."""
+
+        try:
+            return self._position[self._block_of[name]]
+        except KeyError:
+            raise ValueError(f"{name!r} is not in the budget order") from None
+
+    def index(self, name):
+        """Return the position of a budget name. Raises ValueError if the name is unknown."""
+        i = self._locate(name)
+        return self._sizes.prefix_sum(i) + self._blocks[i].index(name)
+
+    def previous(self, name):
+        """Return the budget name before the given one or None if it is the first."""
+        position = self.index(name)
+        return self[position - 1] if position > 0 else None
+
+    def next(self, name):
+        """Return the budget name after the given one or None if it is the last."""
+        position = self.index(name)
+        return self[position + 1] if position + 1 < self._length else None
+
+    def insert(self, position, name):
+        """Return a copy with a new budget name inserted so it ends up at the given position."""
+
+        if name in self._block_of:
+            raise ValueError(f"{name!r} is already in the budget order")
+        if not self._blocks:
+            return BudgetOrder([name])
+
+        position = min(max(position, 0), self._length)
+        if position == self._length:
+            i = len(self._blocks) - 1
+            offset = len(self._blocks[i])
+        else:
+            i = self._sizes.find(position)
+            offset = position - self._sizes.prefix_sum(i)
+
+        block = self._blocks[i]
+        block = block[:offset] + (name,) + block[offset:]
+        return self._replace_block(i, block, self._block_of.set(name, self._ids[i]), self._length + 1)
+
+    def insert_after(self, existing, name):
+        """Return a copy with a new budget name directly after an existing one."""
+        return self.insert(self.index(existing) + 1, name)
+
+    def append(self, name):
+        """Return a copy with a new budget name at the end."""
+        return self.insert(self._length, name)
+
+    def remove(self, name):
+        """Return a copy without a budget name."""
+
+        i = self._locate(name)
+        block = tuple(other for other in self._blocks[i] if other != name)
+        return self._replace_block(i, block, self._block_of.delete(name), self._length - 1)
+
+    def rename(self, old, new):
+        """Return a copy with a budget given a new name at the same position."""
+
+        if new in self._block_of:
+            raise ValueError(f"{new!r} is already in the budget order")
+        i = self._locate(old)
+        block = tuple(new if other == old else other for other in self._blocks[i])
+        block_of = self._block_of.delete(old).set(new, self._ids[i])
+        return self._replace_block(i, block, block_of, self._length)
@@ -0,0 +1,398 @@
+"""
+Persistent containers used to hold budgets.
+
+Neither container is ever changed in place. Every "change" returns a new container sharing almost
+all of its structure with the old one, so keeping a reference to the old one is a free snapshot:
+a worker thread holding it can keep reading while the Tk thread produces new versions.
+
+PVector is a sequence stored as a tuple of chunks of at most MAX_CHUNK_SIZE items. A change copies
+the chunk it touches and the tuple of chunk references, so it costs O(n / CHUNK_SIZE + CHUNK_SIZE)
+rather than O(n) for copying a list.
+
+PMap is a mapping stored as a hash trie: each level of the trie uses five bits of the key's hash to
+pick one of up to 32 children. A change copies the nodes on the path to the key, i.e. O(log32 n)
+small dictionaries.
+"""
+
+from bisect import bisect_right
+
+
+class PVector:
+    """An immutable sequence with cheap copy-on-write updates."""
+
+    __slots__ = ('_chunks', '_offsets', '_length')
+
+    CHUNK_SIZE = 64  # size of chunks built from an iterable
+    MAX_CHUNK_SIZE = 128  # chunks growing past this through inserts are split in two
+
+    def __init__(self, iterable=()):
+        items = tuple(iterable)
+        size = self.CHUNK_SIZE
+        self._set_chunks(tuple(items[i:i + size] for i in range(0, len(items), size)))
+
+    @classmethod
+    def _from_chunks(cls, chunks):
+        vector = cls.__new__(cls)
+        vector._set_chunks(chunks)
+        return vector
+
+    def _set_chunks(self, chunks):
+        offsets = []
+        total = 0
+        for chunk in chunks:
+            offsets.append(total)
+            total += len(chunk)
+        self._chunks = chunks
+        self._offsets = offsets
+        self._length = total
+
+    def _locate(self, index):
+        """Return the chunk number and the position within that chunk of an item."""
+
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("PVector index out of range")
+        chunk = bisect_right(self._offsets, index) - 1
+        return chunk, index - self._offsets[chunk]
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return PVector(tuple(self)[index])
+        chunk, position = self._locate(index)
+        return self._chunks[chunk][position]
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            yield from chunk
+
+    def __reversed__(self):
+        for chunk in reversed(self._chunks):
+            yield from reversed(chunk)
+
+    def set(self, index, value):
+        """Return a copy with the item at index replaced by value."""
+
+        chunk, position = self._locate(index)
+        old = self._chunks[chunk]
+        vector = PVector.__new__(PVector)
+        vector._chunks = self._chunks[:chunk] + (old[:position] + (value,) + old[position + 1:],) + self._chunks[chunk + 1:]
+        vector._offsets = self._offsets  # sizes are unchanged so the offsets can be shared
+        vector._length = self._length
+        return vector
+
+    def append(self, value):
+        """Return a copy with value added at the end."""
+
+        chunks = self._chunks
+        if chunks and len(chunks[-1]) < self.CHUNK_SIZE:
+            return PVector._from_chunks(chunks[:-1] + (chunks[-1] + (value,),))
+        return PVector._from_chunks(chunks + ((value,),))
+
+    def extend(self, iterable):
+        """Return a copy with every item of iterable added at the end."""
+
+        items = tuple(iterable)
+        if not items:
+            return self
+        chunks = self._chunks
+        if chunks and len(chunks[-1]) < self.CHUNK_SIZE:
+            room = self.CHUNK_SIZE - len(chunks[-1])
+            chunks = chunks[:-1] + (chunks[-1] + items[:room],)
+            items = items[room:]
+        size = self.CHUNK_SIZE
+        return PVector._from_chunks(chunks + tuple(items[i:i + size] for i in range(0, len(items), size)))
+
+    def insert(self, index, value):
+        """Return a copy with value inserted before index, like list.insert."""
+
+        if index < 0:
+            index = max(index + self._length, 0)
+        if index >= self._length:
+            return self.append(value)
+        chunk, position = self._locate(index)
+        old = self._chunks[chunk]
+        new = old[:position] + (value,) + old[position:]
+        if len(new) > self.MAX_CHUNK_SIZE:
+            half = len(new) // 2
+            replacement = (new[:half], new[half:])
+        else:
+            replacement = (new,)
+        return PVector._from_chunks(self._chunks[:chunk] + replacement + self._chunks[chunk + 1:])
+
+    def delete(self, index):
+        """Return a copy without the item at index."""
+
+        chunk, position = self._locate(index)
+        old = self._chunks[chunk]
+        new = old[:position] + old[position + 1:]
+        replacement = (new,) if new else ()
+        return PVector._from_chunks(self._chunks[:chunk] + replacement + self._chunks[chunk + 1:])
+
+    def splice(self, start, stop, items=()):
+        """Return a copy with the items from start up to stop replaced by items, like list[start:stop] = items."""
+
+        if start == stop == self._length:
+            return self.extend(items)
+        values = list(self)
+        values[start:stop] = items
+        return PVector(values)
+
+    def index(self, value):
+        for i, item in enumerate(self):
+            if item == value:
+                return i
+        raise ValueError(f"{value!r} is not in PVector")
+
+    def to_list(self):
+        return list(self)
+
+    def __eq__(self, other):
+        if isinstance(other, (PVector, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return f"PVector({list(self)!r})"
+
+    def __reduce__(self):
+        return PVector, (list(self),)
+
+
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+_HASH_MASK = (1 << 64) - 1
+
+
+class _Node(dict):
+    """A trie node: maps five bits of a hash to a leaf (hash, key, value), a _Node or a _Collision."""
+    __slots__ = ()
+
+
+class _Collision(tuple):
+    """Keys whose 64 bit hashes are identical: (hash, ((key, value), ...))."""
+    __slots__ = ()
+
+
+def _hash(key):
+    return hash(key) & _HASH_MASK
+
+
+def _lookup(node, h, key):
+    shift = 0
+    while True:
+        entry = node.get((h >> shift) & _MASK)
+        if entry is None:
+            raise KeyError(key)
+        if type(entry) is _Node:
+            node = entry
+            shift += _BITS
+        elif type(entry) is _Collision:
+            for k, v in entry[1]:
+                if k == key:
+                    return v
+            raise KeyError(key)
+        else:
+            entry_hash, k, v = entry
+            if entry_hash == h and (k is key or k == key):
+                return v
+            raise KeyError(key)
+
+
+def _assoc(node, h, key, value, shift):
+    """Return a copy of node with key set to value and whether the key is new."""
+
+    fragment = (h >> shift) & _MASK
+    entry = node.get(fragment)
+    new = _Node(node)
+    if entry is None:
+        new[fragment] = (h, key, value)
+        return new, True
+    if type(entry) is _Node:
+        new[fragment], added = _assoc(entry, h, key, value, shift + _BITS)
+        return new, added
+    if type(entry) is _Collision:
+        if entry[0] == h:
+            pairs = tuple(pair for pair in entry[1] if pair[0] != key)
+            new[fragment] = _Collision((h, pairs + ((key, value),)))
+            return new, len(pairs) == len(entry[1])
+        child = _Node({(entry[0] >> (shift + _BITS)) & _MASK: entry})
+        new[fragment], added = _assoc(child, h, key, value, shift + _BITS)
+        return new, added
+    entry_hash, k, v = entry
+    if entry_hash == h:
+        if k is key or k == key:
+            new[fragment] = (h, key, value)
+            return new, False
+        new[fragment] = _Collision((h, ((k, v), (key, value))))
+        return new, True
+    child = _Node({(entry_hash >> (shift + _BITS)) & _MASK: entry})
+    new[fragment], added = _assoc(child, h, key, value, shift + _BITS)
+    return new, added
+
+
+def _dissoc(node, h, key, shift):
+    """Return a copy of node without key, or None if the copy would be empty."""
+
+    fragment = (h >> shift) & _MASK
+    entry = node.get(fragment)
+    if entry is None:
+        raise KeyError(key)
+    if type(entry) is _Node:
+        child = _dissoc(entry, h, key, shift + _BITS)
+        if child is not None and len(child) == 1:
+            only = next(iter(child.values()))
+            if type(only) is not _Node:
+                child = only  # a lone leaf or collision moves back up
+    elif type(entry) is _Collision:
+        pairs = tuple(pair for pair in entry[1] if pair[0] != key)
+        if len(pairs) == len(entry[1]):
+            raise KeyError(key)
+        child = _Collision((h, pairs)) if len(pairs) > 1 else (h, *pairs[0])
+    else:
+        entry_hash, k, v = entry
+        if entry_hash != h or not (k is key or k == key):
+            raise KeyError(key)
+        child = None
+    new = _Node(node)
+    if child is None:
+        del new[fragment]
+    else:
+        new[fragment] = child
+    return new or None
+
+
+def _items(node):
+    for entry in node.values():
+        if type(entry) is _Node:
+            yield from _items(entry)
+        elif type(entry) is _Collision:
+            yield from entry[1]
+        else:
+            yield entry[1], entry[2]
+
+
+def _entry_items(entry):
+    if entry is None:
+        return ()
+    if type(entry) is _Node:
+        return _items(entry)
+    if type(entry) is _Collision:
+        return entry[1]
+    return ((entry[1], entry[2]),)
+
+
+def _changes(old, new):
+    """Yield (key, old value, new value) for the keys of two trie nodes whose values are not identical."""
+
+    for fragment in old.keys() | new.keys():
+        old_entry, new_entry = old.get(fragment), new.get(fragment)
+        if old_entry is new_entry:
+            continue  # shared by both versions
+        if type(old_entry) is _Node and type(new_entry) is _Node:
+            yield from _changes(old_entry, new_entry)
+            continue
+        old_items = dict(_entry_items(old_entry))
+        for key, value in _entry_items(new_entry):
+            old_value = old_items.pop(key, None)
+            if old_value is not value:
+                yield key, old_value, value
+        for key, value in old_items.items():
+            yield key, value, None
+
+
+class PMap:
+    """An immutable mapping with cheap copy-on-write updates. Iteration order is not insertion order."""
+
+    __slots__ = ('_root', '_length')
+
+    def __init__(self, mapping=()):
+        self._root = _Node()
+        self._length = 0
+        items = mapping.items() if hasattr(mapping, 'items') else mapping
+        for key, value in items:
+            self._root, added = _assoc(self._root, _hash(key), key, value, 0)
+            self._length += added
+
+    @classmethod
+    def _from_root(cls, root, length):
+        mapping = cls.__new__(cls)
+        mapping._root = root if root is not None else _Node()
+        mapping._length = length
+        return mapping
+
+    def __getitem__(self, key):
+        return _lookup(self._root, _hash(key), key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        for key, _ in _items(self._root):
+            yield key
+
+    def keys(self):
+        return iter(self)
+
+    def values(self):
+        for _, value in _items(self._root):
+            yield value
+
+    def items(self):
+        return _items(self._root)
+
+    def set(self, key, value):
+        """Return a copy with key mapped to value."""
+        root, added = _assoc(self._root, _hash(key), key, value, 0)
+        return PMap._from_root(root, self._length + added)
+
+    def delete(self, key):
+        """Return a copy without key. Raises KeyError if key is missing."""
+        return PMap._from_root(_dissoc(self._root, _hash(key), key, 0), self._length - 1)
+
+    def update(self, mapping):
+        """Return a copy with every item of mapping set."""
+        result = self
+        for key, value in (mapping.items() if hasattr(mapping, 'items') else mapping):
+            result = result.set(key, value)
+        return result
+
+    def changes(self, old):
+        """
+        Yield (key, value in old, value in self) for every key whose value is not the same object in
+        both maps, with None for a missing value.
+
+        Subtries the two versions share are skipped, so comparing a map with the version it was
+        made from costs time in proportion to the keys changed rather than to the size of the map.
+        """
+        yield from _changes(old._root, self._root)
+
+    def __eq__(self, other):
+        if isinstance(other, (PMap, dict)):
+            if len(self) != len(other):
+                return False
+            missing = object()
+            return all(other.get(key, missing) == value for key, value in self.items())
+        return NotImplemented
+
+    def __repr__(self):
+        return f"PMap({dict(self.items())!r})"
+
+    def __reduce__(self):
+        return PMap, (dict(self.items()),)
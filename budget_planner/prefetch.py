@@ -0,0 +1,122 @@
+import queue
+import threading
+from .aggregation import aggregate_budget
+
+
+class BudgetPrefetcher:
+    """
+    Pre-aggregates the budgets adjacent to the current budget on a worker thread.
+
+    After each navigation the neighbours of the current budget in the group's order are queued for
+    aggregation. Results come back through a thread-safe queue which is polled from the Tk thread
+    with after, so the cache itself is only ever touched by the Tk thread.
+    """
+
+    POLL_INTERVAL = 20  # milliseconds between checks of the result queue
+
+    def __init__(self, master, depth=2):
+        self.master = master
+        self.depth = depth  # number of budgets to prefetch on each side of the current budget
+
+        self.cache = {}  # budget name -> ((income tax, balances), rows produced by aggregate_budget)
+        self.strings = None
+        self.current = None
+        self.wanted = set()
+
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._generation = 0
+        self._outstanding = 0
+        self._poll_id = None
+
+        self._thread = threading.Thread(target=self._work, daemon=True)
+        self._thread.start()
+
+    def navigate(self, order, current, budgets, strings, income_tax=None, balances=None):
+        """
+        Called after each navigation. Queues the neighbours of current which are not cached yet.
+
+        :argument
+            order (list): Budget names in display order
+            current (str): Name of the budget now being displayed
+            budgets (PMap): Budget names mapped to budgets. Budgets are immutable so the worker
+                can read them while the Tk thread keeps editing
+            strings (StringTable): Table the group's transactions are encoded with
+            income_tax (function): Returns the budgeted income tax of a budget by name, None for
+                each job's flat tax_rate
+            balances (function): Returns the available balance of each expense category of a budget
+                by name, None without rollover
+        """
+
+        # every edit replaces budgets, but a budget group keeps its string table until it is replaced
+        if strings is not self.strings:  # a different budget group was loaded or created
+            self.clear()
+            self.strings = strings
+
+        # the budget we are leaving may have been edited so its cached rows can't be trusted
+        self.cache.pop(self.current, None)
+        self.current = current
+        self._generation += 1
+
+        placement = order.index(current)
+        lower = max(placement - self.depth, 0)
+        upper = min(placement + self.depth + 1, len(order))
+        self.wanted = {order[i] for i in range(lower, upper) if i != placement}
+
+        self.cache = {k: v for k, v in self.cache.items() if k in self.wanted}
+        for name in self.wanted.difference(self.cache):
+            tax = income_tax(name) if income_tax is not None else None
+            available = balances(name) if balances is not None else None
+            self._requests.put((self._generation, name, budgets[name], strings, tax, available))
+            self._outstanding += 1
+        self._schedule_poll()
+
+    def take(self, name, income_tax=None, balances=None):
+        """
+        Return and forget the prefetched rows for a budget, or None if they are not ready.
+
+        Income tax and rolled over balances depend on the other budgets of the group, so rows
+        computed with a different income tax or balances than the budget has now are out of date
+        and are dropped too.
+        """
+
+        computed_with, rows = self.cache.pop(name, (None, None))
+        return rows if computed_with == (income_tax, balances) else None
+
+    def clear(self):
+        """Forget everything. Used whenever the budget group itself is replaced."""
+        self._generation += 1
+        self.cache = {}
+        self.strings = None
+        self.current = None
+        self.wanted = set()
+
+    def _work(self):
+        """Worker thread loop. Skips requests made stale by a later navigation."""
+        while True:
+            generation, name, budget, strings, income_tax, balances = self._requests.get()
+            if generation != self._generation:
+                self._results.put((generation, name, None, None))
+                continue
+            try:
+                rows = aggregate_budget(budget, strings, income_tax=income_tax, balances=balances)
+            except Exception:  # a budget which can't be aggregated is simply not cached
+                rows = None
+            self._results.put((generation, name, (income_tax, balances), rows))
+
+    def _schedule_poll(self):
+        if self._poll_id is None and self._outstanding:
+            self._poll_id = self.master.after(self.POLL_INTERVAL, self._poll)
+
+    def _poll(self):
+        """Move finished results into the cache. Runs on the Tk thread."""
+        self._poll_id = None
+        while True:
+            try:
+                generation, name, computed_with, rows = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._outstanding -= 1
+            if rows is not None and generation == self._generation and name in self.wanted:
+                self.cache[name] = (computed_with, rows)
+        self._schedule_poll()
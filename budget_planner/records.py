@@ -0,0 +1,215 @@
+"""
+Slotted record types for the rows of a budget.
+
+Each budget holds three tables: income_categories (a PVector of Job), expense_categories (a
+PVector of ExpenseCategory) and transactions (a PVector of Transaction). Budgets and their tables
+are persistent, see persistent.py: an edit produces a new Budget and records are never changed
+in place, so holding on to a Budget is a consistent snapshot of it. On disk every row is still a plain
+dictionary so files written by older versions keep loading, which is what to_dict and from_dict
+are for. Amounts are Money and multipliers are Rate in memory but Decimal in those dictionaries.
+
+A transaction's merchant and category are codes into the StringTable of its budget group, so the
+conversions which touch transactions take that table. On disk they are the plain strings again.
+"""
+
+from .money import Money, Rate
+from .persistent import PVector
+
+
+class Record:
+    """
+    Base class giving slotted records dictionary conversion, equality and a readable repr.
+
+    Records are immutable since every version of a budget, the undo log and the journal share
+    them. Subclasses set their fields once with _set_fields and changes go through replace.
+    """
+
+    __slots__ = ()
+    NUMERIC_FIELDS = {}  # field name -> Money or Rate, for fields stored as Decimal on disk
+    STRING_FIELDS = {}  # field name -> dictionary key, for fields stored as StringTable codes
+
+    def _set_fields(self, *values):
+        for field, value in zip(self.__slots__, values):
+            object.__setattr__(self, field, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable, use replace to change it")
+
+    @classmethod
+    def from_dict(cls, data, strings=None):
+        """
+        Build a record from a dictionary holding at least every field of the record.
+
+        strings is the StringTable used to encode string fields and is only needed by records
+        which have them.
+        """
+
+        numeric = cls.NUMERIC_FIELDS
+        encoded = cls.STRING_FIELDS
+        values = []
+        for field in cls.__slots__:
+            if field in numeric:
+                values.append(numeric[field].parse(data[field]))
+            elif field in encoded:
+                values.append(strings.code(data[encoded[field]]))
+            else:
+                values.append(data[field])
+        return cls(*values)
+
+    def to_dict(self, strings=None):
+        """Return the record as a dictionary with Decimal amounts and decoded strings, the format used on disk."""
+
+        data = {}
+        for field in self.__slots__:
+            value = getattr(self, field)
+            if field in self.NUMERIC_FIELDS:
+                data[field] = value.to_decimal()
+            elif field in self.STRING_FIELDS:
+                data[self.STRING_FIELDS[field]] = strings[value]
+            else:
+                data[field] = value
+        return data
+
+    @classmethod
+    def columns(cls):
+        """Return the keys of the dictionary form of the record, i.e. its columns on disk."""
+        return [cls.STRING_FIELDS.get(field, field) for field in cls.__slots__]
+
+    def fields(self):
+        """Return the record's fields as a dictionary without any conversion."""
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def replace(self, **changes):
+        """Return a copy of the record with some fields changed."""
+        values = self.fields()
+        values.update(changes)
+        return type(self)(**values)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
+
+    def __repr__(self):
+        values = ', '.join(f"{field}={getattr(self, field)!r}" for field in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+    def __getstate__(self):
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+    def __setstate__(self, state):
+        self._set_fields(*state)
+
+
+class Job(Record):
+    """A row of income_categories: a job with its expected hours and tax rate."""
+
+    __slots__ = ('name', 'hourly_pay', 'hours', 'tax_rate')
+    NUMERIC_FIELDS = {'hourly_pay': Money, 'hours': Rate, 'tax_rate': Rate}
+
+    def __init__(self, name, hourly_pay, hours, tax_rate):
+        self._set_fields(name, hourly_pay, hours, tax_rate)
+
+
+class ExpenseCategory(Record):
+    """A row of expense_categories: a category name and its budget."""
+
+    __slots__ = ('name', 'budget')
+    NUMERIC_FIELDS = {'budget': Money}
+
+    def __init__(self, name, budget):
+        self._set_fields(name, budget)
+
+
+class Transaction(Record):
+    """A row of transactions. merchant_code and category_code are codes into a StringTable."""
+
+    __slots__ = ('date', 'merchant_code', 'category_code', 'outlay', 'inflow')
+    NUMERIC_FIELDS = {'outlay': Money, 'inflow': Money}
+    STRING_FIELDS = {'merchant_code': 'merchant', 'category_code': 'category'}
+
+    def __init__(self, date, merchant_code, category_code, outlay, inflow):
+        self._set_fields(date, merchant_code, category_code, outlay, inflow)
+
+
+# record type used by each table of a budget
+TABLE_RECORDS = {
+    'income_categories': Job,
+    'expense_categories': ExpenseCategory,
+    'transactions': Transaction,
+}
+
+
+class Budget:
+    """
+    An immutable budget: one PVector of records per table.
+
+    Tables are read with budget[table] like the dictionaries budgets used to be. Writers use
+    with_table or the row methods, which return a new Budget sharing every untouched table.
+    """
+
+    __slots__ = tuple(TABLE_RECORDS)
+
+    def __init__(self, income_categories=(), expense_categories=(), transactions=()):
+        for table, rows in zip(self.__slots__, (income_categories, expense_categories, transactions)):
+            object.__setattr__(self, table, rows if isinstance(rows, PVector) else PVector(rows))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Budget is immutable, use with_table to change a table")
+
+    def __getitem__(self, table):
+        if table not in TABLE_RECORDS:
+            raise KeyError(table)
+        return getattr(self, table)
+
+    def get(self, table, default=None):
+        return getattr(self, table) if table in TABLE_RECORDS else default
+
+    def with_table(self, table, rows):
+        """Return a copy of the budget with one table replaced."""
+        tables = {name: getattr(self, name) for name in self.__slots__}
+        tables[table] = rows
+        return Budget(**tables)
+
+    def append_row(self, table, row):
+        return self.with_table(table, self[table].append(row))
+
+    def insert_row(self, table, index, row):
+        return self.with_table(table, self[table].insert(index, row))
+
+    def replace_row(self, table, index, row):
+        return self.with_table(table, self[table].set(index, row))
+
+    def delete_row(self, table, index):
+        return self.with_table(table, self[table].delete(index))
+
+    def splice_rows(self, table, start, stop, rows=()):
+        return self.with_table(table, self[table].splice(start, stop, rows))
+
+    def __eq__(self, other):
+        if type(other) is not Budget:
+            return NotImplemented
+        return all(getattr(self, table) == getattr(other, table) for table in self.__slots__)
+
+    def __repr__(self):
+        tables = ', '.join(f"{table}={len(getattr(self, table))} rows" for table in self.__slots__)
+        return f"Budget({tables})"
+
+    def __reduce__(self):
+        return Budget, tuple(getattr(self, table) for table in self.__slots__)
+
+
+def budget_from_dicts(budget, strings):
+    """Return a Budget of records, given a budget whose tables hold dictionaries."""
+    return Budget(**{
+        table: [record_type.from_dict(row, strings) for row in budget.get(table, [])]
+        for table, record_type in TABLE_RECORDS.items()
+    })
+
+
+def budget_to_dicts(budget, strings):
+    """Return a budget whose tables hold dictionaries, given one whose tables hold records."""
+    return {
+        table: [row.to_dict(strings) for row in budget[table]]
+        for table in TABLE_RECORDS
+    }
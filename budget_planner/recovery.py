@@ -0,0 +1,308 @@
+"""
+Crash recovery journal of the edits made since the last save.
+
+The journal lives in budget_planner/recovery/current and is incremental. base.pkl holds the
+template or budget group as of some edit, and journal.pkl holds one entry per later edit: the delta
+from history.py with its rows as dictionaries. A single writer thread wakes INTERVAL seconds after
+an edit and appends whatever arrived since. After COMPACT_AFTER entries it writes a fresh base
+instead. Each base has a generation number and entries carry the generation they follow, so
+entries left behind by a crash while a base was being replaced are ignored.
+
+Saving, loading or creating a file empties the journal and a clean exit removes it. The journal
+directory holds owner.pid, the process id of the session writing it, so a second instance started
+meanwhile leaves it alone and journals to current-<pid> instead. A journal found at startup whose
+owner is no longer running was left by a process which died. It is moved to
+budget_planner/recovery/leftover so this session can journal its own edits, and HomePage offers to
+restore it.
+"""
+
+import os
+import pickle
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+from . import history
+from .models import ProjectModel, atomic_write
+from .records import Record, Budget, TABLE_RECORDS, budget_from_dicts, budget_to_dicts
+
+JOURNAL_VERSION = 1
+OWNER_FILE = "owner.pid"
+
+RECORD_TYPES = {record_type.__name__: record_type for record_type in TABLE_RECORDS.values()}
+DELTA_TYPES = {
+    delta_type.__name__: delta_type
+    for delta_type in (history.RowInserted, history.RowDeleted, history.RowReplaced,
+                       history.RowsInserted, history.RowsDeleted,
+                       history.BudgetAdded, history.BudgetRemoved, history.BudgetRenamed,
+                       history.ScheduleChanged, history.OccurrencesAdded, history.Batch)
+}
+
+
+def process_running(pid):
+    """Return whether a process with the given id is running."""
+
+    if os.name == 'nt':  # os.kill would terminate the process on Windows
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+        kernel32.CloseHandle(handle)
+        return code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # running as another user
+        return True
+    return True
+
+
+def encode_delta(delta, strings):
+    """Return a delta as plain python containers, with rows and budgets as dictionaries."""
+
+    fields = {}
+    for field in delta.__slots__:
+        value = getattr(delta, field)
+        if isinstance(value, Record):
+            value = ('record', type(value).__name__, value.to_dict(strings))
+        elif isinstance(value, Budget):
+            value = ('budget', budget_to_dicts(value, strings))
+        elif field == 'rows':
+            value = ('records', [(type(row).__name__, row.to_dict(strings)) for row in value])
+        elif field == 'deltas':
+            value = ('deltas', [encode_delta(part, strings) for part in value])
+        fields[field] = value
+    return type(delta).__name__, fields
+
+
+def decode_delta(entry, strings):
+    """Inverse of encode_delta."""
+
+    name, fields = entry
+    for field, value in fields.items():
+        if isinstance(value, tuple) and value and value[0] == 'record':
+            fields[field] = RECORD_TYPES[value[1]].from_dict(value[2], strings)
+        elif isinstance(value, tuple) and value and value[0] == 'budget':
+            fields[field] = budget_from_dicts(value[1], strings)
+        elif isinstance(value, tuple) and value and value[0] == 'records':
+            fields[field] = [RECORD_TYPES[name].from_dict(row, strings) for name, row in value[1]]
+        elif isinstance(value, tuple) and value and value[0] == 'deltas':
+            fields[field] = [decode_delta(part, strings) for part in value[1]]
+    return DELTA_TYPES[name](**fields)
+
+
+class RecoveryJournal:
+    """Writes the recovery journal from a single long-lived thread. See the module docstring."""
+
+    INTERVAL = 5.0  # seconds between an edit and it being written
+    COMPACT_AFTER = 500  # journal entries before a fresh base is written instead
+
+    def __init__(self, directory=Path("budget_planner", "recovery")):
+        self.directory = Path(directory)
+        self.current_path = None  # set by _claim
+        self.leftover_path = Path(self.directory, "leftover")
+        self.filepath = ''  # file the journaled data was loaded from or saved to, '' when untitled
+        self.writes = 0
+
+        self._pending = []  # (delta or None, snapshot after it) not written yet, None forces a new base
+        self._discard = False  # the journal on disk belongs to data which has since been saved or replaced
+        self._generation = 0
+        self._entries = None  # entries written since the base, None while there is no base
+        self._lock = threading.Lock()  # guards _pending and _discard
+        self._write_lock = threading.Lock()  # one flush at a time
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+        self._claim()
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _owner(path):
+        """Return the process id which owns a journal directory, or None if it doesn't say."""
+
+        try:
+            return int(Path(path, OWNER_FILE).read_text())
+        except (OSError, ValueError):  # a journal written before owners were recorded
+            return None
+
+    def _claim(self):
+        """Move a journal left by a crashed session aside and take a journal directory for this one."""
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        crashed = []
+        for path in self.directory.glob("current*"):
+            owner = self._owner(path)
+            if owner is not None and owner != os.getpid() and process_running(owner):
+                continue  # another instance is running and journals there
+            if Path(path, "base.pkl").exists():
+                crashed.append(path)
+            else:
+                shutil.rmtree(path, ignore_errors=True)
+        if crashed:
+            # there is room for one leftover journal, keep the latest
+            crashed.sort(key=lambda path: Path(path, "base.pkl").stat().st_mtime)
+            shutil.rmtree(self.leftover_path, ignore_errors=True)
+            crashed.pop().rename(self.leftover_path)
+            for path in crashed:
+                shutil.rmtree(path, ignore_errors=True)
+
+        self.current_path = Path(self.directory, "current")
+        try:
+            self.current_path.mkdir()
+        except FileExistsError:  # owned by another running instance
+            self.current_path = Path(self.directory, f"current-{os.getpid()}")
+            self.current_path.mkdir(exist_ok=True)
+        Path(self.current_path, OWNER_FILE).write_text(str(os.getpid()))
+
+    def _clear(self):
+        """Remove the journal files, keeping the directory and its owner."""
+
+        for name in ("base.pkl", "journal.pkl"):
+            try:
+                Path(self.current_path, name).unlink()
+            except FileNotFoundError:
+                pass
+
+    def record(self, delta, snapshot):
+        """
+        Queue an applied edit. Runs on the Tk thread and does no encoding or I/O.
+
+        :argument
+            delta (Delta): The edit, or None to journal snapshot as a whole
+            snapshot (dict): ProjectModel.snapshot() taken after the edit
+        """
+
+        with self._lock:
+            self._pending.append((delta, snapshot))
+        self._wake.set()
+
+    def reset(self):
+        """Forget the journal, e.g. once its data has been saved or replaced by another file."""
+
+        with self._lock:
+            self._pending = []
+            self._discard = True
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._stop.wait(self.INTERVAL):  # edits arriving meanwhile are written together
+                return
+            self.flush()
+
+    def flush(self):
+        """Write pending edits now, either appended to the journal or as a new base."""
+
+        with self._write_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+                discard, self._discard = self._discard, False
+            try:
+                if discard:
+                    self._clear()
+                    self._entries = None
+                if not pending:
+                    return
+                compact = self._entries is None or self._entries + len(pending) > self.COMPACT_AFTER
+                if compact or any(delta is None for delta, _ in pending):
+                    self._write_base(pending[-1][1])
+                else:
+                    self._append(pending)
+                self.writes += 1
+            except OSError as error:
+                print(f"Could not write recovery journal: {error}")
+
+    def _write_base(self, snapshot):
+        self.current_path.mkdir(parents=True, exist_ok=True)
+        self._generation += 1
+        info = {
+            'version': JOURNAL_VERSION,
+            'generation': self._generation,
+            'type': snapshot['type'],
+            'name': snapshot.get('name', ''),
+            'filepath': self.filepath,
+            'saved': datetime.now().isoformat(sep=' ', timespec='seconds'),
+        }
+        # the information is pickled first so leftover() can read it without loading the data
+        data = pickle.dumps(info) + pickle.dumps(ProjectModel.to_storable(snapshot), protocol=pickle.HIGHEST_PROTOCOL)
+        atomic_write(Path(self.current_path, "base.pkl"), data)
+        Path(self.current_path, "journal.pkl").write_bytes(b'')
+        self._entries = 0
+
+    def _append(self, pending):
+        with open(Path(self.current_path, "journal.pkl"), 'ab') as f:
+            for delta, snapshot in pending:
+                entry = encode_delta(delta, snapshot['strings'])
+                pickle.dump((self._generation, entry), f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        self._entries += len(pending)
+
+    def close(self):
+        """Stop the thread and remove the journal. Called when the application exits cleanly."""
+
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=5)
+        shutil.rmtree(self.current_path, ignore_errors=True)
+
+    def leftover(self):
+        """Return the information saved with a leftover journal, or None if there is none."""
+
+        try:
+            with open(Path(self.leftover_path, "base.pkl"), 'rb') as f:
+                info = pickle.load(f)
+        except Exception:  # no journal, or one too damaged to restore
+            return None
+        return info if info.get('version') == JOURNAL_VERSION else None
+
+    def restore(self):
+        """
+        Rebuild the data of the leftover journal and remove it.
+
+        :returns
+            tuple: The journal's information and the template or budget group with every journaled
+                edit applied, or None if the journal could not be read
+        """
+
+        try:
+            with open(Path(self.leftover_path, "base.pkl"), 'rb') as f:
+                info = pickle.load(f)
+                data = ProjectModel.from_storable(pickle.load(f))
+            model = ProjectModel(None, {})
+            model.template_data = data
+            for entry in self._entries_of(Path(self.leftover_path, "journal.pkl"), info['generation']):
+                decode_delta(entry, data['strings']).apply(model)
+        except Exception as error:
+            print(f"Could not restore recovery journal: {error}")
+            return None
+        self.discard_leftover()
+        return info, model.template_data
+
+    @staticmethod
+    def _entries_of(path, generation):
+        """Yield the journal entries following the base of the given generation."""
+
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            while True:
+                try:
+                    entry_generation, entry = pickle.load(f)
+                except Exception:  # the end of the journal, possibly cut short by the crash
+                    return
+                if entry_generation == generation:
+                    yield entry
+
+    def discard_leftover(self):
+        shutil.rmtree(self.leftover_path, ignore_errors=True)
@@ -0,0 +1,318 @@
+"""
+Recurring transactions such as rent, salaries and subscriptions.
+
+A RecurringRule describes a transaction repeating every N days or weeks, monthly on a day of the
+month or on the last business day of the month. Budgets of a budget group may have a period, the
+first and last date they cover, and the group's Schedule holds the rules, the periods and which
+occurrences have already been added to which budget.
+
+Occurrences are produced lazily by generators which jump straight to the start of a period, so
+expanding a rule into one budget costs only the occurrences inside it. A budget is filled when it
+is created and again whenever it is viewed, and only occurrences not added before are added, so
+filling a budget twice changes nothing and a generated row the user deleted stays deleted.
+
+Changing or removing a rule only touches the budgets whose period has not ended: the rule's rows
+from today on which were left as generated are removed and the new rule's occurrences are added.
+Past rows and rows the user edited are kept.
+"""
+
+import calendar
+import uuid
+from datetime import date, timedelta
+from .money import Money
+from .persistent import PMap
+from .records import Transaction
+
+
+def _to_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def _months(day):
+    return day.year * 12 + day.month - 1
+
+
+def _month_start(months):
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def _last_day(year, month):
+    return calendar.monthrange(year, month)[1]
+
+
+class RecurringRule:
+    """
+    An immutable description of a recurring transaction.
+
+    :argument
+        rule_id (str): Identifies the rule within its Schedule
+        merchant (str): Merchant of the generated transactions
+        category (str): Category of the generated transactions
+        outlay (Money): Outlay of the generated transactions
+        inflow (Money): Inflow of the generated transactions
+        kind (str): One of KINDS
+        start (str): First date the rule applies to, as YYYY-MM-DD
+        interval (int): Repeat every interval days, weeks or months
+        day (int): Day of the month for 'monthly'; months without it use their last day
+        end (str): Last date the rule applies to, '' if it never ends
+    """
+
+    KINDS = ('days', 'weeks', 'monthly', 'last_business_day')
+
+    __slots__ = ('rule_id', 'merchant', 'category', 'outlay', 'inflow', 'kind', 'start', 'interval', 'day', 'end')
+
+    def __init__(self, rule_id, merchant, category, outlay, inflow, kind, start, interval=1, day=1, end=''):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown kind of recurring rule: {kind!r}")
+        if int(interval) < 1:
+            raise ValueError("A recurring rule must repeat at least every 1 period.")
+        values = (rule_id, merchant, category, Money.parse(outlay), Money.parse(inflow), kind,
+                  _to_date(start).isoformat(), int(interval), int(day), _to_date(end).isoformat() if end else '')
+        for field, value in zip(self.__slots__, values):
+            object.__setattr__(self, field, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RecurringRule is immutable, use replace to change it")
+
+    def replace(self, **changes):
+        values = {field: getattr(self, field) for field in self.__slots__}
+        values.update(changes)
+        return RecurringRule(**values)
+
+    def describe(self):
+        """Return how often the rule repeats in words, e.g. 'every 2 weeks'."""
+
+        if self.kind == 'last_business_day':
+            return "last business day" + (f" of every {self.interval} months" if self.interval > 1 else " of the month")
+        if self.kind == 'monthly':
+            return f"monthly on day {self.day}" + (f", every {self.interval} months" if self.interval > 1 else "")
+        unit = self.kind[:-1]
+        return f"every {unit}" if self.interval == 1 else f"every {self.interval} {self.kind}"
+
+    def occurrences(self, first, last):
+        """
+        Yield the dates the rule falls on from first to last inclusive, in order, as YYYY-MM-DD.
+
+        The generator starts at the first occurrence on or after first instead of walking from the
+        rule's start, so a period years after the start costs no more than the first one.
+        """
+
+        first = max(_to_date(first), _to_date(self.start))
+        last = _to_date(last)
+        if self.end:
+            last = min(last, _to_date(self.end))
+        if first > last:
+            return
+        if self.kind in ('days', 'weeks'):
+            yield from self._every_days(first, last)
+        else:
+            yield from self._every_months(first, last)
+
+    def _every_days(self, first, last):
+        step = self.interval * (7 if self.kind == 'weeks' else 1)
+        start = _to_date(self.start)
+        skipped = -(-(first - start).days // step)  # steps needed to reach first, rounded up
+        day = start + timedelta(days=skipped * step)
+        while day <= last:
+            yield day.isoformat()
+            day += timedelta(days=step)
+
+    def _every_months(self, first, last):
+        start = _months(_to_date(self.start))
+        months = start + max(_months(first) - start, 0) // self.interval * self.interval
+        while months <= _months(last):
+            day = self._day_in(_month_start(months))
+            if first <= day <= last:
+                yield day.isoformat()
+            months += self.interval
+
+    def _day_in(self, month):
+        """Return the day the rule falls on in the month starting at month."""
+
+        last_day = _last_day(month.year, month.month)
+        if self.kind == 'monthly':
+            return month.replace(day=min(self.day, last_day))
+        day = month.replace(day=last_day)  # last business day, holidays are not known
+        while day.weekday() >= 5:
+            day -= timedelta(days=1)
+        return day
+
+    def transaction(self, day, strings):
+        """Return the transaction the rule generates on day, with names encoded into strings."""
+        return Transaction(day, strings.code(self.merchant), strings.code(self.category), self.outlay, self.inflow)
+
+    def to_dict(self):
+        """Return the rule as a dictionary of strings and numbers, the format used in config.json."""
+
+        data = {field: getattr(self, field) for field in self.__slots__}
+        data['outlay'] = str(self.outlay)
+        data['inflow'] = str(self.inflow)
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{field: data[field] for field in cls.__slots__ if field in data})
+
+    def __eq__(self, other):
+        if type(other) is not RecurringRule:
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, field) for field in self.__slots__))
+
+    def __repr__(self):
+        values = ', '.join(f"{field}={getattr(self, field)!r}" for field in self.__slots__)
+        return f"RecurringRule({values})"
+
+    def __reduce__(self):
+        return RecurringRule, tuple(getattr(self, field) for field in self.__slots__)
+
+
+def next_period(period):
+    """
+    Return the period following period, or None if period is None.
+
+    A period covering whole calendar months is followed by the same number of calendar months,
+    anything else by a period of the same number of days.
+    """
+
+    if period is None:
+        return None
+    first, last = _to_date(period[0]), _to_date(period[1])
+    if first.day == 1 and last.day == _last_day(last.year, last.month):
+        months = _months(last) - _months(first) + 1
+        following = _month_start(_months(last) + 1)
+        end_month = _month_start(_months(following) + months - 1)
+        end = end_month.replace(day=_last_day(end_month.year, end_month.month))
+        return following.isoformat(), end.isoformat()
+    length = last - first
+    following = last + timedelta(days=1)
+    return following.isoformat(), (following + length).isoformat()
+
+
+class Schedule:
+    """
+    The recurring rules of a budget group with the period of each budget and the occurrences
+    already added to it. Immutable like the budgets, every change returns a new Schedule.
+
+    rules maps rule ids to RecurringRules, periods maps budget names to (first, last) dates and
+    added maps budget names to a frozenset of (rule id, date) pairs.
+    """
+
+    __slots__ = ('rules', 'periods', 'added')
+
+    def __init__(self, rules=(), periods=(), added=()):
+        object.__setattr__(self, 'rules', rules if isinstance(rules, PMap) else PMap(rules))
+        object.__setattr__(self, 'periods', periods if isinstance(periods, PMap) else PMap(periods))
+        object.__setattr__(self, 'added', added if isinstance(added, PMap) else PMap(added))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Schedule is immutable")
+
+    def _replace(self, rules=None, periods=None, added=None):
+        return Schedule(self.rules if rules is None else rules,
+                        self.periods if periods is None else periods,
+                        self.added if added is None else added)
+
+    @staticmethod
+    def new_rule_id():
+        """Return an id for a new rule. Ids are never reused since occurrences stay marked with the id of their rule."""
+        return uuid.uuid4().hex[:12]
+
+    def sorted_rules(self):
+        return sorted(self.rules.values(), key=lambda rule: (rule.start, rule.merchant, rule.rule_id))
+
+    def period(self, budget):
+        return self.periods.get(budget)
+
+    def with_period(self, budget, period):
+        """Return a copy with budget covering period, or without a period when period is None."""
+
+        if period is None:
+            return self._replace(periods=self.periods.delete(budget) if budget in self.periods else self.periods)
+        first, last = (_to_date(day).isoformat() for day in period)
+        if first > last:
+            raise ValueError("A period must not end before it starts.")
+        return self._replace(periods=self.periods.set(budget, (first, last)))
+
+    def forget(self, budget):
+        """Return a copy without the period of budget or the occurrences added to it, e.g. for a new budget reusing a name."""
+
+        periods = self.periods.delete(budget) if budget in self.periods else self.periods
+        added = self.added.delete(budget) if budget in self.added else self.added
+        return self._replace(periods=periods, added=added)
+
+    def with_rule(self, rule):
+        return self._replace(rules=self.rules.set(rule.rule_id, rule))
+
+    def without_rule(self, rule_id):
+        return self._replace(rules=self.rules.delete(rule_id))
+
+    def renamed(self, old, new):
+        """Return a copy following a budget renamed from old to new."""
+
+        periods, added = self.periods, self.added
+        if old in periods:
+            periods = periods.delete(old).set(new, periods[old])
+        if old in added:
+            added = added.delete(old).set(new, added[old])
+        return self._replace(periods=periods, added=added)
+
+    def added_to(self, budget):
+        return self.added.get(budget, frozenset())
+
+    def mark(self, budget, keys, unmark=()):
+        """Return a copy recording keys as added to budget and unmark as no longer added."""
+        return self._replace(added=self.added.set(budget, (self.added_to(budget) - set(unmark)) | set(keys)))
+
+    def pending(self, budget, rules=None, since=''):
+        """
+        Yield (rule, date) for every occurrence in budget's period which wasn't added to it yet.
+
+        :argument
+            budget (str): Name of the budget
+            rules (iterable): Rules to expand, by default every rule of the schedule
+            since (str): Skip occurrences before this date
+        """
+
+        period = self.periods.get(budget)
+        if period is None:
+            return
+        first = max(period[0], since) if since else period[0]
+        added = self.added_to(budget)
+        for rule in sorted(self.rules.values() if rules is None else rules, key=lambda rule: rule.rule_id):
+            for day in rule.occurrences(first, period[1]):
+                if (rule.rule_id, day) not in added:
+                    yield rule, day
+
+    def to_dict(self):
+        """Return the schedule using only plain python containers, the format used in config.json."""
+        return {
+            'rules': [rule.to_dict() for rule in self.sorted_rules()],
+            'periods': {budget: list(period) for budget, period in self.periods.items()},
+            'added': {budget: sorted(map(list, keys)) for budget, keys in self.added.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        rules = (RecurringRule.from_dict(rule) for rule in data.get('rules', ()))
+        return cls(
+            {rule.rule_id: rule for rule in rules},
+            {budget: tuple(period) for budget, period in data.get('periods', {}).items()},
+            {budget: frozenset(map(tuple, keys)) for budget, keys in data.get('added', {}).items()},
+        )
+
+    def __eq__(self, other):
+        if type(other) is not Schedule:
+            return NotImplemented
+        return self.rules == other.rules and self.periods == other.periods and self.added == other.added
+
+    def __repr__(self):
+        return f"Schedule({len(self.rules)} rules, {len(self.periods)} periods)"
+
+    def __reduce__(self):
+        return Schedule, (dict(self.rules.items()), dict(self.periods.items()), dict(self.added.items()))
+
+
+EMPTY_SCHEDULE = Schedule()
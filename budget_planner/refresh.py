@@ -0,0 +1,52 @@
+from .aggregation import PANELS
+
+
+class RefreshScheduler:
+    """
+    Coalesces requests to redraw BudgetView panels.
+
+    Every request made during one turn of the event loop only marks panels as dirty. A single idle
+    callback then redraws the dirty panels once, however many requests were made.
+    """
+
+    def __init__(self, widget, redraw):
+        self.widget = widget
+        self.redraw = redraw  # called with the set of dirty panels and any precomputed rows
+
+        self.dirty = set()
+        self.rows = None
+        self.coalesced = 0  # number of requests folded into an earlier pending redraw
+        self._idle_id = None
+
+    def request(self, *panels, rows=None):
+        """
+        Mark panels as dirty and make sure a redraw is scheduled.
+
+        :argument
+            panels (str): Any of 'categories', 'jobs', 'transactions' and 'title'. Defaults to all.
+            rows (dict): Optional rows from aggregate_budget covering every panel
+        """
+
+        unknown = set(panels).difference(PANELS)
+        if unknown:
+            raise ValueError(f"Unknown panels: {', '.join(sorted(unknown))}")
+
+        self.dirty.update(panels or PANELS)
+        # precomputed rows describe the data at the time of the request so any later request
+        # without rows, e.g. one following an edit, makes them unusable
+        self.rows = rows
+        if self._idle_id is None:
+            self._idle_id = self.widget.after_idle(self.flush)
+        else:
+            self.coalesced += 1
+
+    def flush(self):
+        """Redraw the dirty panels now. Also used to force a pending redraw to happen immediately."""
+
+        if self._idle_id is not None:
+            self.widget.after_cancel(self._idle_id)
+            self._idle_id = None
+        dirty, rows = self.dirty, self.rows
+        self.dirty, self.rows = set(), None
+        if dirty:
+            self.redraw(dirty, rows)
@@ -0,0 +1,168 @@
+"""
+Envelope rollover of expense category budgets across the budgets of a budget group.
+
+Without rollover every budget's expense categories start from scratch. With it, whatever a
+category has left at the end of a budget carries over to the next one, and overspending is taken
+out of it: a category's available balance is its balance after the previous budget plus its budget
+less its actual spending. Categories are matched by name, and a budget without the category adds
+nothing to it.
+
+RolloverEngine keeps one Fenwick tree per category over the budgets in order, each slot holding
+the budget less the actual spending of one budget. The available balance is then a prefix sum, and
+editing an old budget's categories or transactions updates one slot per category it touches
+instead of walking every later budget again.
+"""
+
+from .cumulative import FenwickTree
+
+
+def category_net(budget, strings):
+    """
+    Return the budget less the actual spending in cents of each expense category of a budget.
+
+    Actual spending is the outlays of the transactions in the category, as in category_rows.
+    """
+
+    net = {}
+    for category in budget['expense_categories']:
+        net[category.name] = net.get(category.name, 0) + category.budget.cents
+    codes = {}
+    for name in net:
+        code = strings.lookup(name)
+        if code is not None:
+            codes[code] = name
+    for tran in budget['transactions']:
+        outlay = tran.outlay.cents
+        if outlay > 0:
+            name = codes.get(tran.category_code)
+            if name is not None:
+                net[name] -= outlay
+    return net
+
+
+class RolloverEngine:
+    """
+    Available balance of the expense categories of the budgets of a budget group.
+
+    update is called with the current data before reading and only redoes what changed. The
+    budgets which changed since the last update are found with PMap.changes, and each one whose
+    categories or transactions were edited updates one slot of the tree of every category it has
+    or had. A budget appended to the group grows the trees by a slot and a removed budget leaves
+    its slot behind holding zero. Only a budget inserted before the last one rebuilds the trees,
+    from the net of each budget kept from earlier updates.
+    """
+
+    def __init__(self):
+        self._budgets = None  # the budgets PMap the engine is up to date with
+        self._order = None
+        self._strings = None
+        self._slots = {}  # budget name -> its slot in the trees, slots increase along the order
+        self._size = 0  # number of slots, including those of removed budgets
+        self._tables = {}  # budget name -> (expense_categories, transactions) the net was computed from
+        self._net = {}  # budget name -> {category name: budget less actual in cents}
+        self._trees = {}  # category name -> FenwickTree of its net in each slot
+
+    def update(self, data):
+        """Bring the engine up to date with a budget group."""
+
+        budgets, order = data['budgets'], data['order']
+        if data['strings'] is not self._strings:
+            self._tables, self._net = {}, {}  # another group, nothing computed so far applies
+            self._rebuild(order, budgets, data['strings'])
+        elif budgets is not self._budgets or order is not self._order:
+            changes = list(budgets.changes(self._budgets))
+            if order is not self._order and not self._follow_order(order, changes):
+                self._rebuild(order, budgets, self._strings)
+            else:
+                for name, _, budget in changes:
+                    if budget is not None:
+                        self._refresh(name, budget)
+        self._budgets = budgets
+        self._order = order
+
+    def _follow_order(self, order, changes):
+        """
+        Follow a budget appended, removed or renamed since the last update.
+
+        :returns
+            bool: False for any other change of the order, which needs a rebuild
+        """
+
+        added = [(name, budget) for name, old, budget in changes if old is None]
+        removed = [(name, old) for name, old, budget in changes if budget is None]
+        if len(added) == 1 and not removed:
+            name = added[0][0]
+            if order.index(name) != len(order) - 1:
+                return False
+            for tree in self._trees.values():
+                tree.append(0)
+            self._slots[name] = self._size
+            self._size += 1
+            self._net[name] = {}  # filled in by _refresh
+            return True
+        if len(removed) == 1 and not added:
+            name = removed[0][0]
+            self._set_net(name, {})
+            del self._slots[name], self._net[name], self._tables[name]
+            return True
+        if len(added) == 1 and len(removed) == 1 and added[0][1] is removed[0][1]:
+            old, new = removed[0][0], added[0][0]
+            for cache in (self._slots, self._net, self._tables):
+                cache[new] = cache.pop(old)
+            return True
+        return False
+
+    def _refresh(self, name, budget):
+        tables = (budget['expense_categories'], budget['transactions'])
+        old = self._tables.get(name)
+        if old is None or tables[0] is not old[0] or tables[1] is not old[1]:
+            self._set_net(name, category_net(budget, self._strings))
+            self._tables[name] = tables
+
+    def _rebuild(self, order, budgets, strings):
+        """Lay the slots out along order again, reusing the net of every budget which didn't change."""
+
+        tables, nets, slots = {}, {}, {}
+        for position, name in enumerate(order):
+            budget = budgets[name]
+            tables[name] = (budget['expense_categories'], budget['transactions'])
+            old = self._tables.get(name)
+            if old is not None and old[0] is tables[name][0] and old[1] is tables[name][1]:
+                nets[name] = self._net[name]
+            else:
+                nets[name] = category_net(budget, strings)
+            for category, net in nets[name].items():
+                slots.setdefault(category, [0] * len(order))[position] = net
+        self._trees = {category: FenwickTree(values) for category, values in slots.items()}
+        self._slots = {name: position for position, name in enumerate(order)}
+        self._size = len(order)
+        self._tables, self._net = tables, nets
+        self._strings = strings
+
+    def _set_net(self, name, net):
+        slot = self._slots[name]
+        old = self._net[name]
+        for category in old.keys() | net.keys():
+            delta = net.get(category, 0) - old.get(category, 0)
+            if delta:
+                if category not in self._trees:
+                    self._trees[category] = FenwickTree([0] * self._size)
+                self._trees[category].add(slot, delta)
+        self._net[name] = net
+
+    def balances(self, data, name=None):
+        """
+        Return the available balance in cents of each expense category of a budget.
+
+        :argument
+            data (dict): The budget group, e.g. ProjectModel.template_data
+            name (str): Name of the budget, by default the current budget
+        :returns
+            dict: Category name mapped to its balance after the budget
+        """
+
+        self.update(data)
+        if name is None:
+            name = data['current_budget']
+        count = self._slots[name] + 1
+        return {category: self._trees[category].prefix_sum(count) for category in self._net[name]}
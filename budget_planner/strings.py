@@ -0,0 +1,53 @@
+class StringTable:
+    """
+    Dictionary encoding of the merchant and category names used by a budget group or template.
+
+    Each distinct string is stored once and given a small integer code, in order of first use.
+    Transactions hold these codes so aggregation compares and groups integers instead of strings.
+    A table is saved as its list of strings, so reloading it hands out exactly the same codes.
+
+    Only the Tk thread adds strings. Worker threads may decode codes at the same time since a code
+    is appended to the list before it is published in the dictionary.
+    """
+
+    __slots__ = ('_strings', '_codes')
+
+    def __init__(self, strings=()):
+        self._strings = []
+        self._codes = {}
+        for string in strings:
+            self.code(string)
+
+    def code(self, string):
+        """Return the code of a string, adding the string to the table if needed."""
+
+        try:
+            return self._codes[string]
+        except KeyError:
+            code = len(self._strings)
+            self._strings.append(string)
+            self._codes[string] = code
+            return code
+
+    def lookup(self, string):
+        """Return the code of a string or None if it is not in the table, without adding it."""
+        return self._codes.get(string)
+
+    def __getitem__(self, code):
+        return self._strings[code]
+
+    def __len__(self):
+        return len(self._strings)
+
+    def __contains__(self, string):
+        return string in self._codes
+
+    def __iter__(self):
+        return iter(self._strings)
+
+    def to_list(self):
+        """Return the strings in code order, e.g. for pickling or writing strings.csv."""
+        return list(self._strings)
+
+    def __repr__(self):
+        return f"StringTable({self._strings!r})"
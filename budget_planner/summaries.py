@@ -0,0 +1,151 @@
+"""
+Small JSON sidecars describing saved templates and budget groups.
+
+Saving a file named budget.bdg also writes budget.bdg.summary.json with the number of budgets, the
+current budget, its net income and when it was saved. HomePage reads these to preview recent files
+without unpickling them. The sidecar records the size and modification time of the file it
+describes, so a file changed by anything else is shown as changed rather than with stale numbers.
+"""
+
+import json
+import os
+import queue
+import threading
+from datetime import datetime
+from pathlib import Path
+from .aggregation import category_rows
+
+SUMMARY_VERSION = 1
+
+
+def summary_path(filepath):
+    return Path(f"{filepath}.summary.json")
+
+
+def summarize(data, income_tax=None):
+    """Return the summary of a template or budget group as a dictionary. income_tax is passed to category_rows."""
+
+    if data['type'] == 'budget':
+        current = data['current_budget']
+        budget = data['budgets'][current]
+        periods = len(data['order'])
+    else:
+        current = None
+        budget = data['template']
+        periods = 0
+    _, expected, actual = category_rows(budget, data['strings'], income_tax)[2]
+    return {
+        'version': SUMMARY_VERSION,
+        'type': data['type'],
+        'name': data['name'],
+        'periods': periods,
+        'current_budget': current,
+        'expected_net_income': expected,
+        'net_income': actual,
+        'transactions': len(budget['transactions']),
+        'saved': datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def summary_json(filepath, data, income_tax=None):
+    """
+    Return the contents of the sidecar of a file which has just been saved.
+
+    :argument
+        filepath (str): The saved file
+        data (dict): The template or budget group which was saved
+        income_tax (int): Budgeted income tax of its current budget in cents, None for flat rates
+    :returns
+        str: The summary as JSON
+    """
+
+    summary = summarize(data, income_tax)
+    stat = os.stat(filepath)
+    summary['file_size'] = stat.st_size
+    summary['file_mtime_ns'] = stat.st_mtime_ns
+    return json.dumps(summary)
+
+
+def read_summary(filepath):
+    """
+    Stat a file and read its sidecar. Never opens the file itself.
+
+    :returns
+        dict: The summary with a 'status' of 'ok', 'changed' (the file was modified after its
+            summary was written), 'no summary' or 'missing'
+    """
+
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return {'status': 'missing'}
+    modified = datetime.fromtimestamp(stat.st_mtime).isoformat(sep=' ', timespec='minutes')
+    try:
+        with open(summary_path(filepath), mode='r') as json_file:
+            summary = json.load(json_file)
+    except (OSError, ValueError):
+        return {'status': 'no summary', 'modified': modified}
+    if summary.get('version') != SUMMARY_VERSION:
+        return {'status': 'no summary', 'modified': modified}
+    unchanged = summary.get('file_size') == stat.st_size and summary.get('file_mtime_ns') == stat.st_mtime_ns
+    summary['status'] = 'ok' if unchanged else 'changed'
+    summary['modified'] = modified
+    return summary
+
+
+class SummaryReader:
+    """
+    Reads the summaries of a list of files on a worker thread.
+
+    Results come back through a queue polled from the Tk thread with after. Each read hands out a
+    new generation number and results of older reads are dropped.
+    """
+
+    POLL_INTERVAL = 20  # milliseconds between checks of the result queue
+
+    def __init__(self, master):
+        self.master = master
+        self.generation = 0
+
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._callback = None
+        self._poll_id = None
+
+        self._thread = threading.Thread(target=self._work, daemon=True)
+        self._thread.start()
+
+    def read(self, filepaths, callback):
+        """Read the summaries of filepaths and call callback(index, summary) on the Tk thread for each."""
+
+        self.generation += 1
+        self._callback = callback
+        self._requests.put((self.generation, list(filepaths)))
+        if self._poll_id is None:
+            self._poll_id = self.master.after(self.POLL_INTERVAL, self._poll)
+
+    def _work(self):
+        while True:
+            generation, filepaths = self._requests.get()
+            for index, filepath in enumerate(filepaths):
+                if generation != self.generation:
+                    break
+                self._results.put((generation, index, read_summary(filepath)))
+            self._results.put((generation, None, None))  # marks the end of a read
+
+    def _poll(self):
+        self._poll_id = None
+        done = False
+        while True:
+            try:
+                generation, index, summary = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if generation != self.generation:
+                continue
+            if index is None:
+                done = True
+            else:
+                self._callback(index, summary)
+        if not done:
+            self._poll_id = self.master.after(self.POLL_INTERVAL, self._poll)
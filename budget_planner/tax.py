@@ -0,0 +1,272 @@
+"""
+Progressive income tax from bracket tables.
+
+A TaxTable holds a year's brackets: the income each bracket starts at and its marginal rate. The
+tax owed at the start of every bracket is summed once when the table is built, so the tax on any
+income is one bisect plus one multiplication.
+
+Tables are kept in budget_planner/tax_tables.json, which is written with DEFAULT_TABLES the first
+time it is needed and may be edited by hand. When no table is selected every job is taxed at its
+own flat tax_rate as before.
+
+TaxEngine applies a table to a budget group. Income tax depends on the income earned so far in the
+year across every job, so a budget's expected tax is the tax on its year to date income including
+the budget less the tax on the year to date income before it. Each year keeps a Fenwick tree of
+its budgets' expected income, which makes year to date income O(log n) and lets an edit to one
+budget's jobs update a single slot instead of summing the year again.
+"""
+
+import json
+from bisect import bisect_right
+from pathlib import Path
+from .cumulative import FenwickTree
+from .money import Money, Rate
+from .persistent import PMap
+
+TAX_TABLES_PATH = Path("budget_planner", "tax_tables.json")
+
+DEFAULT_TABLES = [
+    {
+        'name': 'US Federal 2024 (single)',
+        'brackets': [
+            {'from': '0', 'rate': '0.10'},
+            {'from': '11600', 'rate': '0.12'},
+            {'from': '47150', 'rate': '0.22'},
+            {'from': '100525', 'rate': '0.24'},
+            {'from': '191950', 'rate': '0.32'},
+            {'from': '243725', 'rate': '0.35'},
+            {'from': '609350', 'rate': '0.37'},
+        ],
+    },
+]
+
+
+class TaxTable:
+    """
+    Brackets of an annual income tax.
+
+    :argument
+        name (str): Name shown when choosing a table
+        brackets (list): (income the bracket starts at as Money, marginal rate as Rate), the first
+            starting at zero
+    """
+
+    def __init__(self, name, brackets):
+        brackets = sorted(((Money.parse(start), Rate.parse(rate)) for start, rate in brackets),
+                          key=lambda bracket: bracket[0].cents)
+        if not brackets or brackets[0][0].cents != 0:
+            raise ValueError(f"The brackets of tax table {name!r} must start at 0.")
+        self.name = name
+        self.starts = [start.cents for start, _ in brackets]
+        self.rates = [rate for _, rate in brackets]
+
+        # tax owed on the income up to the start of each bracket
+        self.base = [0]
+        for i in range(1, len(brackets)):
+            width = Money(self.starts[i] - self.starts[i - 1])
+            self.base.append(self.base[-1] + width.times(self.rates[i - 1]).cents)
+
+    def tax(self, income):
+        """Return the tax in cents on an annual income in cents."""
+
+        if income <= 0:
+            return 0
+        i = bisect_right(self.starts, income) - 1
+        return self.base[i] + Money(income - self.starts[i]).times(self.rates[i]).cents
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'brackets': [
+                {'from': str(Money(start).to_decimal()), 'rate': str(rate.to_decimal())}
+                for start, rate in zip(self.starts, self.rates)
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['name'], [(bracket['from'], bracket['rate']) for bracket in data['brackets']])
+
+    def __repr__(self):
+        return f"TaxTable({self.name!r}, {len(self.starts)} brackets)"
+
+
+def load_tax_tables(path=TAX_TABLES_PATH):
+    """
+    Read the bracket tables, writing the defaults first if there is no file yet.
+
+    :returns
+        dict: Table names mapped to TaxTables. A table which can't be read is skipped with a warning
+    """
+
+    try:
+        with open(path, mode='r') as json_file:
+            data = json.load(json_file)
+    except FileNotFoundError:
+        data = {'tables': DEFAULT_TABLES}
+        try:
+            with open(path, mode='w') as json_file:
+                json.dump(data, json_file, indent=4)
+        except OSError as error:
+            print(f"Could not write tax tables: {error}")
+    except (OSError, json.JSONDecodeError) as error:
+        print(f"Could not read tax tables, using the defaults: {error}")
+        data = {'tables': DEFAULT_TABLES}
+
+    tables = {}
+    for table in data.get('tables', []):
+        try:
+            tables[table['name']] = TaxTable.from_dict(table)
+        except (KeyError, TypeError, ValueError, ArithmeticError) as error:
+            print(f"Skipping tax table {table.get('name', '?')!r}: {error}")
+    return tables
+
+
+def expected_income(budget):
+    """Return the expected income in cents of a budget's jobs before tax."""
+    return sum(job.hourly_pay.times(job.hours).cents for job in budget['income_categories'])
+
+
+class TaxEngine:
+    """
+    Expected income tax of the budgets of a template or budget group under a TaxTable.
+
+    A budget belongs to the calendar year its period starts in. Budgets without a period are
+    grouped into years of periods_per_year consecutive budgets from the start of the group.
+    update is called with the current data before reading and only redoes what changed: the
+    budgets which changed since the last update are found with PMap.changes and each one whose
+    jobs were edited updates one slot of its year's Fenwick tree. A budget appended to the group
+    grows its year's tree by a slot and a removed budget leaves its slot behind holding zero.
+    Changes which move budgets between years, such as a new period or a budget inserted or
+    removed before budgets without a period, rebuild the trees from the income kept per budget.
+    """
+
+    def __init__(self, table, periods_per_year=12):
+        self.table = table
+        self.periods_per_year = periods_per_year
+
+        self._budgets = None  # the budgets PMap the engine is up to date with
+        self._order = None
+        self._periods = None
+        self._jobs = {}  # budget name -> income_categories the income was computed from
+        self._income = {}  # budget name -> expected income in cents
+        self._slots = {}  # budget name -> (year, slot in the year's tree)
+        self._undated = 0  # number of budgets without a period, whose year depends on their position
+        self._years = {}  # year -> FenwickTree of the expected income of its budgets
+
+    def annual_tax(self, income):
+        """Return the tax per period on an income in cents earned every period of the year."""
+        return self.table.tax(income * self.periods_per_year) // self.periods_per_year
+
+    def update(self, data):
+        """Bring the engine up to date with a budget group. Templates need no update."""
+
+        if data['type'] != 'budget':
+            return
+        budgets, order = data['budgets'], data['order']
+        schedule = data.get('schedule')
+        periods = schedule.periods if schedule is not None else PMap()
+        if self._budgets is None:
+            self._rebuild(order, budgets, periods)
+        elif budgets is not self._budgets or order is not self._order or periods is not self._periods:
+            changes = list(budgets.changes(self._budgets))
+            if not self._follow_order(order, periods, changes):
+                self._rebuild(order, budgets, periods)
+            else:
+                for name, _, budget in changes:
+                    if budget is not None:
+                        self._refresh(name, budget)
+        self._budgets = budgets
+        self._order = order
+        self._periods = periods
+
+    def _follow_order(self, order, periods, changes):
+        """
+        Follow a budget appended, removed or renamed since the last update.
+
+        :returns
+            bool: False for any change which moves a budget to another year, which needs a rebuild
+        """
+
+        added = [(name, budget) for name, old, budget in changes if old is None]
+        removed = [(name, old) for name, old, budget in changes if budget is None]
+        if periods is not self._periods:
+            moved = {name for name, _, _ in periods.changes(self._periods)}
+            if not moved <= {name for name, _ in added + removed}:
+                return False  # a budget has a new period
+        if order is self._order:
+            return not added and not removed
+        if len(added) == 1 and not removed:
+            name = added[0][0]
+            position = order.index(name)
+            if position != len(order) - 1:
+                return False
+            period = periods.get(name)
+            year = period[0][:4] if period is not None else position // self.periods_per_year
+            tree = self._years.setdefault(year, FenwickTree())
+            tree.append(0)
+            self._slots[name] = (year, len(tree) - 1)
+            self._income[name] = 0  # filled in by _refresh
+            self._undated += period is None
+            return True
+        if len(removed) == 1 and not added:
+            name = removed[0][0]
+            if self._undated and name != self._order[-1]:
+                return False  # later budgets without a period move up a position
+            self._set_income(name, 0)
+            self._undated -= name not in self._periods
+            del self._slots[name], self._income[name], self._jobs[name]
+            return True
+        if len(added) == 1 and len(removed) == 1 and added[0][1] is removed[0][1]:
+            old, new = removed[0][0], added[0][0]
+            for cache in (self._slots, self._income, self._jobs):
+                cache[new] = cache.pop(old)
+            return True
+        return False
+
+    def _refresh(self, name, budget):
+        jobs = budget.income_categories
+        if jobs is not self._jobs.get(name):
+            self._set_income(name, expected_income(budget))
+            self._jobs[name] = jobs
+
+    def _set_income(self, name, income):
+        year, slot = self._slots[name]
+        self._years[year].add(slot, income - self._income[name])
+        self._income[name] = income
+
+    def _rebuild(self, order, budgets, periods):
+        """Lay the years out along order again, reusing the income of every budget whose jobs didn't change."""
+
+        jobs, incomes, slots, years = {}, {}, {}, {}
+        self._undated = 0
+        for position, name in enumerate(order):
+            period = periods.get(name)
+            year = period[0][:4] if period is not None else position // self.periods_per_year
+            self._undated += period is None
+            jobs[name] = budgets[name].income_categories
+            if jobs[name] is self._jobs.get(name):
+                incomes[name] = self._income[name]
+            else:
+                incomes[name] = expected_income(budgets[name])
+            years.setdefault(year, []).append(incomes[name])
+            slots[name] = (year, len(years[year]) - 1)
+        self._years = {year: FenwickTree(values) for year, values in years.items()}
+        self._jobs, self._income, self._slots = jobs, incomes, slots
+
+    def expected_tax(self, data, name=None):
+        """
+        Return the expected income tax in cents of a budget.
+
+        :argument
+            data (dict): The template or budget group, e.g. ProjectModel.template_data
+            name (str): Name of the budget, by default the current budget. Ignored for a template
+        """
+
+        if data['type'] != 'budget':
+            return self.annual_tax(expected_income(data['template']))
+        self.update(data)
+        year, position = self._slots[name if name is not None else data['current_budget']]
+        before = self._years[year].prefix_sum(position)
+        after = self._years[year].prefix_sum(position + 1)
+        return self.table.tax(after) - self.table.tax(before)
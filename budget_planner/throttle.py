@@ -0,0 +1,96 @@
+import time
+
+
+class Throttle:
+    """
+    Limits how often a Tk event handler runs.
+
+    Calling the throttle stands in for calling func. While events arrive, func runs at most fps
+    times per second with the latest arguments. Once no event has arrived for settle milliseconds
+    func runs one final time with the last arguments received, unless it already has. With fps set
+    to None only that final call happens, which makes the throttle a debouncer.
+
+    events counts every call made to the throttle, calls every time func actually ran, and
+    collapsed how many events never reached func.
+    """
+
+    def __init__(self, widget, func, fps=30, settle=100):
+        self.widget = widget
+        self.func = func
+        self.interval = 1 / fps if fps else None  # seconds
+        self.settle = settle  # milliseconds
+
+        self.events = 0
+        self.calls = 0
+
+        self._args = ()
+        self._pending = False  # whether the latest arguments have not been passed to func yet
+        self._last_event = 0.0
+        self._last_call = 0.0
+        self._frame_id = None
+        self._settle_id = None
+
+    @property
+    def collapsed(self):
+        return self.events - self.calls
+
+    def __call__(self, *args):
+        now = time.perf_counter()
+        self.events += 1
+        self._args = args
+        self._pending = True
+        self._last_event = now
+
+        if self.interval is not None and self._frame_id is None:
+            wait = self.interval - (now - self._last_call)
+            if wait <= 0:
+                self._run()
+            else:
+                self._frame_id = self.widget.after(int(wait * 1000) + 1, self._frame)
+
+        # a single settle timer is kept and pushed back when it fires too early,
+        # which is far cheaper than cancelling and rescheduling it on every event
+        if self._settle_id is None:
+            self._settle_id = self.widget.after(self.settle, self._check_settled)
+
+    def _frame(self):
+        self._frame_id = None
+        if self._pending:
+            self._run()
+
+    def _check_settled(self):
+        quiet = (time.perf_counter() - self._last_event) * 1000
+        if quiet < self.settle:
+            self._settle_id = self.widget.after(int(self.settle - quiet) + 1, self._check_settled)
+            return
+        self._settle_id = None
+        if self._pending:
+            self._run()
+
+    def _run(self):
+        self._pending = False
+        self._last_call = time.perf_counter()
+        self.calls += 1
+        self.func(*self._args)
+
+    def flush(self):
+        """Run func now if the latest arguments have not been handled yet."""
+        self.cancel()
+        if self._pending:
+            self._run()
+
+    def cancel(self):
+        """Stop any scheduled call without running it."""
+        for after_id in (self._frame_id, self._settle_id):
+            if after_id is not None:
+                self.widget.after_cancel(after_id)
+        self._frame_id = None
+        self._settle_id = None
+
+    def stats(self):
+        """Return the event counters as a dictionary."""
+        return {'events': self.events, 'calls': self.calls, 'collapsed': self.collapsed}
+
+    def reset_stats(self):
+        self.events = 0
+        self.calls = 0
@@ -0,0 +1,142 @@
+"""
+Validation rules for the fields of budget records, shared by the entry widgets, the transaction
+grid and the CSV loader.
+
+Every rule is compiled once, when this module is imported, into regular expressions:
+
+* partial: what may be typed so far. Entry widgets check it on every keystroke.
+* complete: what a finished value must look like. This includes range checks, so the rate rule
+  only accepts numbers between 0 and 1 and the date rule knows how long each month is and which
+  years are leap years. No value is ever converted to Decimal or parsed with strptime.
+* column: complete repeated over a newline separated column. One fullmatch checks a whole column,
+  and only a column with an invalid value is then checked value by value to find it.
+"""
+
+import re
+
+REQUIRED_MESSAGE = 'A value is required'
+
+_DAY = {
+    31: r'(?:0[1-9]|[12]\d|3[01])',
+    30: r'(?:0[1-9]|[12]\d|30)',
+    28: r'(?:0[1-9]|1\d|2[0-8])',
+}
+_LEAP_YEAR = r'(?:\d\d(?:0[48]|[2468][048]|[13579][26])|(?:[02468][048]|[13579][26])00)'
+_DATE = (
+    r'(?!0000)\d{4}-'
+    rf'(?:(?:0[13578]|1[02])-{_DAY[31]}|(?:0[469]|11)-{_DAY[30]}|02-{_DAY[28]})'
+    rf'|(?!0000){_LEAP_YEAR}-02-29'
+)
+
+
+class FieldRule:
+    """
+    A compiled validation rule for one kind of field.
+
+    :argument
+        name (str): Name of the rule, e.g. 'date'
+        complete (str): Pattern a finished value must match
+        partial (str): Pattern every value typed so far must match
+        message (str): Error for a non empty value which doesn't match complete
+    """
+
+    def __init__(self, name, complete, partial, message):
+        self.name = name
+        self.message = message
+        # ASCII so \d is only 0-9: date.fromisoformat rejects other digits, e.g. fullwidth ones
+        self._complete = re.compile(complete, re.ASCII).fullmatch
+        self._partial = re.compile(partial, re.ASCII).fullmatch
+        self._column = re.compile(rf'(?:{complete})(?:\n(?:{complete}))*', re.ASCII).fullmatch
+
+    def __repr__(self):
+        return f"FieldRule({self.name!r})"
+
+    def allows_partial(self, text):
+        """Return whether text could still become a valid value, i.e. whether a keystroke producing it is allowed."""
+        return self._partial(text) is not None
+
+    def is_valid(self, value):
+        return self._complete(value) is not None
+
+    def error(self, value):
+        """Return why value is invalid, or '' if it is valid."""
+
+        if not value:
+            return REQUIRED_MESSAGE
+        return '' if self._complete(value) is not None else self.message
+
+    def column_errors(self, values):
+        """
+        Check a whole column of values.
+
+        :argument
+            values (list): Strings to check
+        :returns
+            list: (index, error) for every invalid value, in order
+        """
+
+        if not values:
+            return []
+        joined = '\n'.join(values)
+        if joined.count('\n') == len(values) - 1 and self._column(joined) is not None:
+            return []
+        complete = self._complete
+        return [
+            (i, REQUIRED_MESSAGE if not value else self.message)
+            for i, value in enumerate(values)
+            if not value or complete(value) is None
+        ]
+
+
+DATE = FieldRule(
+    'date',
+    complete=_DATE,
+    partial=r'\d{0,4}|\d{4}-\d{0,2}|\d{4}-\d{2}-\d{0,2}',
+    message='Invalid date',
+)
+
+DOLLARS = FieldRule(
+    'dollars',
+    complete=r'\d+(?:\.\d{0,2})?|\.\d{1,2}',
+    partial=r'\d*(?:\.\d{0,2})?',  # at most 2 decimal places, leading zeros are accepted like in files
+    message='Invalid dollar',
+)
+
+RATE = FieldRule(
+    'rate',
+    complete=r'0(?:\.\d*)?|1(?:\.0*)?|\.\d+',  # between 0 and 1
+    partial=r'0?(?:\.\d*)?|1(?:\.0*)?',
+    message='Invalid rate',
+)
+
+REQUIRED = FieldRule(
+    'required',
+    complete=r'.+',  # values never span lines, which keeps the column pattern exact
+    partial=r'.*',
+    message='Must be a single line',
+)
+
+# rule for each column of each table, using the column names of the saved files
+TABLE_RULES = {
+    'income_categories': {'name': REQUIRED, 'hourly_pay': DOLLARS, 'hours': DOLLARS, 'tax_rate': RATE},
+    'expense_categories': {'name': REQUIRED, 'budget': DOLLARS},
+    'transactions': {'date': DATE, 'merchant': REQUIRED, 'category': REQUIRED, 'outlay': DOLLARS, 'inflow': DOLLARS},
+}
+
+
+def table_errors(table, columns):
+    """
+    Check every column of a table.
+
+    :argument
+        table (str): 'income_categories', 'expense_categories' or 'transactions'
+        columns (dict): Column name mapped to its list of string values. Columns without a rule are ignored
+    :returns
+        list: (row index, column name, error) for every invalid value, ordered by row
+    """
+
+    errors = []
+    for column, rule in TABLE_RULES[table].items():
+        if column in columns:
+            errors.extend((i, column, error) for i, error in rule.column_errors(columns[column]))
+    return sorted(errors, key=lambda error: error[0])
@@ -2,17 +2,37 @@ import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
 from tkinter import filedialog
-from decimal import Decimal
 from datetime import date
 from os import path
 from .widgets import AutoScrollbar, DateEntry, DollarEntry, RequiredEntry, DecimalEntry, ModifiedCheckboxTreeview
+from .widgets import RepeatButton
+from .validators import DATE, DOLLARS, REQUIRED
+from .aggregation import aggregate_budget
+from .ordering import BudgetOrder
+from .workers import AggregationWorker
+from .refresh import RefreshScheduler
+from .throttle import Throttle
+from .persistent import PMap
+from .records import Budget, TABLE_RECORDS
+from .recurrence import RecurringRule, next_period
+from .money import Money, Rate
+from .strings import StringTable
+from .summaries import SummaryReader
 
 
 class HomePage(ttk.Frame):
-    """Home page shown upon program startup."""
+    """
+    Home page shown upon program startup.
+
+    Recent files are listed straight away from the settings. Their previews (number of budgets,
+    current budget, net income and last modification) are then filled in as a SummaryReader reads
+    each file's summary sidecar on a worker thread.
+    """
+
     def __init__(self, master, callbacks, **kwargs):
         super().__init__(master, **kwargs)
         self.callbacks = callbacks
+        self.summary_reader = SummaryReader(self)
 
         # Frame to hold recent templates and budgets
         self.recent_files_frame = ttk.Frame(self)
@@ -49,6 +69,20 @@ class HomePage(ttk.Frame):
 
         self.check_tv.bind("<Double-1>", self._load)
 
+        # ask about edits a crashed session left behind once the window is up
+        self.after_idle(self.offer_recovery)
+
+    def offer_recovery(self):
+        """Offer to restore the unsaved edits of a session which did not exit cleanly."""
+
+        leftover = self.callbacks["get_leftover_journal"]()
+        if leftover is None:
+            return
+        if MessageView.restore_journal_messagebox(leftover):
+            self.callbacks["restore_journal"]()
+        else:
+            self.callbacks["discard_journal"]()
+
     def update_recent_files_frame(self):
         self.recent_files = self.callbacks["get_recent_files"]()
         if not self.recent_files:
@@ -61,18 +95,26 @@ class HomePage(ttk.Frame):
             self.check_tv.grid(column=0, row=2)
 
             self.check_tv.config(
-                columns=('type', 'filename', 'file_extension'),
+                columns=('type', 'filename', 'file_extension', 'periods', 'current_budget', 'net_income', 'modified'),
                 height=len(self.recent_files)
             )
             self.check_tv.column('#0', width=100, stretch='NO')
-            self.check_tv.column('type', width=200)
-            self.check_tv.column('filename', width=200)
-            self.check_tv.column('file_extension', width=200)
+            self.check_tv.column('type', width=100)
+            self.check_tv.column('filename', width=180)
+            self.check_tv.column('file_extension', width=80)
+            self.check_tv.column('periods', width=70, anchor='e')
+            self.check_tv.column('current_budget', width=150)
+            self.check_tv.column('net_income', width=100, anchor='e')
+            self.check_tv.column('modified', width=150)
 
             self.check_tv.heading('#0', text='')
             self.check_tv.heading('type', text='Budget Type', anchor='w')
             self.check_tv.heading('filename', text='Filename', anchor='w')
             self.check_tv.heading('file_extension', text='Extension', anchor='w')
+            self.check_tv.heading('periods', text='Budgets', anchor='e')
+            self.check_tv.heading('current_budget', text='Current Budget', anchor='w')
+            self.check_tv.heading('net_income', text='Net Income', anchor='e')
+            self.check_tv.heading('modified', text='Last Modified', anchor='w')
 
             for i, v in enumerate(self.recent_files):
                 # row content
@@ -85,9 +127,31 @@ class HomePage(ttk.Frame):
                         f"{v['budget_type']}".title(),
                         f"{path.splitext(fn)[0]}",
                         f"{path.splitext(fn)[1]}",
+                        '', '', '', '...',  # filled in by show_summary
                     ),
                 )
 
+            self.summary_reader.read([v['filepath'] for v in self.recent_files], self.show_summary)
+
+    def show_summary(self, index, summary):
+        """Fill in the preview columns of a recent file from its summary. Called by the SummaryReader."""
+
+        if not self.check_tv.exists(index):
+            return
+        status = summary['status']
+        if status == 'missing':
+            self.check_tv.set(index, 'modified', "File not found")
+            return
+        self.check_tv.set(index, 'modified', summary['modified'])
+        if status == 'no summary':
+            return
+        if summary['type'] == 'budget':
+            self.check_tv.set(index, 'periods', summary['periods'])
+            self.check_tv.set(index, 'current_budget', summary['current_budget'])
+        self.check_tv.set(index, 'net_income', summary['net_income'])
+        if status == 'changed':
+            self.check_tv.set(index, 'modified', f"{summary['modified']} (changed)")
+
     def remove_recent_entries(self):
         to_remove = []
         for index in range(len(self.check_tv.get_children())):
@@ -106,6 +170,9 @@ class HomePage(ttk.Frame):
 class BudgetView(ttk.Frame):
     """Page which shows selected budget to user."""
 
+    SYNC_ROW_LIMIT = 500  # budgets with more rows than this are aggregated on a worker thread
+    RENDER_BATCH_SIZE = 200  # treeview rows inserted per idle callback
+
     def __init__(self, master, callbacks, **kwargs):
         super().__init__(master, **kwargs)
         self.callbacks = callbacks
@@ -156,22 +223,28 @@ class BudgetView(ttk.Frame):
         self.transaction_tv = ttk.Treeview(transaction_frame, show='tree')
         self.transaction_popup_menu = tk.Menu(self.transaction_tv)
         self.transaction_popup_menu.add_command(label="Add Transaction...", command=self.add_transaction)
+        self.transaction_popup_menu.add_command(label="Add Several Transactions...", command=self.add_transactions)
         self.transaction_popup_menu.add_command(label="Insert Transaction...", command=self.insert_transaction)
         self.transaction_popup_menu.add_command(label="Edit Transaction...", command=self.edit_transaction)
         self.transaction_popup_menu.add_separator()
         self.transaction_popup_menu.add_command(label="Remove Transaction", command=self.delete_transaction)
 
         # set up widgets for bottom frame
-        previous_button = ttk.Button(
+        previous_button = RepeatButton(
             bottom_frame,
             text="Previous",
             command=self.callbacks["get_previous_budget"]
         )
-        next_button = ttk.Button(
+        next_button = RepeatButton(
             bottom_frame,
             text="Next",
             command=self.callbacks["get_next_budget"]
         )
+        jump_button = ttk.Button(
+            bottom_frame,
+            text="Jump...",
+            command=self.callbacks["jump_to_budget"]
+        )
         self.h_scroll = ttk.Scrollbar(bottom_frame, orient=tk.HORIZONTAL)
 
         # grid primary layer widgets
@@ -206,12 +279,13 @@ class BudgetView(ttk.Frame):
         # grid content for bottom frame
         previous_button.grid(column=0, row=0)
         next_button.grid(column=1, row=0)
-        self.h_scroll.grid(column=2, row=0, sticky=(tk.W + tk.E))
+        jump_button.grid(column=2, row=0)
+        self.h_scroll.grid(column=3, row=0, sticky=(tk.W + tk.E))
 
         # apply weights to BudgetView sub-frames as needed
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(0, weight=1)
-        bottom_frame.grid_columnconfigure(2, weight=1)
+        bottom_frame.grid_columnconfigure(3, weight=1)
 
         # ensure scrollbars show up above canvas
         bottom_frame.tkraise()
@@ -231,93 +305,221 @@ class BudgetView(ttk.Frame):
             yscrollcommand=self.v_scroll.set
         )
 
-        # initiate data containers for view
-        if self.master.data_model.template_data['type'] == 'template':
-            self.view_data = master.data_model.template_data['template']  # not a copy
-        if self.master.data_model.template_data['type'] == 'budget':
-            newest_budget = master.data_model.template_data['order'][-1]
-            self.view_data = master.data_model.template_data['budgets'][newest_budget]
-
         # fill BudgetView with content
         self.category_column_names = ('#0', 'name', 'budget', 'actual')
         self.editable_category_column_names = self.category_column_names[1:3]
-        self.editable_category_column_datatypes = [str, Decimal]
+        self.editable_category_column_datatypes = [str, Money.parse]
         self.category_entry_widgets = [RequiredEntry, DollarEntry]
         self.category_column_widths = (0, 160, 80, 80)
         self.category_column_orientations = ('w', 'w', 'e', 'e')
+        self.available_column = ('available', 80, 'e')  # shown when category balances roll over
 
         self.job_column_names = ('#0', 'name', 'hourly_pay', 'hours', 'tax_rate', 'wages')
         self.editable_job_column_names = self.job_column_names[1:5]
-        self.editable_job_column_datatypes = [str, Decimal, Decimal, Decimal]
+        self.editable_job_column_datatypes = [str, Money.parse, Rate.parse, Rate.parse]
         self.job_entry_widgets = [RequiredEntry, DollarEntry, DollarEntry, DecimalEntry]
         self.job_column_widths = (0, 80, 80, 50, 70, 60)
         self.job_column_orientations = ('w', 'w', 'e', 'e', 'e', 'e')
 
         self.transaction_column_names = ('#0', 'date', 'merchant', 'category', 'outlay', 'inflow', 'net')
         self.editable_transaction_column_names = self.transaction_column_names[1:6]
-        self.editable_transaction_column_datatypes = [str, str, str, Decimal, Decimal]
+        self.editable_transaction_column_datatypes = [str, str, str, Money.parse, Money.parse]
         self.transaction_entry_widgets = [DateEntry, RequiredEntry, RequiredEntry, DollarEntry, DollarEntry]
         self.transaction_column_widths = (0, 80, 160, 160, 80, 80, 80)
         self.transaction_column_orientations = ('w', 'w', 'w', 'w', 'e', 'e', 'e')
 
+        # set up background aggregation and batched rendering
+        self.aggregation_worker = AggregationWorker(self)
+        self._pending_rows = []  # (treeview, rows, next row index) waiting to be inserted
+        self._render_id = None
+        self._rendering = set()  # panels whose redraw has not finished
+        self.refresh_scheduler = RefreshScheduler(self, self.redraw)
+
         self.update_frames()
 
         # add styles
         self.styles = ttk.Style()
         self.set_styles()
 
-        # set up events
-        scrollable_frame.bind("<Configure>", self.get_canvas_size)
+        # set up events, throttled since a window drag produces hundreds of configure events a second
+        self.canvas_size_throttle = Throttle(self, self.get_canvas_size, fps=30)
+        self.resize_throttle = Throttle(self, self.callbacks['set_window_size'], fps=None, settle=250)
+        scrollable_frame.bind("<Configure>", self.canvas_size_throttle)
         self.expense_tv.bind("<Button-3>", self.call_category_popup_menu)
         self.middle_tv.bind("<Button-3>", self.call_job_popup_menu)
         self.transaction_tv.bind("<Button-3>", self.call_transaction_popup_menu)
 
         self.bind("<Configure>", self.resize)
 
+    @property
+    def view_data(self):
+        """The Budget being shown. Edits replace it, so it is looked up again on every use."""
+        return self.master.data_model.current_budget
+
     def get_canvas_size(self, *args):
-        _, _, self.canvas_width, self.canvas_height = self.canvas.bbox('all')
-        self.canvas.configure(scrollregion=self.canvas.bbox('all'),
+        bbox = self.canvas.bbox('all')
+        _, _, self.canvas_width, self.canvas_height = bbox
+        self.canvas.configure(scrollregion=bbox,
                               width=self.canvas_width,
                               height=self.canvas_height)
 
-    def update_frames(self):
-        """Method which updates BudgetView."""
-
-        self.middle_tv_header.delete(*self.middle_tv_header.get_children())
-        self.middle_tv.delete(*self.middle_tv.get_children())
-        self.transaction_tv_header.delete(*self.transaction_tv_header.get_children())
-        self.transaction_tv.delete(*self.transaction_tv.get_children())
-        self.income_tv_header.delete(*self.income_tv_header.get_children())
-        self.income_tv.delete(*self.income_tv.get_children())
-        self.expense_tv_header.delete(*self.expense_tv_header.get_children())
-        self.expense_tv.delete(*self.expense_tv.get_children())
-        self.net_income_tv.delete(*self.net_income_tv.get_children())
-
-        self.middle_tv_header.grid_forget()  # forget
-        self.middle_tv.grid_forget()
-        self.middle_tv_header.grid()  # remember
-        self.middle_tv.grid()
-        self.add_content_middle_frame()
-
-        self.transaction_tv_header.grid_forget()  # forget
-        self.transaction_tv.grid_forget()
-        self.transaction_tv_header.grid()  # remember
-        self.transaction_tv.grid()
-        self.add_content_transaction_frame()  # repopulate
-
-        self.income_tv_header.grid_forget()  # forget
-        self.income_tv.grid_forget()
-        self.expense_tv_header.grid_forget()
-        self.expense_tv.grid_forget()
-        self.net_income_tv.grid_forget()
-        self.income_tv_header.grid()  # remember
-        self.income_tv.grid()
-        self.expense_tv_header.grid()
-        self.expense_tv.grid()
-        self.net_income_tv.grid(pady=(20, 0))
-        self.add_content_category_frame()  # repopulate
-
-        self._update_title()  # update current budget title
+    def update_frames(self, rows=None):
+        """
+        Method which updates every panel of BudgetView.
+
+        The redraw itself happens once the event loop is idle, so several calls made while handling
+        a single user action only redraw the view once.
+
+        :argument
+            rows (dict): Optional rows from aggregate_budget, e.g. prefetched during navigation
+        """
+
+        self.refresh_scheduler.request(rows=rows)
+
+    def refresh(self, *panels):
+        """Mark some panels ('categories', 'jobs', 'transactions', 'title') as needing a redraw."""
+        self.refresh_scheduler.request(*panels)
+
+    def redraw(self, panels, rows=None):
+        """
+        Redraw the given panels now. Called by the refresh scheduler.
+
+        Small budgets are aggregated immediately. Larger ones are aggregated on a worker thread and
+        their rows are inserted in batches from idle callbacks so the window stays responsive.
+        A redraw cancels any earlier redraw which has not finished, and takes over its panels.
+        """
+
+        panels = set(panels) | self.cancel_render()
+        income_tax = self.master.data_model.expected_income_tax()
+        balances = self.master.data_model.category_balances()
+        if rows is not None:
+            self._render(panels, rows)
+        elif self._row_count() <= self.SYNC_ROW_LIMIT:
+            self._render(
+                panels,
+                aggregate_budget(self.view_data, self.master.data_model.strings, panels, income_tax, balances)
+            )
+        else:
+            self._rendering = panels
+            self._clear_panels(panels)  # the rows shown belong to the budget shown before
+            self._update_title()
+            self.title_label.configure(text=self.title_label.cget('text') + " (loading...)")
+            self.aggregation_worker.submit(
+                self.view_data, self.master.data_model.strings, lambda result: self._render(panels, result), panels,
+                income_tax, balances
+            )
+
+    def _clear_panels(self, panels):
+        """Empty the treeviews holding the rows of the given panels, leaving their headers."""
+
+        treeviews = {
+            'jobs': (self.middle_tv,),
+            'transactions': (self.transaction_tv,),
+            'categories': (self.income_tv, self.expense_tv, self.net_income_tv),
+        }
+        for panel in panels:
+            for treeview in treeviews.get(panel, ()):
+                treeview.delete(*treeview.get_children())
+
+    def _row_count(self):
+        tables = ('income_categories', 'expense_categories', 'transactions')
+        return sum(len(self.view_data[table]) for table in tables)
+
+    def cancel_render(self):
+        """
+        Drop any pending aggregation result and any rows not inserted yet.
+
+        :returns
+            set: The panels whose redraw was interrupted
+        """
+
+        self.aggregation_worker.cancel()
+        if self._render_id is not None:
+            self.after_cancel(self._render_id)
+            self._render_id = None
+        self._pending_rows = []
+        interrupted, self._rendering = self._rendering, set()
+        return interrupted
+
+    def _render(self, panels, rows):
+        """Redraw the given panels from rows computed by aggregate_budget."""
+
+        if 'jobs' in panels:
+            self.middle_tv_header.delete(*self.middle_tv_header.get_children())
+            self.middle_tv.delete(*self.middle_tv.get_children())
+            self.middle_tv_header.grid_forget()  # forget
+            self.middle_tv.grid_forget()
+            self.middle_tv_header.grid()  # remember
+            self.middle_tv.grid()
+            self.add_content_middle_frame(rows['jobs'])
+
+        if 'transactions' in panels:
+            self.transaction_tv_header.delete(*self.transaction_tv_header.get_children())
+            self.transaction_tv.delete(*self.transaction_tv.get_children())
+            self.transaction_tv_header.grid_forget()  # forget
+            self.transaction_tv.grid_forget()
+            self.transaction_tv_header.grid()  # remember
+            self.transaction_tv.grid()
+            self.add_content_transaction_frame(rows['transactions'])  # repopulate
+
+        if 'categories' in panels:
+            self.income_tv_header.delete(*self.income_tv_header.get_children())
+            self.income_tv.delete(*self.income_tv.get_children())
+            self.expense_tv_header.delete(*self.expense_tv_header.get_children())
+            self.expense_tv.delete(*self.expense_tv.get_children())
+            self.net_income_tv.delete(*self.net_income_tv.get_children())
+            self.income_tv_header.grid_forget()  # forget
+            self.income_tv.grid_forget()
+            self.expense_tv_header.grid_forget()
+            self.expense_tv.grid_forget()
+            self.net_income_tv.grid_forget()
+            self.income_tv_header.grid()  # remember
+            self.income_tv.grid()
+            self.expense_tv_header.grid()
+            self.expense_tv.grid()
+            self.net_income_tv.grid(pady=(20, 0))
+            self.add_content_category_frame(rows['income'], rows['expense'], rows['net_income'])  # repopulate
+
+        self._update_title()  # update current budget title, also clears any loading note
+
+        # fill the short treeviews first, the first batch right away and the rest when idle
+        self._rendering = set(panels)
+        self._pending_rows.sort(key=lambda pending: len(pending[1]))
+        self._insert_row_batch()
+
+    def _queue_rows(self, treeview, rows):
+        """Queue rows for insertion into a treeview by _insert_row_batch."""
+        self._pending_rows.append((treeview, rows, 0))
+
+    def _insert_row_batch(self):
+        """Insert up to RENDER_BATCH_SIZE queued rows, rescheduling itself with after_idle until done."""
+
+        self._render_id = None
+        remaining = self.RENDER_BATCH_SIZE
+        while self._pending_rows and remaining > 0:
+            treeview, rows, start = self._pending_rows[0]
+            stop = min(start + remaining, len(rows))
+            for index in range(start, stop):
+                if index % 2 == 0:
+                    parity = 'even'
+                else:
+                    parity = 'odd'
+                treeview.insert(
+                    parent='',
+                    index=index,
+                    iid=index,
+                    values=rows[index],
+                    tags=(parity,)
+                )
+            remaining -= stop - start
+            if stop == len(rows):
+                self._pending_rows.pop(0)
+            else:
+                self._pending_rows[0] = (treeview, rows, stop)
+        if self._pending_rows:
+            self._render_id = self.after_idle(self._insert_row_batch)
+        else:
+            self._rendering = set()
 
     def _update_title(self):
         if self.master.data_model.template_data["type"] == "budget":
@@ -329,18 +531,17 @@ class BudgetView(ttk.Frame):
             name = self.master.data_model.template_data["name"]
             self.title_label.configure(text=name)
 
-    def add_content_category_frame(self):
-        """Function to fill category frame with content. Determines how to display data."""
+    def add_content_category_frame(self, income_rows, expense_rows, net_income_row):
+        """Function to fill category frame with rows computed by category_rows."""
 
         column_names = self.category_column_names
         column_widths = self.category_column_widths
         column_orientations = self.category_column_orientations
         column_list = list(zip(column_names, column_widths, column_orientations))
-
-        # set new names for data in view_data
-        income_categories = self.view_data['income_categories']
-        expense_categories = self.view_data['expense_categories']
-        transactions = self.view_data['transactions']
+        rollover = len(expense_rows[0]) > len(column_names) - 1
+        if rollover:
+            column_names = column_names + (self.available_column[0],)
+            column_list.append(self.available_column)
 
         # add content to income treeview header
         self.income_tv_header.config(columns=column_names[1:], selectmode='none', height=1)
@@ -358,50 +559,12 @@ class BudgetView(ttk.Frame):
         for v in column_list:
             self.income_tv.column(v[0], width=v[1], stretch='NO', anchor=v[2])
 
-        # initialize variables
-        actual_income = Decimal('0')
-        uncategorized_income = Decimal('0')
-
-        # create dictionary to hold values which will be inserted into the income treeview body
-        income_category_totals = {
-            k['name']: {'expected': k['hourly_pay'] * k['hours'], 'actual': Decimal('0')}
-            for k in income_categories
-        }
-
-        for tran in transactions:
-            inflow = tran['inflow']
-            merchant = tran['merchant']
-            if inflow > 0:
-                actual_income += inflow
-                if merchant in income_category_totals.keys():
-                    income_category_totals[merchant]['actual'] += inflow
-                else:
-                    uncategorized_income += inflow
-
-        # determine whether to display uncategorized income row
-        if uncategorized_income > 0:
-            income_category_totals['Uncategorized'] = dict(expected=Decimal('0'), actual=uncategorized_income)
-
-        expected_income = Decimal(sum([v['expected'] for v in income_category_totals.values()]))
-        income_category_totals['SUBTOTAL'] = dict(expected=expected_income, actual=actual_income)
-
-        for index, (k, v) in enumerate(income_category_totals.items()):
-            if index % 2 == 0:
-                parity = 'even'
-            else:
-                parity = 'odd'
-            self.income_tv.insert(
-                parent='',
-                index=index,
-                iid=index,
-                values=(k, round(v['expected'], 2), round(v['actual'], 2)),
-                tags=(parity,)
-            )
+        self._queue_rows(self.income_tv, income_rows)
         # add colors based on tag
         self.income_tv.tag_configure("even", foreground="black", background="white")
         self.income_tv.tag_configure("odd", foreground="black", background="grey75")
         # set height based on number of income categories plus a subtotal row
-        self.income_tv.config(height=len(income_category_totals))
+        self.income_tv.config(height=len(income_rows))
 
         # add content to expense treeview header
         self.expense_tv_header.config(columns=column_names[1:], selectmode='none', height=1)
@@ -410,7 +573,7 @@ class BudgetView(ttk.Frame):
 
         self.expense_tv_header.insert(
             parent='', index=0, iid=0,
-            value=('---EXPENSES---', 'Budget', 'Actual'),
+            value=('---EXPENSES---', 'Budget', 'Actual') + (('Available',) if rollover else ()),
             tags=('header',)
         )
         self.expense_tv_header.tag_configure("header", foreground="black", background="#5B9BD5")
@@ -420,60 +583,13 @@ class BudgetView(ttk.Frame):
         for v in column_list:
             self.expense_tv.column(v[0], width=v[1], stretch='NO', anchor=v[2])
 
-        # add user rows to expense_treeview based on given categories
-        actual_expense = Decimal('0')
-        taxed_income = Decimal('0')
-        uncategorized_expense = Decimal('0')
-
-        # create dictionary to hold values which will be inserted into the expense treeview body
-        expense_category_totals = {
-            k['name']: {'budget': k['budget'], 'actual': Decimal('0')}
-            for k in expense_categories
-        }
-
-        for tran in transactions:
-            outlay = tran['outlay']
-            merchant = tran['merchant']
-            category = tran['category']
-            if outlay > 0:
-                actual_expense += outlay
-                if category in expense_category_totals.keys():
-                    expense_category_totals[category]['actual'] += outlay
-                elif merchant in [k['name'] for k in income_categories]:
-                    taxed_income += outlay
-                else:
-                    uncategorized_expense += outlay
-
-        budgeted_income_taxes = Decimal(
-            sum([ic['hourly_pay'] * ic['hours'] * ic['tax_rate'] for ic in income_categories])
-        )
-        expense_category_totals['Income Tax'] = dict(budget=budgeted_income_taxes, actual=taxed_income)
-
-        # determine whether to display uncategorized expense row
-        if uncategorized_expense > 0:
-            expense_category_totals['Uncategorized'] = dict(budget=Decimal('0'), actual=uncategorized_expense)
-
-        budgeted_expense = Decimal(sum([v['budget'] for v in expense_category_totals.values()]))
-        expense_category_totals['SUBTOTAL'] = dict(budget=budgeted_expense, actual=actual_expense)
-
-        for index, (k, v) in enumerate(expense_category_totals.items()):
-            if index % 2 == 0:
-                parity = 'even'
-            else:
-                parity = 'odd'
-            self.expense_tv.insert(
-                parent='',
-                index=index,
-                iid=index,
-                values=(k, round(v['budget'], 2), round(v['actual'], 2)),
-                tags=(parity,)
-            )
+        self._queue_rows(self.expense_tv, expense_rows)
 
         # add colors based on tag
         self.expense_tv.tag_configure("even", foreground="black", background="white")
         self.expense_tv.tag_configure("odd", foreground="black", background="grey75")
         # set number of rows
-        self.expense_tv.config(height=len(expense_category_totals))
+        self.expense_tv.config(height=len(expense_rows))
 
         # set up treeview to aggregate income and expense totals
         self.net_income_tv.config(columns=column_names[1:], selectmode='none', height=1)
@@ -481,17 +597,13 @@ class BudgetView(ttk.Frame):
             self.net_income_tv.column(v[0], width=v[1], stretch='NO', anchor=v[2])
         self.net_income_tv.insert(
             parent='', index=0, iid=0,
-            value=(
-                'NET INCOME:',
-                round(expected_income - budgeted_expense, 2),
-                round(actual_income - actual_expense, 2)
-            ),
+            value=net_income_row,
             tags=('header',)
         )
         self.net_income_tv.tag_configure("header", foreground="white", background="#4b707e")
 
-    def add_content_middle_frame(self):
-        """Function to add middle frame with content. Determines which data to load."""
+    def add_content_middle_frame(self, rows):
+        """Function to fill middle frame with rows computed by job_rows."""
 
         # set up general variables
         column_names = self.job_column_names
@@ -499,9 +611,6 @@ class BudgetView(ttk.Frame):
         column_orientations = self.job_column_orientations
         column_list = list(zip(column_names, column_widths, column_orientations))
 
-        # set new names for data in template_data
-        jobs = self.view_data['income_categories']
-
         # add content to middle treeview header
         self.middle_tv_header.config(columns=column_names[1:], selectmode='none', height=1)
         for v in column_list:
@@ -519,31 +628,14 @@ class BudgetView(ttk.Frame):
         for v in column_list:
             self.middle_tv.column(v[0], width=v[1], stretch='NO', anchor=v[2])
 
-        for index, value in enumerate(jobs):
-            if index % 2 == 0:
-                parity = 'even'
-            else:
-                parity = 'odd'
-            self.middle_tv.insert(
-                parent='',
-                index=index,
-                iid=index,
-                values=(
-                    value['name'],
-                    round(value['hourly_pay'], 2),
-                    round(value['hours'], 2),
-                    round(value['tax_rate'], 2),
-                    round(value['hourly_pay'] * value['hours'], 2)
-                ),
-                tags=(parity,)
-            )
+        self._queue_rows(self.middle_tv, rows)
 
         self.middle_tv.tag_configure("even", foreground="black", background="#D9D9D9")
         self.middle_tv.tag_configure("odd", foreground="black", background="white")
-        self.middle_tv.config(height=len(jobs))
+        self.middle_tv.config(height=len(rows))
 
-    def add_content_transaction_frame(self):
-        """Function to add transaction frame with content. Determines which data to load."""
+    def add_content_transaction_frame(self, rows):
+        """Function to fill transaction frame with rows computed by transaction_rows."""
 
         # set up transaction column names and widths
         column_names = self.transaction_column_names
@@ -551,9 +643,6 @@ class BudgetView(ttk.Frame):
         column_orientations = self.transaction_column_orientations
         column_list = list(zip(column_names, column_widths, column_orientations))
 
-        # set new name(s) for data in template_data
-        transactions = self.view_data['transactions']
-
         # add content to transaction treeview header
         self.transaction_tv_header.config(columns=column_names[1:], selectmode='none', height=1)
         for v in column_list:
@@ -571,29 +660,11 @@ class BudgetView(ttk.Frame):
         for v in column_list:
             self.transaction_tv.column(v[0], width=v[1], stretch='NO', anchor=v[2])
 
-        for index, value in enumerate(transactions):
-            if index % 2 == 0:
-                parity = 'even'
-            else:
-                parity = 'odd'
-            self.transaction_tv.insert(
-                parent='',
-                index=index,
-                iid=index,
-                values=(
-                    value['date'],
-                    value['merchant'],
-                    value['category'],
-                    round(value['outlay'], 2),
-                    round(value['inflow'], 2),
-                    round(value['inflow'] - value['outlay'], 2)
-                ),
-                tags=(parity,)
-            )
+        self._queue_rows(self.transaction_tv, rows)
 
         self.transaction_tv.tag_configure("even", foreground="black", background="#B4C6E7")
         self.transaction_tv.tag_configure("odd", foreground="black", background="#D9E1F2")
-        self.transaction_tv.config(height=len(transactions))
+        self.transaction_tv.config(height=len(rows))
 
     def call_category_popup_menu(self, event):
         """Method to create a small popup menu for the expense category treeview"""
@@ -610,7 +681,7 @@ class BudgetView(ttk.Frame):
             table="expense_categories",
             call="add",
             title="New Category",
-            entry_defaults=['Placeholder', Decimal(0)],
+            entry_defaults=['Placeholder', Money(0)],
             button_text="Add"
         )
 
@@ -628,7 +699,7 @@ class BudgetView(ttk.Frame):
                 table="expense_categories",
                 call="insert",
                 title="Insert Category",
-                entry_defaults=['Placeholder', Decimal(0)],
+                entry_defaults=['Placeholder', Money(0)],
                 button_text="Insert",
                 row=row
             )
@@ -643,7 +714,7 @@ class BudgetView(ttk.Frame):
         row = self.expense_tv.focus()  # get treeview row
         if row:  # runs only if a row is selected
             defaults = self.view_data['expense_categories'][int(row)]  # get data from selected treeview row
-            defaults = [defaults[d] for d in self.editable_category_column_names]
+            defaults = [getattr(defaults, d) for d in self.editable_category_column_names]
             self._modify_table_window(
                 table="expense_categories",
                 call="edit",
@@ -663,12 +734,12 @@ class BudgetView(ttk.Frame):
         row = self.expense_tv.focus()
         if row:
             try:  # only works if
-                del self.view_data['expense_categories'][int(row)]  # remove selected treeview row
+                self.master.data_model.delete_row('expense_categories', int(row))  # remove selected treeview row
             except IndexError:
                 # IndexError can occur if we select a category not created by user
                 pass
             finally:
-                self.update_frames()
+                self.refresh('categories')
 
     def call_transaction_popup_menu(self, event):
         """Method to create a small popup menu for the transaction treeview"""
@@ -685,10 +756,22 @@ class BudgetView(ttk.Frame):
             table="transactions",
             call="add",
             title="New Transaction",
-            entry_defaults=[date.today(), "home", "food", Decimal(100), Decimal(0)],
+            entry_defaults=[date.today(), "home", "food", Money(10000), Money(0)],
             button_text="Add"
         )
 
+    def add_transactions(self):
+        """Open a grid for entering many transactions which are then added as a single edit."""
+        TransactionGrid(self, self._add_transaction_rows)
+
+    def _add_transaction_rows(self, rows):
+        """Add the rows submitted by a TransactionGrid with one model edit and one redraw."""
+
+        strings = self.master.data_model.strings
+        records = [TABLE_RECORDS['transactions'].from_dict(row, strings) for row in rows]
+        self.master.data_model.append_rows('transactions', records)
+        self.refresh('transactions', 'categories')
+
     def insert_transaction(self):
         """
         Method which checks to see if we have a selected row in the transaction treeview.
@@ -703,7 +786,7 @@ class BudgetView(ttk.Frame):
                 table="transactions",
                 call="insert",
                 title="Insert Transaction",
-                entry_defaults=[date.today(), "Home", "Food", Decimal(100), Decimal(0)],
+                entry_defaults=[date.today(), "Home", "Food", Money(10000), Money(0)],
                 button_text="Insert",
                 row=row
             )
@@ -718,6 +801,7 @@ class BudgetView(ttk.Frame):
         row = self.transaction_tv.focus()  # get treeview row
         if row:  # runs only if a row is selected
             defaults = self.view_data['transactions'][int(row)]  # get data from selected treeview row
+            defaults = defaults.to_dict(self.master.data_model.strings)  # decodes merchant and category
             defaults = [defaults[d] for d in self.editable_transaction_column_names]
             self._modify_table_window(
                 table="transactions",
@@ -733,8 +817,8 @@ class BudgetView(ttk.Frame):
 
         row = self.transaction_tv.focus()
         if row:
-            del self.view_data['transactions'][int(row)]  # remove selected treeview row
-            self.update_frames()
+            self.master.data_model.delete_row('transactions', int(row))  # remove selected treeview row
+            self.refresh('transactions', 'categories')
 
     def call_job_popup_menu(self, event):
         """Method to create a small popup menu for the middle treeview"""
@@ -751,7 +835,7 @@ class BudgetView(ttk.Frame):
             table='income_categories',
             call="add",
             title="New Job",
-            entry_defaults=["Job1", Decimal(0), Decimal(0), Decimal(0)],
+            entry_defaults=["Job1", Money(0), Rate(0), Rate(0)],
             button_text="Add"
         )
 
@@ -769,7 +853,7 @@ class BudgetView(ttk.Frame):
                 table='income_categories',
                 call="insert",
                 title="Insert Job",
-                entry_defaults=["Job2", Decimal(0), Decimal(0), Decimal(0)],
+                entry_defaults=["Job2", Money(0), Rate(0), Rate(0)],
                 button_text="Insert",
                 row=row
             )
@@ -784,7 +868,7 @@ class BudgetView(ttk.Frame):
         row = self.middle_tv.focus()  # get treeview row
         if row:  # runs only if a row is selected
             defaults = self.view_data['income_categories'][int(row)]  # get data from selected treeview row
-            defaults = [defaults[d] for d in self.editable_job_column_names]
+            defaults = [getattr(defaults, d) for d in self.editable_job_column_names]
             self._modify_table_window(
                 table='income_categories',
                 call="edit",
@@ -799,8 +883,8 @@ class BudgetView(ttk.Frame):
 
         row = self.middle_tv.focus()
         if row:
-            del self.view_data['income_categories'][int(row)]  # remove selected treeview row
-            self.update_frames()
+            self.master.data_model.delete_row('income_categories', int(row))  # remove selected treeview row
+            self.refresh('jobs', 'categories')
 
     def _modify_table_window(self, table, call, title, entry_defaults, button_text, row=0):
         """
@@ -820,16 +904,19 @@ class BudgetView(ttk.Frame):
             entry_widgets = self.job_entry_widgets
             function_calls = self.editable_job_column_datatypes
             which_treeview = table
+            affected_panels = ('jobs', 'categories')
         elif table == 'expense_categories':
             entry_names = self.editable_category_column_names
             entry_widgets = self.category_entry_widgets
             function_calls = self.editable_category_column_datatypes
             which_treeview = table
+            affected_panels = ('categories',)
         else:  # case when table == 'transactions'
             entry_names = self.editable_transaction_column_names
             entry_widgets = self.transaction_entry_widgets
             function_calls = self.editable_transaction_column_datatypes
             which_treeview = table
+            affected_panels = ('transactions', 'categories')
 
         entries = {}  # holds data submitted
 
@@ -865,23 +952,26 @@ class BudgetView(ttk.Frame):
                 )
 
             if not errors:
-                new_entry = {en: function_calls[k](entries[en].get()) for k, en in enumerate(entry_names)}
+                new_entry = TABLE_RECORDS[which_treeview].from_dict(
+                    {en: function_calls[k](entries[en].get()) for k, en in enumerate(entry_names)},
+                    self.master.data_model.strings
+                )
                 if which_treeview == 'transactions':
                     update = True
                 elif call == 'edit':
                     update = True
-                elif new_entry['name'] not in [en['name'] for en in self.view_data[which_treeview]]:
+                elif new_entry.name not in [en.name for en in self.view_data[which_treeview]]:
                     update = True
                 else:
                     update = False
                 if update:
                     if call == "add":
-                        self.view_data[which_treeview].append(new_entry)
+                        self.master.data_model.append_row(which_treeview, new_entry)
                     elif call == "insert":
-                        self.view_data[which_treeview].insert(int(row), new_entry)
+                        self.master.data_model.insert_row(which_treeview, int(row), new_entry)
                     elif call == "edit":
-                        self.view_data[which_treeview][int(row)] = new_entry
-                    self.update_frames()
+                        self.master.data_model.replace_row(which_treeview, int(row), new_entry)
+                    self.refresh(*affected_panels)
 
         i = 0
         for i, name in enumerate(entry_names):
@@ -917,7 +1007,7 @@ class BudgetView(ttk.Frame):
         self.transaction_tv.configure(style="mystyle.Treeview")
 
     def resize(self, event):
-        self.callbacks['set_window_size'](event.width, event.height)
+        self.resize_throttle(event.width, event.height)
 
 
 class CreateBudget(tk.Toplevel):
@@ -1000,11 +1090,8 @@ class CreateBudget(tk.Toplevel):
 
         self.new_template["type"] = "template"
         self.new_template["name"] = name
-        self.new_template["template"] = {
-            'income_categories': [],
-            'expense_categories': [],
-            'transactions': [],
-        }
+        self.new_template["strings"] = StringTable()
+        self.new_template["template"] = Budget()
 
         self._initiate_new_template()
 
@@ -1013,8 +1100,8 @@ class CreateBudget(tk.Toplevel):
 
         self.master.data_model.template_data = self.new_template
 
-        self.master.budget_view.view_data = self.new_template['template']
         self.callbacks['update_frames']()
+        self.callbacks['prefetch_adjacent_budgets']()
         self.callbacks['change_view']("budget_view")
 
     def create_new_budget(self):
@@ -1027,13 +1114,9 @@ class CreateBudget(tk.Toplevel):
         self.new_budget["type"] = "budget"
         self.new_budget["name"] = group_name
         self.new_budget["current_budget"] = first_budget
-        self.new_budget["budgets"] = {}
-        self.new_budget["order"] = [first_budget]
-        self.new_budget["budgets"][first_budget] = {
-            'income_categories': [],
-            'expense_categories': [],
-            'transactions': [],
-        }
+        self.new_budget["strings"] = StringTable()
+        self.new_budget["budgets"] = PMap({first_budget: Budget()})
+        self.new_budget["order"] = BudgetOrder([first_budget])
 
         self._initiate_new_budget()
 
@@ -1042,10 +1125,8 @@ class CreateBudget(tk.Toplevel):
 
         self.master.data_model.template_data = self.new_budget
 
-        newest_budget = self.new_budget['order'][-1]
-        self.view_data = self.new_budget['budgets'][newest_budget]
-        self.master.budget_view.view_data = self.new_budget['budgets'][newest_budget]
         self.callbacks['update_frames']()
+        self.callbacks['prefetch_adjacent_budgets']()
         self.callbacks['change_view']("budget_view")
 
 
@@ -1106,9 +1187,47 @@ class MessageView:
             detail="Create it?"
         )
 
+    @staticmethod
+    def delete_budget_messagebox(budget_name):
+        return messagebox.askokcancel(
+            title="Remove Budget",
+            message=f"Remove the budget {budget_name}?",
+            detail="Its categories and transactions will be lost."
+        )
+
+    @staticmethod
+    def last_budget_messagebox():
+        return messagebox.showerror(
+            title="Remove Budget",
+            message="A budget group must contain at least one budget!",
+            detail="Add another budget first."
+        )
+
+    @staticmethod
+    def restore_journal_messagebox(leftover):
+        source = leftover['filepath'] or "an unsaved file"
+        return messagebox.askyesno(
+            title="Restore Unsaved Changes",
+            message=f"Budget Planner closed unexpectedly with unsaved changes to {leftover['name']} ({source}).",
+            detail=f"Changes were last recorded {leftover['saved']}. Restore them?"
+        )
+
+    @staticmethod
+    def instrumentation_off_messagebox():
+        return messagebox.showinfo(
+            title="Performance",
+            message="Performance data is not being collected.",
+            detail="Start Budget Planner with --instrument to collect it."
+        )
+
 
 class AddNextBudget(tk.Toplevel):
-    """ """
+    """
+    Class which has pop-up window asking for the name, template and period of a new budget.
+
+    The period is optional. It defaults to the period following the current budget's, and the
+    recurring transactions falling in it are added to the new budget.
+    """
 
     def __init__(self, master, callbacks, current, add_budget_func, *args, **kwargs):
         super().__init__(master, *args, **kwargs)
@@ -1130,19 +1249,31 @@ class AddNextBudget(tk.Toplevel):
         self.previous_rb = ttk.Radiobutton(self, text="Previous", variable=self.rbs, value="previous")
         self.saved_rb = ttk.Radiobutton(self, text="Saved", variable=self.rbs, value="saved")
 
+        self.period_label = ttk.Label(self, text="Period (optional): ")
+        self.first_day = ttk.Entry(self, width=12)
+        self.last_day = ttk.Entry(self, width=12)
+        period = next_period(self.master.data_model.schedule.period(current))
+        if period is not None:
+            self.first_day.insert(0, period[0])
+            self.last_day.insert(0, period[1])
+
         self.next_name_submit = ttk.Button(self, text="Submit", command=self.gather_info)
 
         # grid widgets
         self.name_label.grid(column=0, row=0, sticky='w')
-        self.next_name.grid(column=1, row=0)
+        self.next_name.grid(column=1, row=0, columnspan=2)
         self.radiobutton_label.grid(column=0, row=1, sticky='w')
         self.blank_rb.grid(column=1, row=1, sticky='w')
         self.previous_rb.grid(column=1, row=2, sticky='w')
         self.saved_rb.grid(column=1, row=3, sticky='w')
-        self.next_name_submit.grid(column=1, row=4, sticky='e')
+        self.period_label.grid(column=0, row=4, sticky='w')
+        self.first_day.grid(column=1, row=4, sticky='w')
+        self.last_day.grid(column=2, row=4, sticky='w')
+        self.next_name_submit.grid(column=2, row=5, sticky='e')
 
     def gather_info(self):
         self.newest_budget = self.next_name.get()
+        period = (self.first_day.get().strip(), self.last_day.get().strip())
 
         if self.newest_budget in self.master.data_model.template_data["order"]:
             messagebox.showerror(
@@ -1156,12 +1287,740 @@ class AddNextBudget(tk.Toplevel):
                 message="Budget name must be at least one character long!",
                 detail="Choose another name."
             )
+        elif any(period) and not (all(map(DATE.is_valid, period)) and period[0] <= period[1]):
+            messagebox.showerror(
+                title="Period Error",
+                message="A period needs a first and a last date, in order, as YYYY-MM-DD.",
+                detail="Leave both empty for a budget without a period."
+            )
         else:
-            self.add_budget_func(self.newest_budget, template=self.rbs.get())
+            self.add_budget_func(self.newest_budget, template=self.rbs.get(), period=period if any(period) else None)
             self.destroy()
             self.update()
 
 
+class RenameBudget(tk.Toplevel):
+    """Class which has pop-up window allowing user to rename a budget in the current budget group."""
+
+    def __init__(self, master, order, current, rename_budget_func, *args, **kwargs):
+        super().__init__(master, *args, **kwargs)
+
+        self.order = order
+        self.current = current
+        self.rename_budget_func = rename_budget_func
+
+        self.wm_title("Rename Budget")
+
+        # create widgets
+        self.name_label = ttk.Label(self, text="Budget Name: ")
+        self.new_name = ttk.Entry(self)
+        self.new_name.insert(0, current)
+        self.new_name_submit = ttk.Button(self, text="Submit", command=self.gather_info)
+
+        # grid widgets
+        self.name_label.grid(column=0, row=0, sticky='w')
+        self.new_name.grid(column=1, row=0)
+        self.new_name_submit.grid(column=1, row=1, sticky='e')
+
+    def gather_info(self):
+        new_name = self.new_name.get()
+
+        if new_name == self.current:
+            self.destroy()
+        elif new_name in self.order:
+            messagebox.showerror(
+                title="Name Error",
+                message="Budget name already in use!",
+                detail="Choose another name."
+            )
+        elif new_name == '':
+            messagebox.showerror(
+                title="Name Error",
+                message="Budget name must be at least one character long!",
+                detail="Choose another name."
+            )
+        else:
+            self.rename_budget_func(self.current, new_name)
+            self.destroy()
+
+
+class JumpToBudget(tk.Toplevel):
+    """
+    Class which has pop-up window listing every budget in a budget group.
+
+    Typing in the filter entry narrows the list so a period can be found quickly in groups
+    with thousands of budgets. Double clicking or pressing Return shows the selected budget.
+    """
+
+    def __init__(self, master, order, current, show_budget_func, *args, **kwargs):
+        super().__init__(master, *args, **kwargs)
+
+        self.order = order
+        self.show_budget_func = show_budget_func
+        self.shown = []  # budget names currently listed, in order
+
+        self.wm_title("Jump to Budget")
+
+        # create widgets
+        self.filter_var = tk.StringVar()
+        self.filter_entry = ttk.Entry(self, textvariable=self.filter_var)
+        self.listbox = tk.Listbox(self, height=20, width=40, activestyle='dotbox')
+        self.scroll = AutoScrollbar(self, orient=tk.VERTICAL, command=self.listbox.yview)
+        self.listbox.configure(yscrollcommand=self.scroll.set)
+        self.go_button = ttk.Button(self, text="Go", command=self.submit)
+
+        # grid widgets
+        self.filter_entry.grid(column=0, row=0, columnspan=2, sticky=(tk.W + tk.E))
+        self.listbox.grid(column=0, row=1, sticky='nsew')
+        self.scroll.grid(column=1, row=1, sticky='ns')
+        self.go_button.grid(column=0, row=2, columnspan=2, sticky='e')
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        # set up events
+        self.filter_var.trace_add('write', self.update_listbox)
+        self.listbox.bind("<Double-1>", self.submit)
+        self.bind("<Return>", self.submit)
+        self.bind("<Escape>", lambda event: self.destroy())
+
+        self.update_listbox()
+        if current in self.order:
+            position = self.order.index(current)
+            self.listbox.selection_set(position)
+            self.listbox.see(position)
+        self.filter_entry.focus_set()
+
+    def update_listbox(self, *args):
+        """Refill the listbox with the budget names containing the filter text."""
+
+        text = self.filter_var.get().lower()
+        if text:
+            self.shown = [name for name in self.order if text in name.lower()]
+        else:
+            self.shown = self.order.to_list()
+        self.listbox.delete(0, tk.END)
+        self.listbox.insert(tk.END, *self.shown)
+        if len(self.shown) == 1:
+            self.listbox.selection_set(0)
+
+    def submit(self, *args):
+        selection = self.listbox.curselection()
+        if selection:
+            self.show_budget_func(self.shown[selection[0]])
+            self.destroy()
+
+
+class RecurringRules(tk.Toplevel):
+    """
+    Class which has pop-up window listing the recurring transactions of a budget group.
+
+    Selecting a rule fills the form below the list. Add creates a rule from the form, Update
+    replaces the selected rule and Remove deletes it, and every budget whose period hasn't ended
+    is updated straight away. The period of the current budget is set at the bottom.
+    """
+
+    COLUMNS = ('merchant', 'category', 'outlay', 'inflow', 'repeats', 'start', 'end')
+
+    def __init__(self, master, schedule, current, change_rule_func, set_period_func, *args, **kwargs):
+        super().__init__(master, *args, **kwargs)
+
+        self.schedule = schedule
+        self.current = current
+        self.change_rule_func = change_rule_func
+        self.set_period_func = set_period_func
+
+        self.wm_title("Recurring Transactions")
+
+        # create widgets, the list of rules
+        self.rules_tv = ttk.Treeview(self, columns=self.COLUMNS, show='headings', height=8, selectmode='browse')
+        for column in self.COLUMNS:
+            self.rules_tv.heading(column, text=column.title())
+            self.rules_tv.column(column, width=150 if column == 'repeats' else 90)
+        self.scroll = AutoScrollbar(self, orient=tk.VERTICAL, command=self.rules_tv.yview)
+        self.rules_tv.configure(yscrollcommand=self.scroll.set)
+
+        # the rule form
+        self.form = ttk.LabelFrame(self, text="Rule")
+        self.entries = {
+            'merchant': RequiredEntry(self.form),
+            'category': RequiredEntry(self.form),
+            'outlay': DollarEntry(self.form, width=10),
+            'inflow': DollarEntry(self.form, width=10),
+            'start': DateEntry(self.form, width=12),
+            'end': ttk.Entry(self.form, width=12),
+        }
+        self.kind = ttk.Combobox(self.form, values=RecurringRule.KINDS, state='readonly', width=18)
+        self.interval = ttk.Spinbox(self.form, from_=1, to=365, width=5)
+        self.day = ttk.Spinbox(self.form, from_=1, to=31, width=5)
+        self.clear_form()
+        add_button = ttk.Button(self.form, text="Add", command=self.add_rule)
+        update_button = ttk.Button(self.form, text="Update", command=self.update_rule)
+        remove_button = ttk.Button(self.form, text="Remove", command=self.remove_rule)
+
+        # the current budget's period
+        self.period_frame = ttk.LabelFrame(self, text=f"Period of {current}")
+        self.first_day = ttk.Entry(self.period_frame, width=12)
+        self.last_day = ttk.Entry(self.period_frame, width=12)
+        period = schedule.period(current)
+        if period is not None:
+            self.first_day.insert(0, period[0])
+            self.last_day.insert(0, period[1])
+        period_button = ttk.Button(self.period_frame, text="Set Period", command=self.set_period)
+
+        # grid widgets
+        self.rules_tv.grid(column=0, row=0, sticky='nsew')
+        self.scroll.grid(column=1, row=0, sticky='ns')
+        self.form.grid(column=0, row=1, columnspan=2, sticky='ew')
+        self.period_frame.grid(column=0, row=2, columnspan=2, sticky='ew')
+        labels = ('Merchant', 'Category', 'Outlay', 'Inflow', 'Start', 'End (optional)')
+        for i, (label, entry) in enumerate(zip(labels, self.entries.values())):
+            ttk.Label(self.form, text=label).grid(column=i % 3 * 2, row=i // 3, sticky='w')
+            entry.grid(column=i % 3 * 2 + 1, row=i // 3, sticky='w')
+        for i, (label, widget) in enumerate(zip(('Repeats', 'Every', 'Day of Month'), (self.kind, self.interval, self.day))):
+            ttk.Label(self.form, text=label).grid(column=i * 2, row=2, sticky='w')
+            widget.grid(column=i * 2 + 1, row=2, sticky='w')
+        add_button.grid(column=3, row=3, sticky='e')
+        update_button.grid(column=4, row=3, sticky='e')
+        remove_button.grid(column=5, row=3, sticky='e')
+        ttk.Label(self.period_frame, text="First and last date: ").grid(column=0, row=0, sticky='w')
+        self.first_day.grid(column=1, row=0)
+        self.last_day.grid(column=2, row=0)
+        period_button.grid(column=3, row=0, sticky='e')
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        # set up events
+        self.rules_tv.bind("<<TreeviewSelect>>", self.fill_form)
+        self.bind("<Escape>", lambda event: self.destroy())
+
+        self.update_rules_tv()
+
+    def update_rules_tv(self):
+        """Refill the list of rules from self.schedule."""
+
+        self.rules_tv.delete(*self.rules_tv.get_children())
+        for rule in self.schedule.sorted_rules():
+            values = (rule.merchant, rule.category, str(rule.outlay), str(rule.inflow),
+                      rule.describe(), rule.start, rule.end)
+            self.rules_tv.insert('', tk.END, iid=rule.rule_id, values=values)
+
+    def clear_form(self):
+        for name, entry in self.entries.items():
+            entry.delete(0, tk.END)
+        self.entries['outlay'].insert(0, '0.00')
+        self.entries['inflow'].insert(0, '0.00')
+        self.entries['start'].insert(0, date.today().isoformat())
+        self.kind.set('monthly')
+        self.interval.set(1)
+        self.day.set(1)
+
+    def fill_form(self, *args):
+        """Show the selected rule in the form."""
+
+        rule = self.selected_rule()
+        if rule is None:
+            return
+        for name, entry in self.entries.items():
+            entry.delete(0, tk.END)
+            entry.insert(0, rule.to_dict()[name])
+        self.kind.set(rule.kind)
+        self.interval.set(rule.interval)
+        self.day.set(rule.day)
+
+    def selected_rule(self):
+        selection = self.rules_tv.selection()
+        return self.schedule.rules.get(selection[0]) if selection else None
+
+    def rule_from_form(self, rule_id):
+        """Return the rule described by the form, or None after showing what is wrong with it."""
+
+        values = {name: entry.get().strip() for name, entry in self.entries.items()}
+        rules = {'merchant': REQUIRED, 'category': REQUIRED, 'outlay': DOLLARS, 'inflow': DOLLARS, 'start': DATE}
+        errors = [f"{name} : {rule.error(values[name])}" for name, rule in rules.items() if rule.error(values[name])]
+        if values['end'] and not DATE.is_valid(values['end']):
+            errors.append(f"end : {DATE.message}")
+        elif values['end'] and values['end'] < values['start']:
+            errors.append("end : Ends before it starts")
+        if not (self.interval.get().isdecimal() and int(self.interval.get()) >= 1):
+            errors.append("every : Must be a whole number of at least 1")
+        if not (self.day.get().isdecimal() and 1 <= int(self.day.get()) <= 31):
+            errors.append("day of month : Must be a whole number from 1 to 31")
+        if errors:
+            error_message = ''.join(f'\n\t{error}' for error in errors)
+            messagebox.showerror(
+                title="Entry Errors",
+                message=f"The following errors occurred: {error_message}",
+                detail="Data must be resubmitted.",
+                parent=self
+            )
+            return None
+        return RecurringRule(rule_id, kind=self.kind.get(), interval=self.interval.get(), day=self.day.get(), **values)
+
+    def add_rule(self):
+        rule = self.rule_from_form(self.schedule.new_rule_id())
+        if rule is not None:
+            self.schedule = self.change_rule_func(None, rule)
+            self.update_rules_tv()
+
+    def update_rule(self):
+        old = self.selected_rule()
+        if old is None:
+            return
+        rule = self.rule_from_form(old.rule_id)
+        if rule is not None and rule != old:
+            self.schedule = self.change_rule_func(old.rule_id, rule)
+            self.update_rules_tv()
+
+    def remove_rule(self):
+        rule = self.selected_rule()
+        if rule is not None:
+            self.schedule = self.change_rule_func(rule.rule_id, None)
+            self.update_rules_tv()
+            self.clear_form()
+
+    def set_period(self):
+        """Set the current budget's period, or clear it when both dates are empty."""
+
+        period = (self.first_day.get().strip(), self.last_day.get().strip())
+        if any(period) and not (all(map(DATE.is_valid, period)) and period[0] <= period[1]):
+            messagebox.showerror(
+                title="Period Error",
+                message="A period needs a first and a last date, in order, as YYYY-MM-DD.",
+                detail="Leave both empty for a budget without a period.",
+                parent=self
+            )
+            return
+        self.schedule = self.set_period_func(period if any(period) else None)
+
+
+class TaxSettings(tk.Toplevel):
+    """
+    Class which has pop-up window choosing how income tax is budgeted.
+
+    Either every job is taxed at its own tax rate, or the income of every job is taxed together
+    with a bracket table from budget_planner/tax_tables.json using the income earned so far in
+    the year. Periods per year tells how many budgets make up a year for budgets without a period.
+    """
+
+    FLAT = "Each job's tax rate"
+
+    def __init__(self, master, table_names, current, periods_per_year, submit_func, *args, **kwargs):
+        super().__init__(master, *args, **kwargs)
+
+        self.submit_func = submit_func
+
+        self.wm_title("Income Tax")
+
+        # create widgets
+        self.table = ttk.Combobox(self, values=[self.FLAT, *table_names], state='readonly', width=32)
+        self.table.set(current if current in table_names else self.FLAT)
+        self.periods = ttk.Spinbox(self, from_=1, to=366, width=5)
+        self.periods.set(periods_per_year)
+        submit_button = ttk.Button(self, text="Submit", command=self.submit)
+
+        # grid widgets
+        ttk.Label(self, text="Tax Table: ").grid(column=0, row=0, sticky='w')
+        self.table.grid(column=1, row=0, sticky='w')
+        ttk.Label(self, text="Periods per Year: ").grid(column=0, row=1, sticky='w')
+        self.periods.grid(column=1, row=1, sticky='w')
+        submit_button.grid(column=1, row=2, sticky='e')
+
+        self.bind("<Escape>", lambda event: self.destroy())
+
+    def submit(self):
+        periods = self.periods.get()
+        if not (periods.isdecimal() and int(periods) >= 1):
+            messagebox.showerror(
+                title="Entry Errors",
+                message="Periods per year must be a whole number of at least 1.",
+                parent=self
+            )
+            return
+        table = self.table.get()
+        self.submit_func('' if table == self.FLAT else table, int(periods))
+        self.destroy()
+
+
+class ForecastView(tk.Toplevel):
+    """
+    Pop-up window charting a Monte Carlo forecast of the balance over the coming periods.
+
+    The lighter band holds 90 % of the simulated paths, the darker band the middle 50 % and the
+    line is the median. Forecasts run on a ForecastWorker and changing a setting reruns the
+    forecast once the settings stop changing, so the window stays responsive.
+    """
+
+    SETTINGS = (
+        # name, label, default, lowest, highest, increment
+        ('periods', 'Periods', 52, 1, 520, 1),
+        ('paths', 'Paths', 10000, 100, 100000, 1000),
+        ('hours_variation', 'Hours Variation %', 10, 0, 100, 5),
+        ('shock_probability', 'Shock Chance %', 0, 0, 100, 1),
+        ('shock_amount', 'Shock Amount', 0, 0, 1000000, 100),
+    )
+    PERCENT_SETTINGS = ('hours_variation', 'shock_probability')
+    MARGIN = 60  # pixels around the chart for the axis labels
+
+    def __init__(self, master, snapshot, worker, income_tax=None, *args, **kwargs):
+        super().__init__(master, *args, **kwargs)
+
+        self.snapshot = snapshot
+        self.worker = worker
+        self.income_tax = income_tax  # bracketed income tax of the current budget, None for flat rates
+        self.forecast = None
+
+        self.wm_title("Cash Flow Forecast")
+
+        # create widgets
+        self.settings_frame = ttk.Frame(self)
+        self.variables = {}
+        for column, (name, label, default, lowest, highest, increment) in enumerate(self.SETTINGS):
+            variable = tk.StringVar(value=str(default))
+            ttk.Label(self.settings_frame, text=label).grid(column=column, row=0, sticky='w')
+            ttk.Spinbox(self.settings_frame, textvariable=variable, from_=lowest, to=highest, increment=increment,
+                        width=9).grid(column=column, row=1, sticky='w')
+            self.variables[name] = variable
+        self.canvas = tk.Canvas(self, width=720, height=400, background='white', highlightthickness=0)
+        self.status_label = ttk.Label(self, text="Simulating...")
+
+        # grid widgets
+        self.settings_frame.grid(column=0, row=0, sticky='w')
+        self.canvas.grid(column=0, row=1, sticky='nsew')
+        self.status_label.grid(column=0, row=2, sticky='w')
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        # set up events, settings are debounced so typing a number runs one forecast
+        self.rerun = Throttle(self, self.run, fps=None, settle=250)
+        for variable in self.variables.values():
+            variable.trace_add('write', lambda *args: self.rerun())
+        self.canvas.bind("<Configure>", lambda event: self.draw())
+        self.bind("<Escape>", lambda event: self.destroy())
+
+        self.run()
+
+    def settings(self):
+        """Return the settings as keyword arguments of forecast.simulate, or None if one isn't a number."""
+
+        settings = {}
+        for name, _, _, lowest, highest, _ in self.SETTINGS:
+            try:
+                value = float(self.variables[name].get())
+            except ValueError:
+                return None
+            value = min(max(value, lowest), highest)
+            if name in self.PERCENT_SETTINGS:
+                value /= 100
+            settings[name] = int(value) if name in ('periods', 'paths') else value
+        return settings
+
+    def run(self):
+        settings = self.settings()
+        if settings is None:
+            self.status_label.configure(text="Every setting must be a number.")
+            return
+        self.status_label.configure(text="Simulating...")
+        self.worker.submit(self.snapshot, settings, self.show, self.income_tax)
+
+    def show(self, forecast):
+        """Chart a finished forecast. Runs on the Tk thread."""
+
+        if not self.winfo_exists():
+            return
+        if isinstance(forecast, Exception):
+            self.status_label.configure(text=f"Could not forecast: {forecast}")
+            return
+        self.forecast = forecast
+        self.status_label.configure(
+            text=f"{forecast.paths} paths over {forecast.periods} periods in {forecast.elapsed:.0f} ms. "
+                 f"Median balance at the end: {forecast.bands[50][-1]:,.2f}. "
+                 f"Chance of going below zero: {forecast.shortfall:.0%}."
+        )
+        self.draw()
+
+    def draw(self):
+        """Redraw the chart of the latest forecast to fit the canvas."""
+
+        self.canvas.delete('all')
+        forecast = self.forecast
+        if forecast is None:
+            return
+        width = max(self.canvas.winfo_width(), 2 * self.MARGIN + 1)
+        height = max(self.canvas.winfo_height(), 2 * self.MARGIN + 1)
+        lowest = min(0, forecast.start_balance, min(forecast.bands[5]))
+        highest = max(0, forecast.start_balance, max(forecast.bands[95]))
+        span = (highest - lowest) or 1
+
+        def x(period):
+            return self.MARGIN + period * (width - 2 * self.MARGIN) / forecast.periods
+
+        def y(balance):
+            return height - self.MARGIN - (balance - lowest) * (height - 2 * self.MARGIN) / span
+
+        def band(low, high):
+            # the balance before the first period is known, so every band starts from one point
+            upper = [(x(0), y(forecast.start_balance))] + [(x(i + 1), y(v)) for i, v in enumerate(forecast.bands[high])]
+            lower = [(x(i + 1), y(v)) for i, v in enumerate(forecast.bands[low])]
+            return upper + lower[::-1]
+
+        self.canvas.create_polygon(band(5, 95), fill='#c6dbef', outline='')
+        self.canvas.create_polygon(band(25, 75), fill='#6baed6', outline='')
+        median = [(x(0), y(forecast.start_balance))] + [(x(i + 1), y(v)) for i, v in enumerate(forecast.bands[50])]
+        self.canvas.create_line(median, fill='#08306b', width=2)
+        self.canvas.create_line(x(0), y(0), x(forecast.periods), y(0), fill='red', dash=(4, 2))
+
+        # axes
+        self.canvas.create_line(x(0), y(lowest), x(0), y(highest), x(0), y(lowest), x(forecast.periods), y(lowest))
+        for balance in (lowest, 0, highest):
+            self.canvas.create_text(x(0) - 4, y(balance), text=f"{balance:,.0f}", anchor='e')
+        for period in sorted({0, forecast.periods // 2, forecast.periods}):
+            self.canvas.create_text(x(period), y(lowest) + 4, text=str(period), anchor='n')
+        self.canvas.create_text(width / 2, height - self.MARGIN / 2, text="Periods from now")
+
+    def destroy(self):
+        self.rerun.cancel()
+        self.worker.cancel(self.show)
+        super().destroy()
+
+
+class TransactionGrid(tk.Toplevel):
+    """
+    Spreadsheet style pop-up window for entering many transactions at once.
+
+    Tab moves along a row while Up, Down and Return move along a column, and Return on the last row
+    adds a row. Pasting text containing tabs or newlines, e.g. cells copied from a spreadsheet, fills
+    the grid starting at the focused cell. Add checks the filled rows a column at a time with the
+    rules of validators.py and hands all of them to submit_func together.
+    """
+
+    COLUMNS = ('date', 'merchant', 'category', 'outlay', 'inflow')
+    RULES = (DATE, REQUIRED, REQUIRED, DOLLARS, DOLLARS)
+    WIDTHS = (12, 24, 20, 10, 10)
+    INITIAL_ROWS = 12
+    MAX_ERRORS_SHOWN = 15
+
+    def __init__(self, master, submit_func, *args, **kwargs):
+        super().__init__(master, *args, **kwargs)
+
+        self.submit_func = submit_func
+        self.cells = []  # one list of entries per row
+
+        self.wm_title("Add Transactions")
+
+        # create widgets, the cells sit in a frame scrolled by a canvas
+        self.canvas = tk.Canvas(self, highlightthickness=0)
+        self.scroll = AutoScrollbar(self, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self.scroll.set)
+        self.table = ttk.Frame(self.canvas)
+        self.canvas.create_window((0, 0), window=self.table, anchor='nw')
+        self.status_label = ttk.Label(self, text="Paste rows copied from a spreadsheet or type them in.")
+        more_button = ttk.Button(self, text="More Rows", command=lambda: self.add_rows(self.INITIAL_ROWS))
+        add_button = ttk.Button(self, text="Add", command=self.submit)
+
+        for column, name in enumerate(self.COLUMNS):
+            ttk.Label(self.table, text=name.title()).grid(column=column, row=0, sticky='w')
+        self.add_rows(self.INITIAL_ROWS)
+
+        # grid widgets
+        self.canvas.grid(column=0, row=0, columnspan=3, sticky='nsew')
+        self.scroll.grid(column=3, row=0, sticky='ns')
+        self.status_label.grid(column=0, row=1, sticky='w')
+        more_button.grid(column=1, row=1, sticky='e')
+        add_button.grid(column=2, row=1, sticky='e')
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        # set up events
+        self.table.bind("<Configure>", self._fit_canvas)
+        self.bind("<Escape>", lambda event: self.destroy())
+
+        self.cells[0][0].focus_set()
+
+    def _fit_canvas(self, event):
+        self.canvas.configure(scrollregion=self.canvas.bbox('all'), width=event.width,
+                              height=min(event.height, 400))
+
+    def add_rows(self, count):
+        """Add empty rows to the bottom of the grid."""
+
+        for _ in range(count):
+            row = len(self.cells)
+            entries = []
+            for column, width in enumerate(self.WIDTHS):
+                entry = ttk.Entry(self.table, width=width)
+                entry.grid(column=column, row=row + 1)
+                entry.bind("<Up>", lambda event, r=row, c=column: self.move(r - 1, c))
+                entry.bind("<Down>", lambda event, r=row, c=column: self.move(r + 1, c))
+                entry.bind("<Return>", lambda event, r=row, c=column: self.move(r + 1, c, grow=True))
+                entry.bind("<<Paste>>", lambda event, r=row, c=column: self.paste(r, c))
+                entries.append(entry)
+            self.cells.append(entries)
+
+    def move(self, row, column, grow=False):
+        """Focus another cell. With grow a row is added when moving past the last one."""
+
+        if row >= len(self.cells) and grow:
+            self.add_rows(1)
+        if 0 <= row < len(self.cells):
+            cell = self.cells[row][column]
+            cell.focus_set()
+            cell.select_range(0, tk.END)
+            self.update_idletasks()
+            self.canvas.yview_moveto(max(cell.winfo_y() - 100, 0) / max(self.table.winfo_height(), 1))
+        return "break"
+
+    def paste(self, row, column):
+        """Fill cells from tab separated clipboard text, adding rows as needed."""
+
+        try:
+            text = self.clipboard_get()
+        except tk.TclError:
+            return "break"
+        if '\t' not in text and '\n' not in text:
+            return None  # a single value is pasted into the cell as usual
+        lines = text.rstrip('\r\n').splitlines()
+        if row + len(lines) > len(self.cells):
+            self.add_rows(row + len(lines) - len(self.cells))
+        for i, line in enumerate(lines):
+            for j, value in enumerate(line.split('\t')[:len(self.COLUMNS) - column]):
+                cell = self.cells[row + i][column + j]
+                cell.delete(0, tk.END)
+                cell.insert(0, value.strip())
+        self.status_label.configure(text=f"Pasted {len(lines)} rows.")
+        return "break"
+
+    def submit(self, *args):
+        """Check every filled row and, if all are valid, hand them to submit_func and close."""
+
+        filled = []  # (row number, entries, values) of every row with a value
+        for row, entries in enumerate(self.cells):
+            values = [entry.get().strip() for entry in entries]
+            if any(values):  # empty rows are ignored
+                values = [value or ('0.00' if rule is DOLLARS else '') for value, rule in zip(values, self.RULES)]
+                filled.append((row, entries, values))
+
+        invalid = set()
+        errors = []
+        for column, (name, rule) in enumerate(zip(self.COLUMNS, self.RULES)):
+            for i, error in rule.column_errors([values[column] for _, _, values in filled]):
+                invalid.add((i, column))
+                errors.append((filled[i][0], column, f"row {filled[i][0] + 1} {name} : {error}"))
+        for i, (_, entries, _) in enumerate(filled):
+            for column, entry in enumerate(entries):
+                entry.configure(foreground='red' if (i, column) in invalid else 'black')
+        errors = [error for _, _, error in sorted(errors)]
+        rows = [dict(zip(self.COLUMNS, values)) for _, _, values in filled]
+
+        if errors:
+            error_message = ''.join(f'\n\t{error}' for error in errors[:self.MAX_ERRORS_SHOWN])
+            if len(errors) > self.MAX_ERRORS_SHOWN:
+                error_message += f'\n\t... and {len(errors) - self.MAX_ERRORS_SHOWN} more'
+            messagebox.showerror(
+                title="Entry Errors",
+                message=f"The following errors occurred: {error_message}",
+                detail="Data must be resubmitted.",
+                parent=self
+            )
+            return
+        if rows:
+            self.submit_func(rows)
+        self.destroy()
+
+
+class PerformanceView(tk.Toplevel):
+    """
+    Class which has pop-up window showing how long each callback has taken.
+
+    Times are in milliseconds over the most recent calls kept by the instrumentation. Memory is
+    the average change in memory traced by tracemalloc per call, in kilobytes. Below the table each
+    throttled event handler shows how many of its events were collapsed instead of handled.
+    """
+
+    COLUMNS = ('calls', 'mean', 'p50', 'p90', 'p99', 'max', 'memory', 'errors')
+    REFRESH_INTERVAL = 1000  # milliseconds
+
+    def __init__(self, master, instrumentation, *args, **kwargs):
+        super().__init__(master, *args, **kwargs)
+
+        self.instrumentation = instrumentation
+        self._refresh_id = None
+
+        self.wm_title("Performance")
+
+        # create widgets
+        self.tv = ttk.Treeview(self, columns=self.COLUMNS, height=20)
+        self.tv.heading('#0', text='Callback', anchor='w')
+        self.tv.column('#0', width=220, anchor='w')
+        for column in self.COLUMNS:
+            self.tv.heading(column, text=column.title(), anchor='e')
+            self.tv.column(column, width=70, anchor='e')
+        self.scroll = AutoScrollbar(self, orient=tk.VERTICAL, command=self.tv.yview)
+        self.tv.configure(yscrollcommand=self.scroll.set)
+        self.throttle_label = ttk.Label(self, justify='left')
+
+        self.button_frame = ttk.Frame(self)
+        self.reset_button = ttk.Button(self.button_frame, text="Reset", command=self.reset)
+        self.save_button = ttk.Button(self.button_frame, text="Save JSON...", command=self.save)
+        self.close_button = ttk.Button(self.button_frame, text="Close", command=self.destroy)
+
+        # grid widgets
+        self.tv.grid(column=0, row=0, sticky='nsew')
+        self.scroll.grid(column=1, row=0, sticky='ns')
+        self.throttle_label.grid(column=0, row=1, columnspan=2, sticky='w')
+        self.button_frame.grid(column=0, row=2, columnspan=2, sticky='e')
+        self.reset_button.grid(column=0, row=0)
+        self.save_button.grid(column=1, row=0)
+        self.close_button.grid(column=2, row=0)
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.bind("<Escape>", lambda event: self.destroy())
+        self.bind("<Destroy>", self._stop_refresh)
+
+        self.refresh()
+
+    def refresh(self):
+        """Refill the treeview, slowest callbacks by total time first, and schedule the next refresh."""
+
+        self.tv.delete(*self.tv.get_children())
+        snapshot = self.instrumentation.snapshot()
+        callbacks = snapshot['callbacks']
+        for name, stats in sorted(callbacks.items(), key=lambda item: -item[1]['total_ms']):
+            time_ms = stats['time_ms']
+            memory = stats['memory_kb'].get('mean', 0)
+            self.tv.insert('', 'end', text=name, values=(
+                stats['calls'],
+                *(f"{time_ms[key]:.1f}" for key in ('mean', 'p50', 'p90', 'p99', 'max')),
+                f"{memory:.1f}",
+                stats['errors'],
+            ))
+        self.throttle_label.configure(text='\n'.join(
+            f"{name}: {stats['events']} events, {stats['calls']} handled, {stats['collapsed']} collapsed"
+            for name, stats in snapshot['throttles'].items()
+        ))
+        self._refresh_id = self.after(self.REFRESH_INTERVAL, self.refresh)
+
+    def reset(self):
+        self.instrumentation.reset()
+        self.after_cancel(self._refresh_id)
+        self.refresh()
+
+    def save(self):
+        filepath = filedialog.asksaveasfilename(
+            parent=self,
+            title="Save Performance Data",
+            initialfile="performance.json",
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+        )
+        if filepath:
+            self.instrumentation.dump(filepath)
+
+    def _stop_refresh(self, event):
+        if event.widget is self and self._refresh_id is not None:
+            self.after_cancel(self._refresh_id)
+            self._refresh_id = None
+
+
 class SaveTemplate:
     """Class which has pop-up window with options for user to save a budget template."""
 
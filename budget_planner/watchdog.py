@@ -0,0 +1,109 @@
+"""
+Detects when the Tk event loop stops responding and logs what it was doing.
+
+A heartbeat scheduled with after records the time every INTERVAL milliseconds. A monitor thread
+checks that time; if no heartbeat has arrived for longer than the threshold the event loop is
+stuck in a handler, so the thread samples the main thread's stack with sys._current_frames. Once
+the heartbeat resumes the stall is written to a rotating log file with its duration and the
+function of this program seen most often at the top of those stacks.
+"""
+
+import logging
+import logging.handlers
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from pathlib import Path
+
+PACKAGE_DIRECTORY = str(Path(__file__).resolve().parent)
+
+
+class StallWatchdog:
+    """Watches the event loop of a Tk widget for stalls longer than threshold milliseconds."""
+
+    INTERVAL = 100  # milliseconds between heartbeats
+    MAX_SAMPLES = 50  # stacks kept per stall
+
+    def __init__(self, master, threshold=500, log_path=Path("budget_planner", "logs", "stalls.log")):
+        self.master = master
+        self.threshold = threshold / 1000  # seconds
+        self.stalls = 0
+
+        self.logger = logging.getLogger("budget_planner.watchdog")
+        self.logger.setLevel(logging.WARNING)
+        self.logger.propagate = False
+        if not self.logger.handlers:
+            Path(log_path).parent.mkdir(parents=True, exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(log_path, maxBytes=1_000_000, backupCount=3)
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            self.logger.addHandler(handler)
+
+        self._main_thread_id = threading.main_thread().ident
+        self._last_beat = None  # monitoring starts with the first heartbeat, i.e. once mainloop runs
+        self._stop = threading.Event()
+
+        self._beat_id = self.master.after(self.INTERVAL, self._beat)
+        self._thread = threading.Thread(target=self._monitor, daemon=True)
+        self._thread.start()
+
+    def _beat(self):
+        self._last_beat = time.monotonic()
+        self._beat_id = self.master.after(self.INTERVAL, self._beat)
+
+    def stop(self):
+        """Stop the heartbeat and the monitor thread."""
+        self._stop.set()
+        if self._beat_id is not None:
+            self.master.after_cancel(self._beat_id)
+            self._beat_id = None
+
+    def _monitor(self):
+        """Monitor thread loop."""
+
+        samples = []
+        stalled_since = None
+        check = self.threshold / 4
+        while not self._stop.wait(check):
+            last_beat = self._last_beat
+            if last_beat is None:
+                continue
+            quiet = time.monotonic() - last_beat
+            if quiet > self.threshold + self.INTERVAL / 1000:
+                if stalled_since is None:
+                    stalled_since = last_beat
+                    samples = []
+                if len(samples) < self.MAX_SAMPLES:
+                    frame = sys._current_frames().get(self._main_thread_id)
+                    if frame is not None:
+                        samples.append(traceback.extract_stack(frame))
+            elif stalled_since is not None:
+                self._report(last_beat - stalled_since - self.INTERVAL / 1000, samples)
+                stalled_since = None
+
+    def _report(self, duration, samples):
+        """Log a finished stall along with the most common culprit among the sampled stacks."""
+
+        self.stalls += 1
+        culprits = Counter(self.culprit(stack) for stack in samples)
+        if culprits:
+            culprit, seen = culprits.most_common(1)[0]
+            stack = next(stack for stack in samples if self.culprit(stack) == culprit)
+            detail = ''.join(traceback.format_list(stack))
+        else:
+            culprit, seen, detail = 'unknown', 0, ''
+        self.logger.warning(
+            "event loop stalled for %.0f ms in %s (%d of %d samples)\n%s",
+            duration * 1000, culprit, seen, len(samples), detail
+        )
+
+    @staticmethod
+    def culprit(stack):
+        """Return the innermost frame of a stack belonging to this program, as 'file:line in function'."""
+
+        for frame in reversed(stack):
+            if frame.filename.startswith(PACKAGE_DIRECTORY):
+                return f"{Path(frame.filename).name}:{frame.lineno} in {frame.name}"
+        frame = stack[-1]
+        return f"{Path(frame.filename).name}:{frame.lineno} in {frame.name}"
@@ -1,9 +1,22 @@
 import tkinter as tk
 from tkinter import ttk
-from datetime import datetime
-import decimal
-from PIL import Image, ImageTk
 from .images import IM_TRISTATE, IM_UNCHECKED, IM_CHECKED
+from .validators import DATE, DOLLARS, RATE, REQUIRED
+
+
+def load_image(filepath, master):
+    """
+    Load an image for use in a widget.
+
+    Tk 8.6 reads PNG files itself, so PIL is only imported for older versions of Tk or formats
+    Tk can't read. Importing PIL noticeably slows down startup.
+    """
+
+    try:
+        return tk.PhotoImage(file=filepath, master=master)
+    except tk.TclError:
+        from PIL import Image, ImageTk
+        return ImageTk.PhotoImage(Image.open(filepath), master=master)
 
 
 class AutoScrollbar(ttk.Scrollbar):
@@ -38,6 +51,45 @@ class AutoScrollbar(ttk.Scrollbar):
                this widget")
 
 
+class RepeatButton(ttk.Button):
+    """A Button which keeps invoking its command while held down, like tk.Button's repeatdelay option."""
+
+    def __init__(self, *args, repeatdelay=400, repeatinterval=80, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.repeatdelay = repeatdelay
+        self.repeatinterval = repeatinterval
+        self._repeat_id = None
+        self._repeated = False
+
+        self.bind("<ButtonPress-1>", self._start_repeat, add='+')
+        self.bind("<ButtonRelease-1>", self._release, add='+')
+        self.bind("<Leave>", self._stop_repeat, add='+')
+
+    def _start_repeat(self, event):
+        self._stop_repeat()
+        self._repeated = False
+        self._repeat_id = self.after(self.repeatdelay, self._repeat)
+
+    def _repeat(self):
+        self._repeat_id = None
+        self._repeated = True
+        self.invoke()
+        # the command may have opened a dialog which swallowed the release so only continue while pressed
+        if self.instate(['pressed']):
+            self._repeat_id = self.after(self.repeatinterval, self._repeat)
+
+    def _release(self, event):
+        self._stop_repeat()
+        if self._repeated:
+            # clearing pressed stops the class binding from invoking the command one extra time
+            self.state(['!pressed'])
+
+    def _stop_repeat(self, *args):
+        if self._repeat_id is not None:
+            self.after_cancel(self._repeat_id)
+            self._repeat_id = None
+
+
 class ValidatedMixin:
     """Adds a validation functionality to an input widget."""
 
@@ -110,157 +162,50 @@ class ValidatedMixin:
         return valid
 
 
-class DateEntry(ValidatedMixin, ttk.Entry):
-    """An Entry widget allowing only dates in for form YYYY-MM-DD to be entered."""
+class RuleEntry(ValidatedMixin, ttk.Entry):
+    """An Entry widget checked against a FieldRule from validators.py on every keystroke and on focus out."""
 
-    def _invalid(self, proposed, current, char, event, index, action):
-        if event != 'key':
-            self._toggle_error('Not a valid date')
+    rule = REQUIRED
+    invalid_message = ''  # shown when the entry loses focus holding an invalid value
 
-    def _key_validate(self, action, index, char, **kwargs):
-        valid = True
+    def _invalid(self, proposed, current, char, event, index, action):
+        if event != 'key' and self.invalid_message:
+            self._toggle_error(self.invalid_message)
 
-        if action == '0':
-            valid = True
-        elif index in ('0', '1', '2', '3', '5', '6', '8', '9'):
-            valid = char.isdigit()
-        elif index in ('4', '7'):
-            valid = char == '-'
-        else:
-            valid = False
-        return valid
+    def _key_validate(self, proposed, action, **kwargs):
+        return action == '0' or self.rule.allows_partial(proposed)  # always allow deleting
 
     def _focusout_validate(self, event):
-        valid = True
-        if not self.get():
-            self.error.set('A value is required')
-            valid = False
-        else:
-            try:
-                datetime.strptime(self.get(), '%Y-%m-%d')
-            except ValueError:
-                self.error.set('Invalid date')
-                valid = False
-        return valid
+        error = self.rule.error(self.get())
+        self.error.set(error)
+        return not error
 
 
-class DollarEntry(ValidatedMixin, ttk.Entry):
-    """An Entry widget allowing only valid dollar amounts with up to 2 decimal places."""
+class DateEntry(RuleEntry):
+    """An Entry widget allowing only dates in for form YYYY-MM-DD to be entered."""
 
-    def _invalid(self, proposed, current, char, event, index, action):
-        if event != 'key':
-            self._toggle_error('Not a valid dollar amount')
+    rule = DATE
+    invalid_message = 'Not a valid date'
 
-    def _key_validate(self, proposed, action, index, char, **kwargs):
-        valid = True
 
-        if action == '0':  # always allow backspace
-            valid = True
-        elif index == '0':  # allow digits or a "." for first character
-            valid = char.isdigit() or char == "."
-        elif len(proposed) == 2:  # check all cases of string length 2
-            if proposed[0] == '0':
-                if proposed[1] == '.':
-                    valid = True
-                else:
-                    valid = False
-            elif proposed[0] == '.':
-                valid = char.isdigit()
-            else:
-                if char == '.':
-                    valid = True
-                else:
-                    valid = char.isdigit()
-        elif len(proposed) >= 4 and char.isdigit():  # ensure at most 2 decimal places
-            if proposed[len(proposed) - 4] == '.':
-                valid = False
-            else:
-                valid = True
-        elif char.isdigit():
-            valid = True
-        elif char == '.':
-            try:
-                decimal.Decimal(proposed)
-                valid = True
-            except decimal.InvalidOperation:
-                valid = False
-        else:
-            valid = False
-        return valid
+class DollarEntry(RuleEntry):
+    """An Entry widget allowing only valid dollar amounts with up to 2 decimal places."""
 
-    def _focusout_validate(self, event):
-        valid = True
-        if not self.get():
-            self.error.set('A value is required')
-            valid = False
-        else:
-            try:
-                decimal.Decimal(self.get())
-            except (ValueError, decimal.InvalidOperation):
-                self.error.set('Invalid dollar')
-                valid = False
-        return valid
+    rule = DOLLARS
+    invalid_message = 'Not a valid dollar amount'
 
 
-class DecimalEntry(ValidatedMixin, ttk.Entry):
+class DecimalEntry(RuleEntry):
     """An Entry widget allowing only valid decimal amounts between 0 and 1."""
 
-    def _invalid(self, proposed, current, char, event, index, action):
-        if event != 'key':
-            self._toggle_error('Not a valid dollar amount')
-
-    def _key_validate(self, proposed, action, index, char, **kwargs):
-        valid = True
-
-        if action == '0':  # always allow backspace
-            valid = True
-        elif index == '0':  # allow digits or a "." for first character
-            valid = char in ("0", "1") or char == "."
-        elif len(proposed) == 2:  # check all cases of string length 2
-            if proposed[0] == '0':
-                if proposed[1] == '.':
-                    valid = True
-                else:
-                    valid = False
-            elif proposed[0] == '.':
-                valid = char.isdigit()
-            else:
-                valid = (char.isdigit() or char == '.') and decimal.Decimal(proposed) <= decimal.Decimal("1")
-        elif char.isdigit() and decimal.Decimal(proposed) <= decimal.Decimal("1"):
-            valid = True
-        elif char == '.':
-            try:
-                decimal.Decimal(proposed)
-                valid = True
-            except decimal.InvalidOperation:
-                valid = False
-        else:
-            valid = False
-        return valid
-
-    def _focusout_validate(self, event):
-        valid = True
-        if not self.get():
-            self.error.set('A value is required')
-            valid = False
-        else:
-            try:
-                decimal.Decimal(self.get())
-            except (ValueError, decimal.InvalidOperation):
-                self.error.set('Invalid Decimal')
-                valid = False
-        return valid
+    rule = RATE
+    invalid_message = 'Not a valid rate'
 
 
-class RequiredEntry(ValidatedMixin, ttk.Entry):
+class RequiredEntry(RuleEntry):
     """An Entry widget which requires an input"""
 
-    def _focusout_validate(self, event):
-        valid = True
-        if not self.get():
-            self.error.set('A value is required')
-            valid = False
-        return valid
+    rule = REQUIRED
 
 
 class ModifiedCheckboxTreeview(ttk.Treeview):
@@ -271,9 +216,9 @@ class ModifiedCheckboxTreeview(ttk.Treeview):
         self.style.configure('Treeview')
 
         # checkboxes are implemented with pictures
-        self.im_checked = ImageTk.PhotoImage(Image.open(IM_CHECKED), master=self)
-        self.im_unchecked = ImageTk.PhotoImage(Image.open(IM_UNCHECKED), master=self)
-        self.im_tristate = ImageTk.PhotoImage(Image.open(IM_TRISTATE), master=self)
+        self.im_checked = load_image(IM_CHECKED, self)
+        self.im_unchecked = load_image(IM_UNCHECKED, self)
+        self.im_tristate = load_image(IM_TRISTATE, self)
         self.tag_configure("unchecked", image=self.im_unchecked)
         self.tag_configure("tristate", image=self.im_tristate)
         self.tag_configure("checked", image=self.im_checked)
@@ -0,0 +1,172 @@
+import queue
+import threading
+from .aggregation import aggregate_budget, PANELS
+
+
+class AggregationWorker:
+    """
+    Computes the rows of the displayed budget on a worker thread.
+
+    Only the most recent request matters. Each submit hands out a new ticket and anything computed
+    for an older ticket is dropped, so navigating away mid-computation cancels the stale result.
+    Results come back through a queue which is polled from the Tk thread with after.
+    """
+
+    POLL_INTERVAL = 10  # milliseconds between checks of the result queue
+
+    def __init__(self, master):
+        self.master = master
+        self.ticket = 0
+
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._callback = None
+        self._request = None
+        self._poll_id = None
+
+        self._thread = threading.Thread(target=self._work, daemon=True)
+        self._thread.start()
+
+    def submit(self, budget, strings, callback, panels=PANELS, income_tax=None, balances=None):
+        """
+        Aggregate a budget off the Tk thread and call callback with the rows on the Tk thread.
+
+        :argument
+            budget (Budget): The budget to aggregate. It is immutable, so edits made while the
+                worker reads it produce a new Budget instead of disturbing this one
+            strings (StringTable): Table the budget's transactions are encoded with
+            callback (function): Called with the rows produced by aggregate_budget
+            panels (iterable): Panels to compute rows for
+            income_tax (int): Budgeted income tax in cents, None for each job's flat tax_rate
+            balances (dict): Available balance of each expense category, None without rollover
+        :returns
+            int: The ticket identifying this request
+        """
+
+        self.cancel()
+        self._callback = callback
+        self._request = (budget, strings, tuple(panels), income_tax, balances)
+        self._requests.put((self.ticket, *self._request))
+        self._schedule_poll()
+        return self.ticket
+
+    def cancel(self):
+        """Forget the pending request. Its result is dropped whenever it arrives."""
+        self.ticket += 1
+        self._callback = None
+        self._request = None
+
+    @property
+    def busy(self):
+        return self._callback is not None
+
+    def _work(self):
+        """Worker thread loop."""
+        while True:
+            ticket, budget, strings, panels, income_tax, balances = self._requests.get()
+            if ticket != self.ticket:
+                continue
+            try:
+                rows = aggregate_budget(budget, strings, panels, income_tax, balances)
+            except Exception:  # the Tk thread recomputes it and reports the error
+                rows = None
+            self._results.put((ticket, rows))
+
+    def _schedule_poll(self):
+        if self._poll_id is None and self._callback is not None:
+            self._poll_id = self.master.after(self.POLL_INTERVAL, self._poll)
+
+    def _poll(self):
+        """Hand a finished result to its callback. Runs on the Tk thread."""
+        self._poll_id = None
+        while True:
+            try:
+                ticket, rows = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if ticket == self.ticket and self._callback is not None:
+                callback, (budget, strings, panels, income_tax, balances) = self._callback, self._request
+                self._callback = None
+                self._request = None
+                if rows is None:
+                    rows = aggregate_budget(budget, strings, panels, income_tax, balances)
+                callback(rows)
+        self._schedule_poll()
+
+
+class ForecastWorker:
+    """
+    Fits and simulates forecasts from forecast.py on a worker thread.
+
+    Like AggregationWorker only the most recent request is delivered, so changing a setting while
+    a forecast is running drops the stale result. Fitting reads every budget, so the fitted inputs
+    are kept and reused until they are asked for a different snapshot or income tax.
+    """
+
+    POLL_INTERVAL = 20  # milliseconds between checks of the result queue
+
+    def __init__(self, master):
+        self.master = master
+        self.ticket = 0
+
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._callback = None
+        self._poll_id = None
+        self._fitted = (None, None, None)  # (snapshot, income tax, ForecastInputs), only used by the worker thread
+
+        self._thread = threading.Thread(target=self._work, daemon=True)
+        self._thread.start()
+
+    def submit(self, snapshot, settings, callback, income_tax=None):
+        """
+        Forecast a template or budget group and call callback with the Forecast on the Tk thread.
+
+        :argument
+            snapshot (dict): ProjectModel.snapshot() of the data to forecast
+            settings (dict): Keyword arguments of forecast.simulate
+            callback (function): Called with the Forecast, or with the exception raised while making it
+            income_tax (int): Budgeted income tax of the current budget in cents, None for each job's flat tax_rate
+        """
+
+        self.ticket += 1
+        self._callback = callback
+        self._requests.put((self.ticket, snapshot, income_tax, dict(settings)))
+        if self._poll_id is None:
+            self._poll_id = self.master.after(self.POLL_INTERVAL, self._poll)
+
+    def cancel(self, callback=None):
+        """Forget the pending request, or only if it would be handed to callback."""
+        if callback is None or callback == self._callback:
+            self.ticket += 1
+            self._callback = None
+
+    def _work(self):
+        """Worker thread loop."""
+        from .forecast import fit_forecast, simulate
+
+        while True:
+            ticket, snapshot, income_tax, settings = self._requests.get()
+            if ticket != self.ticket:
+                continue
+            try:
+                if self._fitted[0] is not snapshot or self._fitted[1] != income_tax:
+                    self._fitted = (snapshot, income_tax, fit_forecast(snapshot, income_tax))
+                result = simulate(self._fitted[2], **settings)
+            except Exception as error:  # e.g. NumPy is not installed
+                result = error
+            self._results.put((ticket, result))
+
+    def _poll(self):
+        """Hand a finished forecast to its callback. Runs on the Tk thread."""
+        self._poll_id = None
+        while True:
+            try:
+                ticket, result = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if ticket == self.ticket and self._callback is not None:
+                callback, self._callback = self._callback, None
+                callback(result)
+        if self._callback is not None:
+            self._poll_id = self.master.after(self.POLL_INTERVAL, self._poll)
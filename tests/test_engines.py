@@ -0,0 +1,86 @@
+"""Randomized checks of the incremental TaxEngine and RolloverEngine against freshly built ones."""
+
+import random
+import pytest
+from benchmarks.workload import generate_budget_group
+from budget_planner.models import ProjectModel
+from budget_planner.money import Money, Rate
+from budget_planner.records import Budget, Job, ExpenseCategory, Transaction
+from budget_planner.recurrence import Schedule
+from budget_planner.rollover import RolloverEngine
+from budget_planner.tax import DEFAULT_TABLES, TaxTable, TaxEngine
+
+PERIODS_PER_YEAR = 4
+
+
+def random_period(rng):
+    year = rng.choice(['2020', '2021', '2022'])
+    month = rng.randrange(1, 13)
+    return f"{year}-{month:02}-01", f"{year}-{month:02}-28"
+
+
+def random_edit(rng, model, step):
+    """Make one random edit of the budget group through ProjectModel, like the views do."""
+
+    data = model.template_data
+    order = data['order']
+    data['current_budget'] = name = rng.choice(order.to_list())
+    budget = model.current_budget
+    categories = [category.name for category in budget.expense_categories] + [f"Category {step}"]
+    operation = rng.choice([
+        'job', 'job', 'transaction', 'transaction', 'category', 'delete_row',
+        'add', 'add', 'delete', 'rename', 'period', 'undo', 'undo', 'redo',
+    ])
+    if operation == 'job' and budget.income_categories:
+        index = rng.randrange(len(budget.income_categories))
+        job = budget.income_categories[index]
+        model.replace_row('income_categories', index, job.replace(hours=Rate.parse(str(rng.randrange(200)))))
+    elif operation == 'transaction':
+        category = model.strings.code(rng.choice(categories))
+        row = Transaction('2020-01-01', model.strings.code('Merchant'), category, Money(rng.randrange(50000)), Money(0))
+        model.insert_row('transactions', rng.randrange(len(budget.transactions) + 1), row)
+    elif operation == 'category':
+        model.append_row('expense_categories', ExpenseCategory(rng.choice(categories), Money(rng.randrange(50000))))
+    elif operation == 'delete_row':
+        table = rng.choice(['income_categories', 'expense_categories', 'transactions'])
+        if budget[table]:
+            model.delete_row(table, rng.randrange(len(budget[table])))
+    elif operation == 'add':
+        jobs = [Job(f"Job {step}", Money(rng.randrange(1000, 5000)), Rate.parse('40'), Rate.parse('0.2'))]
+        period = random_period(rng) if rng.random() < 0.5 else None
+        model.add_budget(f"Budget {step}", Budget(jobs, [ExpenseCategory(rng.choice(categories), Money(100))]),
+                         rng.choice([name, order[-1]]), period)
+    elif operation == 'delete' and len(order) > 1:
+        model.delete_budget(name)
+    elif operation == 'rename':
+        model.rename_budget(name, f"Renamed {step}")
+    elif operation == 'period':
+        model.set_period(name, random_period(rng) if rng.random() < 0.7 else None)
+    elif operation == 'undo':
+        model.undo()
+    elif operation == 'redo':
+        model.redo()
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_incremental_engines_match_fresh_ones(seed):
+    rng = random.Random(seed)
+    data = generate_budget_group(10, 6, 4, 2, seed=seed)
+    data['schedule'] = Schedule(periods={
+        name: random_period(rng) for name in data['order'] if rng.random() < 0.5
+    })
+    model = ProjectModel(None, {})
+    model.template_data = data
+    table = TaxTable.from_dict(DEFAULT_TABLES[0])
+    tax_engine = TaxEngine(table, PERIODS_PER_YEAR)
+    rollover_engine = RolloverEngine()
+
+    for step in range(300):
+        random_edit(rng, model, step)
+        if rng.random() < 0.3:
+            continue  # let several edits pile up before the engines see them
+        data = model.template_data
+        fresh_tax, fresh_rollover = TaxEngine(table, PERIODS_PER_YEAR), RolloverEngine()
+        for name in data['order']:
+            assert tax_engine.expected_tax(data, name) == fresh_tax.expected_tax(data, name)
+            assert rollover_engine.balances(data, name) == fresh_rollover.balances(data, name)
@@ -0,0 +1,78 @@
+"""Randomized checks of BudgetOrder against a list of names."""
+
+import pickle
+import random
+import pytest
+from budget_planner.ordering import BudgetOrder
+
+
+def check(order, expected):
+    assert len(order) == len(expected)
+    assert order.to_list() == expected
+    assert list(order) == expected
+    assert order == expected
+    for position, name in enumerate(expected):
+        assert name in order
+        assert order.index(name) == position
+        assert order[position] == name
+        assert order[position - len(expected)] == name
+        assert order.previous(name) == (expected[position - 1] if position > 0 else None)
+        assert order.next(name) == (expected[position + 1] if position + 1 < len(expected) else None)
+
+
+@pytest.mark.parametrize('block_size', [2, 4, 128])
+@pytest.mark.parametrize('seed', range(4))
+def test_budget_order_matches_list(monkeypatch, block_size, seed):
+    monkeypatch.setattr(BudgetOrder, 'MAX_BLOCK_SIZE', block_size)  # small blocks split and empty often
+    rng = random.Random(seed)
+    expected = [f"Budget {i}" for i in range(rng.randrange(20))]
+    order = BudgetOrder(expected)
+    versions = [(order, list(expected))]
+    for step in range(400):
+        name = f"New {step}"
+        operation = rng.choice(['insert', 'insert_after', 'append', 'remove', 'rename'])
+        if operation in ('insert_after', 'remove', 'rename') and not expected:
+            operation = 'insert'
+        if operation == 'insert':
+            position = rng.randrange(-2, len(expected) + 3)
+            order = order.insert(position, name)
+            expected.insert(min(max(position, 0), len(expected)), name)
+        elif operation == 'insert_after':
+            existing = rng.choice(expected)
+            order = order.insert_after(existing, name)
+            expected.insert(expected.index(existing) + 1, name)
+        elif operation == 'append':
+            order = order.append(name)
+            expected.append(name)
+        elif operation == 'remove':
+            old = rng.choice(expected)
+            order = order.remove(old)
+            expected.remove(old)
+        else:
+            old = rng.choice(expected)
+            order = order.rename(old, name)
+            expected[expected.index(old)] = name
+        check(order, expected)
+        versions.append((order, list(expected)))
+
+    for version, names in versions:  # no change reached an earlier version
+        assert version.to_list() == names
+    check(pickle.loads(pickle.dumps(order)), expected)
+
+
+def test_budget_order_errors():
+    order = BudgetOrder(['a', 'b'])
+    with pytest.raises(ValueError):
+        BudgetOrder(['a', 'a'])
+    with pytest.raises(ValueError):
+        order.insert(0, 'a')
+    with pytest.raises(ValueError):
+        order.rename('a', 'b')
+    with pytest.raises(ValueError):
+        order.remove('c')
+    with pytest.raises(ValueError):
+        order.index('c')
+    with pytest.raises(IndexError):
+        order[2]
+    assert 'c' not in order
+    assert order.remove('a').remove('b').append('c') == ['c']
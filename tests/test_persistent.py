@@ -0,0 +1,142 @@
+"""Randomized checks of PVector and PMap against list and dict."""
+
+import random
+import pytest
+from budget_planner.persistent import PVector, PMap
+
+
+class Key:
+    """A key whose hash is chosen by the test, so keys can share hash bits or whole hashes."""
+
+    def __init__(self, name, hash_value):
+        self.name = name
+        self.hash_value = hash_value
+
+    def __hash__(self):
+        return self.hash_value
+
+    def __eq__(self, other):
+        return isinstance(other, Key) and self.name == other.name
+
+    def __repr__(self):
+        return f"Key({self.name!r}, {self.hash_value})"
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_pvector_matches_list(seed):
+    rng = random.Random(seed)
+    expected = list(range(rng.randrange(300)))
+    vector = PVector(expected)
+    versions = [(vector, list(expected))]
+    for step in range(600):
+        operation = rng.choice(['set', 'append', 'extend', 'insert', 'delete', 'splice'])
+        if operation in ('set', 'delete') and not expected:
+            operation = 'append'
+        if operation == 'set':
+            index = rng.randrange(-len(expected), len(expected))
+            vector = vector.set(index, step)
+            expected[index] = step
+        elif operation == 'append':
+            vector = vector.append(step)
+            expected.append(step)
+        elif operation == 'extend':
+            items = [step] * rng.randrange(100)
+            vector = vector.extend(items)
+            expected.extend(items)
+        elif operation == 'insert':
+            index = rng.randrange(-len(expected) - 2, len(expected) + 2)
+            vector = vector.insert(index, step)
+            expected.insert(index, step)
+        elif operation == 'delete':
+            index = rng.randrange(-len(expected), len(expected))
+            vector = vector.delete(index)
+            del expected[index]
+        else:
+            start = rng.randrange(len(expected) + 1)
+            stop = rng.randrange(start, len(expected) + 1)
+            items = [step] * rng.randrange(5)
+            vector = vector.splice(start, stop, items)
+            expected[start:stop] = items
+        assert len(vector) == len(expected)
+        assert list(vector) == expected
+        if expected:
+            index = rng.randrange(-len(expected), len(expected))
+            assert vector[index] == expected[index]
+        versions.append((vector, list(expected)))
+
+    assert list(reversed(vector)) == expected[::-1]
+    for version, contents in versions:  # no change reached an earlier version
+        assert list(version) == contents
+
+
+def random_key(rng, keys):
+    """Pick a key, often one with the same hash or the same low hash bits as another key."""
+
+    name = rng.randrange(400)
+    kind = name % 4
+    if kind == 0:
+        hash_value = name // 8  # whole 64 bit hash shared with another key
+    elif kind == 1:
+        hash_value = (name << 40) | 7  # same low bits, differing deep in the trie
+    elif kind == 2:
+        hash_value = -name - 1
+    else:
+        return rng.choice(keys) if keys else name
+    return Key(name, hash_value)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_pmap_matches_dict(seed):
+    rng = random.Random(seed)
+    mapping, expected = PMap(), {}
+    versions = [(mapping, dict(expected))]
+    for step in range(1500):
+        key = random_key(rng, list(expected))
+        if expected and rng.random() < 0.4:
+            key = rng.choice(list(expected))
+            mapping = mapping.delete(key)
+            del expected[key]
+            with pytest.raises(KeyError):
+                mapping.delete(key)
+        else:
+            value = (step,)
+            mapping = mapping.set(key, value)
+            expected[key] = value
+        assert len(mapping) == len(expected)
+        assert key in mapping or key not in expected
+        versions.append((mapping, dict(expected)))
+
+    assert dict(mapping.items()) == expected
+    assert mapping == expected
+    for key, value in expected.items():
+        assert mapping[key] is value
+    for version, contents in versions:  # no change reached an earlier version
+        assert dict(version.items()) == contents
+        assert len(version) == len(contents)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_pmap_changes(seed):
+    rng = random.Random(seed)
+    mapping = PMap((random_key(rng, []), (i,)) for i in range(rng.randrange(200)))
+    for _ in range(200):
+        old = mapping
+        for step in range(rng.randrange(1, 6)):
+            keys = list(mapping)
+            if keys and rng.random() < 0.3:
+                mapping = mapping.delete(rng.choice(keys))
+            elif keys and rng.random() < 0.2:
+                key = rng.choice(keys)
+                mapping = mapping.set(key, mapping[key])  # the same value is not a change
+            else:
+                mapping = mapping.set(random_key(rng, keys), (step,))
+
+        before, after = dict(old.items()), dict(mapping.items())
+        expected = {
+            (key, before.get(key), after.get(key))
+            for key in before.keys() | after.keys()
+            if before.get(key) is not after.get(key)
+        }
+        changes = list(mapping.changes(old))
+        assert len(changes) == len(expected)
+        assert set(changes) == expected